@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import List
 
 class Settings(BaseSettings):
     # API Keys
@@ -7,14 +8,75 @@ class Settings(BaseSettings):
     pinecone_api_key: str
     cohere_api_key: str
     
+    # Vector Search Settings ("pinecone" or "local")
+    vector_backend: str = "pinecone"
+    local_index_path: str = "data/local_index"
+    
     # Pinecone Settings
     pinecone_index_name: str = "mba-essays-assistant"
+    pinecone_max_workers: int = 8
+    pinecone_query_timeout: float = 5.0
     
     # LLM Settings
     model_name: str = "gpt-3.5-turbo"
+    # Models an analysis request may select for its content suggestions
+    request_model_names: List[str] = ["gpt-3.5-turbo", "gpt-4o-mini", "gpt-4o"]
     temperature: float = 0.7
     max_tokens: int = 4096
     
+    # Prompt Budget Settings (in tokens; completions are capped to fit the context window)
+    model_context_tokens: int = 16385
+    prompt_token_budget: int = 8000
+    prompt_example_max_tokens: int = 1500
+    prompt_guidelines_max_tokens: int = 2000
+    
+    # OpenAI HTTP Transport Settings (shared connection pool)
+    openai_max_connections: int = 100
+    openai_max_keepalive_connections: int = 20
+    openai_keepalive_expiry: float = 30.0
+    openai_request_timeout: float = 120.0
+    
+    # Cohere Settings
+    cohere_rerank_model: str = "rerank-v3.5"
+    cohere_max_concurrency: int = 8
+    cohere_rerank_timeout: float = 5.0
+    cohere_max_document_tokens: int = 1024
+    
+    # Persistent Cache Settings ("memory" disables the second tier, "sqlite" enables it)
+    cache_backend: str = "sqlite"
+    cache_sqlite_path: str = "data/cache.sqlite3"
+    
+    # RAG Cache Settings
+    rag_cache_max_bytes: int = 256 * 1024 * 1024
+    
+    # RAG Near-Duplicate Reuse Settings (fraction of matching SimHash bits)
+    rag_near_duplicate_threshold: float = 0.85
+    rag_near_duplicate_max_entries: int = 1000
+    
+    # Extraction Cache Settings (writing style analyses and feedback frameworks)
+    extraction_cache_max_size: int = 256
+    extraction_cache_ttl: int = 86400
+    
+    # Language Edit Cache Settings (per-paragraph edits)
+    language_edit_cache_max_size: int = 2000
+    language_edit_cache_ttl: int = 86400
+    
+    # Sectioned Generation Settings (long essays are split into concurrently processed chunks)
+    sectioned_generation_min_words: int = 800
+    sectioned_chunk_words: int = 350
+    
+    # Word Cutter Settings (LLM passes per request until the word limit is met)
+    word_cut_max_passes: int = 3
+    word_cut_rules_enabled: bool = True
+    
+    # Content Suggestion Evaluation ("parallel": one call per suggestion, "batched": one call for all)
+    feedback_evaluation_mode: str = "parallel"
+    
+    # Analysis Settings (per-branch deadlines in seconds)
+    content_suggestions_timeout: float = 120.0
+    language_edits_timeout: float = 60.0
+    general_feedback_timeout: float = 60.0
+    
     # Application Settings
     environment: str = "development"
     
@@ -1,6 +1,9 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+import asyncio
+import json
 import logging
 import sys
 
@@ -10,6 +13,10 @@ from .services.essay_analyzer import (
     AnalysisResponse
 )
 from .services.rag import RAGService
+from .services.openai import close_http_client
+from .services.single_flight import SingleFlight, request_key
+from .services.prompt_budget import ENCODING_RETRY_INTERVAL, get_prompt_budget_stats, load_encoding, retry_encoding_load
+from .services.tracing import span, trace_metrics
 from .config import Settings
 from .middleware import error_handling_middleware
 from .services.word_cutter import WordCutter, WordCutRequest, WordCutResponse
@@ -52,29 +59,126 @@ settings = Settings()
 essay_analyzer = EssayAnalyzer()
 rag_service = RAGService()
 word_cutter = WordCutter()
+# Identical concurrent requests (double clicks, retries, multiple tabs) share one computation
+single_flight = SingleFlight()
+# Background retry of the tokenizer load, if it failed at startup
+tokenizer_retry: Optional[asyncio.Task] = None
+
+@app.on_event("startup")
+async def startup() -> None:
+    global tokenizer_retry
+    # tiktoken may download its vocabulary on first use; do that here, off the event loop
+    if await asyncio.to_thread(load_encoding) is None:
+        logger.warning(
+            "Exact prompt token budgets are disabled until the tokenizer loads; "
+            f"retrying every {ENCODING_RETRY_INTERVAL}s"
+        )
+        tokenizer_retry = asyncio.create_task(retry_encoding_load())
+    await rag_service.vector_store.initialize()
+
+@app.on_event("shutdown")
+async def shutdown() -> None:
+    if tokenizer_retry is not None:
+        tokenizer_retry.cancel()
+    await close_http_client()
+
+def check_model_name(request: AnalysisRequest) -> None:
+    """Rejects a requested model that isn't in Settings.request_model_names."""
+    if request.model_name is not None and request.model_name not in settings.request_model_names:
+        raise HTTPException(
+            status_code=422,
+            detail=f"model_name must be one of: {', '.join(settings.request_model_names)}"
+        )
 
 @app.post("/api/analyze", response_model=AnalysisResponse)
 async def analyze_essay(request: AnalysisRequest):
-    try:
+    check_model_name(request)
+
+    async def run_analysis() -> AnalysisResponse:
         context = await rag_service.get_relevant_context(
             essay_text=request.essay_text,
             essay_prompt=request.essay_prompt,
             school=request.school
         )
         
-        analysis = await essay_analyzer.analyze(
+        return await essay_analyzer.analyze(
             essay_text=request.essay_text,
             essay_prompt=request.essay_prompt,
             user_instructions=request.user_instructions,
             context=context,
-            school=request.school
+            school=request.school,
+            evaluation_mode=request.evaluation_mode,
+            model_name=request.model_name,
+            quality_threshold=request.quality_threshold,
+            max_iterations=request.max_iterations
         )
-        
-        return analysis
+
+    try:
+        with span("api.analyze", school=request.school):
+            return await single_flight.do(
+                request_key("analyze", request, settings),
+                run_analysis
+            )
+    except HTTPException:
+        # Already carries the right status and detail (e.g. every analysis branch failed)
+        raise
     except Exception as e:
         logger.error(f"Error analyzing essay: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def format_sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Formats a Server-Sent Event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.post("/api/analyze/stream")
+async def analyze_essay_stream(request: AnalysisRequest):
+    """
+    Streams analysis results as Server-Sent Events: each component is sent as
+    soon as it is ready, with progress events for the content-suggestion workflow.
+    """
+    check_model_name(request)
+
+    async def analysis_events() -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        try:
+            yield "progress", {"stage": "retrieve_context"}
+            context = await rag_service.get_relevant_context(
+                essay_text=request.essay_text,
+                essay_prompt=request.essay_prompt,
+                school=request.school
+            )
+
+            async for event, data in essay_analyzer.analyze_stream(
+                essay_text=request.essay_text,
+                essay_prompt=request.essay_prompt,
+                user_instructions=request.user_instructions,
+                context=context,
+                school=request.school,
+                evaluation_mode=request.evaluation_mode,
+                model_name=request.model_name,
+                quality_threshold=request.quality_threshold,
+                max_iterations=request.max_iterations
+            ):
+                yield event, data
+
+        except Exception as e:
+            logger.error(f"Error streaming essay analysis: {str(e)}")
+            yield "error", {"detail": e.detail if isinstance(e, HTTPException) else str(e)}
+
+    async def event_stream():
+        with span("api.analyze_stream", school=request.school):
+            # Duplicate clicks, retries and tabs share one analysis, each replaying its events
+            async for event, data in single_flight.stream(
+                request_key("analyze", request, settings),
+                analysis_events
+            ):
+                yield format_sse_event(event, data)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.post("/api/cut-words", response_model=WordCutResponse)
 async def cut_words(request: WordCutRequest):
     
@@ -82,17 +186,34 @@ async def cut_words(request: WordCutRequest):
         raise HTTPException(status_code=400, detail="Word limit is required")
         
     try:
-        result = await word_cutter.cut_words(
-            essay_text=request.essay_text,
-            essay_prompt=request.essay_prompt,
-            word_limit=request.word_limit,
-        )
-        
-        return result
+        with span("api.cut_words", word_limit=request.word_limit):
+            return await single_flight.do(
+                request_key("cut-words", request, settings),
+                lambda: word_cutter.cut_words(
+                    essay_text=request.essay_text,
+                    essay_prompt=request.essay_prompt,
+                    word_limit=request.word_limit,
+                )
+            )
+    except HTTPException:
+        # Already carries the right status and detail (e.g. every analysis branch failed)
+        raise
     except Exception as e:
         logger.error(f"Error cutting words: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
\ No newline at end of file
+    return {
+        "status": "healthy",
+        "rag_cache": rag_service.get_stats(),
+        "vector_store": rag_service.vector_store.get_stats(),
+        "language_edits": essay_analyzer.language_edit_service.get_stats(),
+        "single_flight": single_flight.get_stats(),
+        "prompt_tokens": get_prompt_budget_stats()
+    }
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Per-step latency histograms, error counts and LLM token totals from request traces (Prometheus format)."""
+    return PlainTextResponse(trace_metrics.render(), media_type="text/plain; version=0.0.4")
\ No newline at end of file
@@ -0,0 +1,231 @@
+import argparse
+import asyncio
+import json
+import logging
+import math
+import statistics
+import time
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Dict, List, Tuple
+
+from .offline_fakes import DependencyProfile, FakeProfile, FakeStats, ESSAYS_PATH, load_offline_app
+import httpx
+
+HEADER = f"{'endpoint':<10} {'words':>6} {'conc':>5} {'errors':>6} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'req/s':>7}"
+
+ENDPOINTS = {
+    "analyze": "/api/analyze",
+    "cut-words": "/api/cut-words",
+}
+
+def percentile(values: List[float], p: float) -> float:
+    """Nearest-rank percentile of values."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+def build_essay(words: int, tag: str) -> str:
+    """
+    Builds an essay of about `words` words from the bundled essays' paragraphs.
+    Every paragraph starts with `tag`, so no two requests in a scenario share a
+    cached paragraph, context or extraction.
+    """
+    with open(ESSAYS_PATH, 'r', encoding='utf-8') as f:
+        paragraphs = [
+            paragraph.strip()
+            for essay in json.load(f)
+            for paragraph in essay["essay"].split("\n")
+            if len(paragraph.split()) >= 20
+        ]
+
+    essay: List[str] = []
+    count = 0
+    while count < words:
+        paragraph = f"{tag} {paragraphs[len(essay) % len(paragraphs)]}"
+        remaining = words - count
+        if len(paragraph.split()) > remaining:
+            paragraph = " ".join(paragraph.split()[:remaining]).rstrip(",;") + "."
+        essay.append(paragraph)
+        count += len(paragraph.split())
+    return "\n\n".join(essay)
+
+def build_payload(endpoint: str, words: int, tag: str, word_limit_ratio: float) -> Dict[str, Any]:
+    payload = {
+        "essay_text": build_essay(words, tag),
+        "essay_prompt": "What matters most to you, and why?",
+        "user_instructions": "",
+        "school": "Stanford GSB"
+    }
+    if endpoint == "cut-words":
+        payload["word_limit"] = int(words * word_limit_ratio)
+    return payload
+
+def clear_caches(main: ModuleType) -> None:
+    """Empties the response caches so a scenario doesn't reuse work from the previous one."""
+    main.rag_service.cache.clear()
+    main.essay_analyzer.language_edit_service.cache.clear()
+    main.essay_analyzer.content_suggestion_workflow.extraction_cache.clear()
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    endpoint: str,
+    words: int,
+    concurrency: int,
+    requests: int,
+    word_limit_ratio: float,
+    fake_stats: FakeStats
+) -> Dict[str, Any]:
+    """
+    Sends `requests` requests with at most `concurrency` in flight, returning
+    latency percentiles and throughput. The essays depend only on the endpoint,
+    length and request number, so every concurrency level sees the same work.
+    """
+    payloads = [
+        build_payload(endpoint, words, f"[{endpoint}-{words}-{i}]", word_limit_ratio)
+        for i in range(requests)
+    ]
+    semaphore = asyncio.Semaphore(concurrency)
+    before = fake_stats.snapshot()
+
+    async def timed_post(payload: Dict[str, Any]) -> Tuple[float, int]:
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.post(ENDPOINTS[endpoint], json=payload)
+            return time.perf_counter() - start, response.status_code
+
+    start = time.perf_counter()
+    outcomes = await asyncio.gather(*(timed_post(payload) for payload in payloads))
+    elapsed = time.perf_counter() - start
+
+    latencies = [latency for latency, status in outcomes if status == 200]
+    calls_per_request = {
+        dependency: round((stats["calls"] - before.get(dependency, {}).get("calls", 0)) / requests, 2)
+        for dependency, stats in fake_stats.snapshot().items()
+    }
+    return {
+        "endpoint": endpoint,
+        "words": words,
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": requests - len(latencies),
+        "p50_ms": percentile(latencies, 50) * 1000 if latencies else None,
+        "p90_ms": percentile(latencies, 90) * 1000 if latencies else None,
+        "p99_ms": percentile(latencies, 99) * 1000 if latencies else None,
+        "mean_ms": statistics.mean(latencies) * 1000 if latencies else None,
+        "throughput_rps": len(latencies) / elapsed,
+        "calls_per_request": calls_per_request
+    }
+
+def print_row(result: Dict[str, Any]) -> None:
+    if result["p50_ms"] is None:
+        print(f"{result['endpoint']:<10} {result['words']:>6} {result['concurrency']:>5} {result['errors']:>6}  all requests failed")
+        return
+    print(
+        f"{result['endpoint']:<10} {result['words']:>6} {result['concurrency']:>5} {result['errors']:>6} "
+        f"{result['p50_ms']:>9.0f} {result['p90_ms']:>9.0f} {result['p99_ms']:>9.0f} {result['throughput_rps']:>7.2f}"
+    )
+
+def print_results(results: List[Dict[str, Any]]) -> None:
+    print(HEADER)
+    for result in results:
+        print_row(result)
+
+def compare_results(results: List[Dict[str, Any]], config: Dict[str, Any], baseline_path: Path) -> None:
+    """Prints the change in p50, p99 and throughput against a previous run's results file."""
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    if baseline["config"] != config:
+        print(f"Warning: {baseline_path} was run with a different configuration; deltas are not comparable")
+
+    previous = {
+        (result["endpoint"], result["words"], result["concurrency"]): result
+        for result in baseline["results"]
+    }
+    print(f"\nChange vs. {baseline_path}:")
+    for result in results:
+        old = previous.get((result["endpoint"], result["words"], result["concurrency"]))
+        if not old or old["p50_ms"] is None or result["p50_ms"] is None:
+            continue
+        print(
+            f"{result['endpoint']:<10} {result['words']:>6} {result['concurrency']:>5} "
+            f"p50 {result['p50_ms'] / old['p50_ms'] - 1:+.1%}, "
+            f"p99 {result['p99_ms'] / old['p99_ms'] - 1:+.1%}, "
+            f"throughput {result['throughput_rps'] / old['throughput_rps'] - 1:+.1%}"
+        )
+
+async def benchmark_api(args: argparse.Namespace) -> None:
+    """
+    Benchmarks /api/analyze and /api/cut-words in-process with OpenAI, Pinecone
+    and Cohere replaced by deterministic local fakes. Each scenario (endpoint x
+    essay length x concurrency level) sends fresh essays, so every request takes
+    the uncached path.
+    """
+    profile = FakeProfile(
+        openai_chat=DependencyProfile(args.openai_latency, args.openai_tokens_per_second),
+        openai_embeddings=DependencyProfile(args.embedding_latency, args.embedding_tokens_per_second),
+        pinecone=DependencyProfile(args.pinecone_latency),
+        cohere=DependencyProfile(args.cohere_latency, args.cohere_tokens_per_second),
+        jitter=args.jitter,
+        time_scale=args.time_scale
+    )
+    fake_stats = FakeStats()
+    main = load_offline_app(profile, fake_stats)
+    logging.getLogger().setLevel(logging.WARNING)
+
+    config = {
+        "profile": profile._asdict(),
+        "requests": args.requests,
+        "word_limit_ratio": args.word_limit_ratio,
+        "settings": {
+            key: value for key, value in main.settings.model_dump().items()
+            if not key.endswith("_api_key")
+        }
+    }
+    results = []
+    transport = httpx.ASGITransport(app=main.app)
+    print(HEADER)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+        # Warms up the app (clients, tokenizer, first-call setup) outside any measurement
+        await client.post(ENDPOINTS["analyze"], json=build_payload("analyze", 200, "[warmup]", args.word_limit_ratio))
+
+        for endpoint in args.endpoints:
+            for words in args.lengths:
+                for concurrency in args.concurrency:
+                    clear_caches(main)
+                    results.append(await run_scenario(
+                        client, endpoint, words, concurrency, args.requests,
+                        args.word_limit_ratio, fake_stats
+                    ))
+                    print_row(results[-1])
+
+    print(f"\nTime scale {args.time_scale:g}; all results:")
+    print_results(results)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({"config": config, "results": results}, f, indent=2)
+        print(f"Wrote {args.output}")
+    if args.baseline:
+        compare_results(results, json.loads(json.dumps(config)), Path(args.baseline))
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark the API offline against simulated OpenAI, Pinecone and Cohere")
+    parser.add_argument("--endpoints", nargs="+", choices=list(ENDPOINTS), default=list(ENDPOINTS))
+    parser.add_argument("--lengths", nargs="+", type=int, default=[300, 650, 1000], help="Essay lengths in words")
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 4, 16])
+    parser.add_argument("--requests", type=int, default=16, help="Requests per scenario")
+    parser.add_argument("--word-limit-ratio", type=float, default=0.8, help="cut-words target as a fraction of the essay length")
+    parser.add_argument("--openai-latency", type=float, default=0.5, help="Seconds before the first completion token")
+    parser.add_argument("--openai-tokens-per-second", type=float, default=50.0, help="Completion tokens generated per second")
+    parser.add_argument("--embedding-latency", type=float, default=0.1)
+    parser.add_argument("--embedding-tokens-per-second", type=float, default=20000.0)
+    parser.add_argument("--pinecone-latency", type=float, default=0.08)
+    parser.add_argument("--cohere-latency", type=float, default=0.15)
+    parser.add_argument("--cohere-tokens-per-second", type=float, default=40000.0)
+    parser.add_argument("--jitter", type=float, default=0.2, help="Deterministic +/- spread applied to every call")
+    parser.add_argument("--time-scale", type=float, default=0.1, help="Multiplier on every simulated delay")
+    parser.add_argument("--output", help="Write the configuration and results to this JSON file")
+    parser.add_argument("--baseline", help="Compare against a results file written with --output")
+    args = parser.parse_args()
+
+    asyncio.run(benchmark_api(args))
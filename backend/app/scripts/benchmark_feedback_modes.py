@@ -0,0 +1,173 @@
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from typing import Any, Dict, List
+
+# Stub runs (--stub-latency) never reach the network, but Settings still requires keys
+for key in ("OPENAI_API_KEY", "PINECONE_API_KEY", "COHERE_API_KEY"):
+    os.environ.setdefault(key, "benchmark")
+
+from ..services.models import ContentSuggestion
+from ..services.prompt_budget import count_tokens
+from ..services.essay_analyzer_services.content_suggestion_service.agents.feedback_agent import FeedbackAgent
+from ..services.essay_analyzer_services.content_suggestion_service.models import (
+    FeedbackCriterion,
+    FeedbackFramework,
+    FeedbackResponse,
+    SuggestionFeedback
+)
+
+FRAMEWORK = FeedbackFramework(criteria=[
+    FeedbackCriterion(
+        name="Specificity",
+        description="Whether the suggestion targets a concrete passage and a concrete change",
+        example_feedback="The suggestion names the paragraph but not what to change in it."
+    ),
+    FeedbackCriterion(
+        name="Authenticity",
+        description="Whether the improved version keeps the applicant's voice and story",
+        example_feedback="The rewrite sounds generic and loses the applicant's personal detail."
+    ),
+    FeedbackCriterion(
+        name="Impact",
+        description="Whether the change makes the essay more compelling to an admissions reader",
+        example_feedback="The new opening creates tension that draws the reader in."
+    ),
+])
+
+SUGGESTIONS = [
+    ContentSuggestion(
+        suggestion="Open with the moment the product launch failed instead of your job title",
+        how_to_apply="Move the launch story to the first sentence and cut the introduction",
+        original_text="I am a product manager at a mid-sized software company.",
+        improved_version="Three hours after launch, our checkout page went dark."
+    ),
+    ContentSuggestion(
+        suggestion="Show what you learned from the failure rather than stating it",
+        how_to_apply="Replace the summary sentence with the decision you made differently next time",
+        original_text="This experience taught me the importance of resilience.",
+        improved_version="On the next launch, I insisted on a staged rollout, and we caught the bug with 2% of traffic."
+    ),
+    ContentSuggestion(
+        suggestion="Make your goal more concrete",
+        how_to_apply="Name the industry and role",
+        original_text="After my MBA I want to make an impact.",
+        improved_version="After my MBA I want to lead product for a healthcare payments platform."
+    ),
+    ContentSuggestion(
+        suggestion="Use better words",
+        how_to_apply="Improve the vocabulary",
+        original_text="The team worked hard.",
+        improved_version="The team worked assiduously and indefatigably."
+    ),
+    ContentSuggestion(
+        suggestion="Connect your goal to a specific resource at the school",
+        how_to_apply="Name one course or club and explain how it closes a gap in your experience",
+        original_text="The school has many great resources.",
+        improved_version="The Healthcare Initiative's practicum would give me the payer-side experience I lack."
+    ),
+    ContentSuggestion(
+        suggestion="Cut the list of adjectives describing yourself",
+        how_to_apply="Delete the sentence; the stories already show these traits",
+        original_text="I am driven, passionate, collaborative and innovative.",
+        improved_version=""
+    ),
+]
+
+class CountingChain:
+    """Wraps a chain to count calls and locally counted prompt tokens."""
+
+    def __init__(self, chain: Any) -> None:
+        self.chain = chain
+        self.calls = 0
+        self.prompt_tokens = 0
+
+    async def ainvoke(self, prompt: Any) -> Any:
+        self.calls += 1
+        self.prompt_tokens += count_tokens(prompt.to_string())
+        return await self.chain.ainvoke(prompt)
+
+class StubChain:
+    """Offline stand-in returning fixed scores after a fixed latency."""
+
+    def __init__(self, latency: float, batched: bool) -> None:
+        self.latency = latency
+        self.batched = batched
+
+    async def ainvoke(self, _prompt: Any) -> Any:
+        await asyncio.sleep(self.latency)
+        feedback = SuggestionFeedback(feedback="Stub", score=7.0, improvement_areas=[])
+        if self.batched:
+            return FeedbackResponse(suggestion_feedback=[feedback] * len(SUGGESTIONS), overall_score=7.0)
+        return feedback
+
+async def run_mode(agent: FeedbackAgent, mode: str, runs: int) -> Dict[str, Any]:
+    """Evaluates SUGGESTIONS `runs` times in one mode, returning timings, token counts and scores."""
+    single = CountingChain(agent.feedback_chain)
+    batch = CountingChain(agent.batch_feedback_chain)
+    agent.feedback_chain, agent.batch_feedback_chain = single, batch
+
+    framework = agent._format_evaluation_framework(FRAMEWORK)
+    durations = []
+    scores: List[List[float]] = []
+    try:
+        for _ in range(runs):
+            start = time.perf_counter()
+            if mode == "batched":
+                feedback = await agent.evaluate_suggestions_batched(SUGGESTIONS, framework)
+            else:
+                feedback = await asyncio.gather(*(
+                    agent.evaluate_single_suggestion(suggestion, framework)
+                    for suggestion in SUGGESTIONS
+                ))
+            durations.append(time.perf_counter() - start)
+            scores.append([item.score for item in feedback])
+    finally:
+        agent.feedback_chain, agent.batch_feedback_chain = single.chain, batch.chain
+
+    return {
+        "durations": durations,
+        "calls": single.calls + batch.calls,
+        "prompt_tokens": single.prompt_tokens + batch.prompt_tokens,
+        "scores": [statistics.mean(run_scores) for run_scores in zip(*scores)]
+    }
+
+async def benchmark_feedback_modes(runs: int, stub_latency: float, threshold: float) -> None:
+    """
+    Compares per-suggestion parallel evaluation with single-call batched evaluation
+    on a fixed set of suggestions. Uses the configured OpenAI model unless
+    --stub-latency is given, in which case latency and token counts are still
+    measured but scores are fixed.
+    """
+    agent = FeedbackAgent()
+    if stub_latency:
+        agent.feedback_chain = StubChain(stub_latency, batched=False)
+        agent.batch_feedback_chain = StubChain(stub_latency, batched=True)
+
+    results = {mode: await run_mode(agent, mode, runs) for mode in ("parallel", "batched")}
+
+    print(f"{len(SUGGESTIONS)} suggestions, {runs} runs per mode")
+    for mode, result in results.items():
+        print(
+            f"{mode:>8}: mean {statistics.mean(result['durations']):.2f}s, "
+            f"{result['calls'] / runs:.1f} calls/run, "
+            f"{result['prompt_tokens'] / runs:.0f} prompt tokens/run"
+        )
+
+    parallel_scores = results["parallel"]["scores"]
+    batched_scores = results["batched"]["scores"]
+    differences = [abs(p - b) for p, b in zip(parallel_scores, batched_scores)]
+    same_side = sum((p >= threshold) == (b >= threshold) for p, b in zip(parallel_scores, batched_scores))
+    print(f"Mean absolute score difference: {statistics.mean(differences):.2f}")
+    print(f"Same pass/fail decision at {threshold:g}: {same_side}/{len(SUGGESTIONS)} suggestions")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark parallel vs. batched suggestion evaluation")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--stub-latency", type=float, default=0.0, help="Use stubbed LLM calls with this latency (seconds)")
+    parser.add_argument("--threshold", type=float, default=8.0, help="Quality threshold for pass/fail agreement")
+    args = parser.parse_args()
+
+    asyncio.run(benchmark_feedback_modes(args.runs, args.stub_latency, args.threshold))
@@ -0,0 +1,77 @@
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from typing import List
+
+# The local index never reaches the network, but Settings still requires keys
+for key in ("OPENAI_API_KEY", "PINECONE_API_KEY", "COHERE_API_KEY"):
+    os.environ.setdefault(key, "benchmark")
+
+import numpy as np
+from ..services.local_vector_index import LocalVectorService
+from ..services.pinecone import MBAEssayEmbedding, PineconeService
+
+EMBEDDING_DIMENSIONS = 1536
+SCHOOLS = ["Harvard", "Stanford", "Wharton", "Booth"]
+
+def random_embeddings(count: int, rng: np.random.Generator) -> np.ndarray:
+    return rng.standard_normal((count, EMBEDDING_DIMENSIONS)).astype(np.float32)
+
+def summarize(label: str, durations: List[float]) -> None:
+    durations = sorted(durations)
+    p95 = durations[min(len(durations) - 1, int(0.95 * len(durations)))]
+    print(
+        f"{label}: p50 {statistics.median(durations) * 1000:.2f}ms, "
+        f"p95 {p95 * 1000:.2f}ms"
+    )
+
+async def time_queries(service, queries: np.ndarray, school: str) -> List[float]:
+    """Returns the latency of each search_similar_essays call."""
+    durations = []
+    for query in queries:
+        start = time.perf_counter()
+        await service.search_similar_essays(query.tolist(), school, top_k=5)
+        durations.append(time.perf_counter() - start)
+    return durations
+
+async def benchmark_local(corpus_size: int, queries: np.ndarray, rng: np.random.Generator) -> None:
+    """Builds a local index of corpus_size essays, persists it, and times in-memory and mmap-loaded search."""
+    with tempfile.TemporaryDirectory() as index_path:
+        service = LocalVectorService(index_path)
+        for i, vector in enumerate(random_embeddings(corpus_size, rng)):
+            school = SCHOOLS[i % len(SCHOOLS)]
+            await service.store_essay_embedding(MBAEssayEmbedding(
+                id=f"essay-{i}",
+                values=vector.tolist(),
+                metadata={"essay": f"Essay {i}", "prompt": "Prompt", "school": school, "feedback": ""}
+            ))
+        await service.flush()
+
+        summarize(f"Local, {corpus_size} essays (in memory)", await time_queries(service, queries, SCHOOLS[0]))
+        reloaded = LocalVectorService(index_path)
+        summarize(f"Local, {corpus_size} essays (memory-mapped)", await time_queries(reloaded, queries, SCHOOLS[0]))
+
+async def benchmark_vector_search(corpus_sizes: List[int], num_queries: int, remote: bool) -> None:
+    rng = np.random.default_rng(0)
+    queries = random_embeddings(num_queries, rng)
+
+    for corpus_size in corpus_sizes:
+        await benchmark_local(corpus_size, queries, rng)
+
+    if remote:
+        # Queries the configured Pinecone index as-is; it must already be populated
+        pinecone = PineconeService()
+        await pinecone.initialize()
+        summarize("Pinecone (remote)", await time_queries(pinecone, queries, SCHOOLS[0]))
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark local vs. Pinecone vector search")
+    parser.add_argument("--corpus-sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--remote", action="store_true", help="Also time queries against the configured Pinecone index")
+    args = parser.parse_args()
+
+    asyncio.run(benchmark_vector_search(args.corpus_sizes, args.queries, args.remote))
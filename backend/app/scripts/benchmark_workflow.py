@@ -0,0 +1,127 @@
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from typing import Any, Callable, List
+
+# Stubbed LLMs never reach the network, but Settings still requires keys.
+# Caches stay in memory so stub results never touch the persistent cache file.
+for key in ("OPENAI_API_KEY", "PINECONE_API_KEY", "COHERE_API_KEY"):
+    os.environ.setdefault(key, "benchmark")
+os.environ["CACHE_BACKEND"] = "memory"
+
+from langgraph.graph import StateGraph, END
+from ..services.models import ContentSuggestion
+from ..services.essay_analyzer_services.content_suggestion_service.content_suggestion_workflow import ContentSuggestionWorkflow
+from ..services.essay_analyzer_services.content_suggestion_service.models import (
+    ContentSuggestionList,
+    FeedbackCriterion,
+    FeedbackFramework,
+    SuggestionFeedback,
+    WorkflowState,
+    WritingStyleApplication,
+    WritingStyleApplicationList,
+    WritingStyleAttribute,
+    WritingStyleAttributeList
+)
+
+class StubChain:
+    """Stands in for a structured-output LLM chain with a fixed latency."""
+
+    def __init__(self, latency: float, result: Any) -> None:
+        self.latency = latency
+        self.result = result
+
+    async def ainvoke(self, _prompt: Any) -> Any:
+        await asyncio.sleep(self.latency)
+        return self.result
+
+def stub_workflow(workflow: ContentSuggestionWorkflow, latency: float) -> None:
+    """Replaces every LLM chain in the workflow with a stub that always passes evaluation."""
+    suggestions = ContentSuggestionList(suggestions=[
+        ContentSuggestion(
+            suggestion=f"Suggestion {i}",
+            how_to_apply="Apply it",
+            original_text="Original",
+            improved_version="Improved"
+        )
+        for i in range(5)
+    ])
+
+    workflow.writing_style_agent.attributes = WritingStyleAttributeList(attributes=[
+        WritingStyleAttribute(name="Pace", category="structure", description="Flow")
+    ])
+    workflow.writing_style_agent.analysis_chain = StubChain(latency, WritingStyleApplicationList(
+        applications=[WritingStyleApplication(attribute="Pace", how_to_apply="Vary sentences")]
+    ))
+    workflow.feedback_criteria_agent.criteria_chain = StubChain(latency, FeedbackFramework(
+        criteria=[FeedbackCriterion(name="Clarity", description="Clear", example_feedback="Be clear")]
+    ))
+    workflow.content_agent.initial_chain = StubChain(latency, suggestions)
+    workflow.content_agent.refinement_chain = StubChain(latency, suggestions.suggestions[0])
+    workflow.feedback_agent.feedback_chain = StubChain(latency, SuggestionFeedback(
+        feedback="Good", score=9.0, improvement_areas=[]
+    ))
+
+def build_sequential_chain(workflow: ContentSuggestionWorkflow):
+    """Rebuilds the previous topology, with the extractors chained one after another."""
+    graph = StateGraph(WorkflowState)
+    graph.add_node("extract_writing_style", workflow.writing_style_agent.extract_writing_style)
+    graph.add_node("extract_feedback_criteria", workflow.feedback_criteria_agent.extract_feedback_framework)
+    graph.add_node("generate_suggestions", workflow.content_agent.generate_initial_suggestions)
+    graph.add_node("evaluate_suggestions", workflow.feedback_agent.evaluate_suggestions)
+    graph.set_entry_point("extract_writing_style")
+    graph.add_edge("extract_writing_style", "extract_feedback_criteria")
+    graph.add_edge("extract_feedback_criteria", "generate_suggestions")
+    graph.add_edge("generate_suggestions", "evaluate_suggestions")
+    graph.add_edge("evaluate_suggestions", END)
+    return graph.compile()
+
+async def time_runs(run: Callable, runs: int) -> List[float]:
+    """Returns wall-clock durations of repeated runs."""
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        await run()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+async def benchmark_workflow(latency: float, runs: int) -> None:
+    """
+    Compares the fanned-out extraction graph against the sequential one using
+    stubbed LLM calls of equal latency. With one refinement-free iteration the
+    sequential critical path is 4 LLM hops; the fanned-out one is 3.
+    """
+    workflow = ContentSuggestionWorkflow()
+    stub_workflow(workflow, latency)
+    sequential_chain = build_sequential_chain(workflow)
+
+    state = WorkflowState(
+        essay_text="Essay",
+        essay_prompt="Prompt",
+        rag_context={"relevant_examples": [{"essay": "Example", "feedback": "Feedback"}]},
+        max_iterations=1
+    )
+
+    async def run_parallel():
+        await workflow.chain.ainvoke(state)
+
+    async def run_sequential():
+        await sequential_chain.ainvoke(state)
+
+    sequential = await time_runs(run_sequential, runs)
+    parallel = await time_runs(run_parallel, runs)
+
+    print(f"Stub LLM latency: {latency * 1000:.0f}ms, runs: {runs}")
+    print(f"Sequential graph: mean {statistics.mean(sequential):.3f}s")
+    print(f"Fanned-out graph: mean {statistics.mean(parallel):.3f}s")
+    print(f"Critical path reduction: {1 - statistics.mean(parallel) / statistics.mean(sequential):.0%}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark ContentSuggestionWorkflow with stubbed LLMs")
+    parser.add_argument("--latency", type=float, default=0.5, help="Stub latency per LLM call in seconds")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    asyncio.run(benchmark_workflow(args.latency, args.runs))
@@ -0,0 +1,52 @@
+import argparse
+import os
+from typing import List, Tuple
+
+# The rules need no API access, but Settings still requires keys
+for key in ("OPENAI_API_KEY", "PINECONE_API_KEY", "COHERE_API_KEY"):
+    os.environ.setdefault(key, "check-word-cut-rules")
+
+from ..services.word_cut_rules import apply_word_cut_rules
+
+# (essay text, expected text after every rule has been applied)
+CASES: List[Tuple[str, str]] = [
+    ("I spoke to the majority of my colleagues.", "I spoke to most of my colleagues."),
+    ("The majority of the team agreed.", "Most of the team agreed."),
+    ("The majority of people agreed.", "Most people agreed."),
+    ("Please let us know the result.", "Please let us know the result."),
+    ("I did this in order to win.", "I did this to win."),
+    ("Very few people came.", "Few people came."),
+    ("I do not know what it is.", "I don't know what it is."),
+    ("We won. We won in order to grow.", "We won. We won to grow."),
+]
+
+def apply_all(text: str) -> str:
+    """Applies every rule edit, from the end so earlier offsets stay valid."""
+    for edit in sorted(apply_word_cut_rules(text, len(text.split())), key=lambda edit: edit.start, reverse=True):
+        text = text[:edit.start] + edit.after + text[edit.end:]
+    return text
+
+def check_word_cut_rules(verbose: bool) -> bool:
+    """
+    Checks that the mechanical word cut rules keep each sample sentence
+    grammatical, since their edits are applied to users' essays as is.
+    """
+    failures = 0
+    for text, expected in CASES:
+        result = apply_all(text)
+        if result != expected:
+            failures += 1
+            print(f"FAIL {text!r}: got {result!r}, expected {expected!r}")
+        elif verbose:
+            print(f"ok   {text!r} -> {result!r}")
+
+    print(f"{len(CASES) - failures}/{len(CASES)} word cut rule cases passed")
+    return failures == 0
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Check the mechanical word cut rules against sample sentences")
+    parser.add_argument("--verbose", action="store_true", help="Print passing cases too")
+    args = parser.parse_args()
+
+    if not check_word_cut_rules(args.verbose):
+        raise SystemExit(1)
@@ -0,0 +1,211 @@
+import argparse
+import asyncio
+import os
+import random
+import re
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+# Stubbed LLMs never reach the network, but Settings still requires keys.
+# Caches stay in memory so stub results never touch the persistent cache file.
+for key in ("OPENAI_API_KEY", "PINECONE_API_KEY", "COHERE_API_KEY"):
+    os.environ.setdefault(key, "concurrency-test")
+os.environ["CACHE_BACKEND"] = "memory"
+
+from ..config import get_settings
+from ..services.models import ContentSuggestion
+from ..services.essay_analyzer_services.content_suggestion_service.agents import model_chains
+from ..services.essay_analyzer_services.content_suggestion_service.content_suggestion_workflow import ContentSuggestionWorkflow
+from ..services.essay_analyzer_services.content_suggestion_service.models import (
+    ContentSuggestionList,
+    FeedbackCriterion,
+    FeedbackFramework,
+    FeedbackResponse,
+    SuggestionFeedback,
+    WritingStyleApplication,
+    WritingStyleApplicationList,
+    WritingStyleAttribute,
+    WritingStyleAttributeList
+)
+
+NUM_SUGGESTIONS = 3
+# A suggestion at version v scores BASE_SCORE + v, so each refinement adds one point
+BASE_SCORE = 4.0
+MODELS = [None, "gpt-4o-mini", "gpt-4o"]
+THRESHOLDS = [6.0, 7.0, 8.0]
+MAX_ITERATIONS = [1, 2, 3, 5]
+
+REQUEST_TAG = re.compile(r"REQ-\d+")
+VERSION_TAG = re.compile(r"(REQ-\d+) s(\d+) v(\d+)")
+
+class RequestConfig(NamedTuple):
+    tag: str
+    model_name: Optional[str]
+    quality_threshold: float
+    max_iterations: int
+    evaluation_mode: str
+
+    @property
+    def expected_version(self) -> int:
+        """Rounds needed to reach the threshold, capped by max_iterations."""
+        return min(int(self.quality_threshold - BASE_SCORE), self.max_iterations)
+
+def _prompt_text(prompt: Any) -> str:
+    return prompt.to_string() if hasattr(prompt, "to_string") else str(prompt)
+
+def _versioned(tag: str, idx: int, version: int) -> ContentSuggestion:
+    return ContentSuggestion(
+        suggestion=f"Suggestion {idx} for {tag}",
+        how_to_apply="Apply it",
+        original_text=f"Original {idx}",
+        improved_version=f"{tag} s{idx} v{version}"
+    )
+
+def _feedback(version: int) -> SuggestionFeedback:
+    return SuggestionFeedback(feedback="Stub", score=BASE_SCORE + version, improvement_areas=[])
+
+# Each responder builds its answer only from the prompt, so a result that leaks
+# into another request's state shows up as a foreign tag or a wrong version.
+RESPONDERS: Dict[type, Callable[[str], Any]] = {
+    WritingStyleApplicationList: lambda _text: WritingStyleApplicationList(
+        applications=[WritingStyleApplication(attribute="Pace", how_to_apply="Vary sentences")]
+    ),
+    FeedbackFramework: lambda _text: FeedbackFramework(
+        criteria=[FeedbackCriterion(name="Clarity", description="Clear", example_feedback="Be clear")]
+    ),
+    ContentSuggestionList: lambda text: ContentSuggestionList(suggestions=[
+        _versioned(REQUEST_TAG.search(text).group(0), idx, 1) for idx in range(NUM_SUGGESTIONS)
+    ]),
+    ContentSuggestion: lambda text: (lambda match: _versioned(
+        match.group(1), int(match.group(2)), int(match.group(3)) + 1
+    ))(VERSION_TAG.search(text)),
+    SuggestionFeedback: lambda text: _feedback(int(VERSION_TAG.search(text).group(3))),
+    FeedbackResponse: lambda text: (lambda feedback: FeedbackResponse(
+        suggestion_feedback=feedback,
+        overall_score=sum(item.score for item in feedback) / len(feedback)
+    ))([_feedback(int(match.group(3))) for match in VERSION_TAG.finditer(text)]),
+}
+
+class RecordingChain:
+    """Stub chain that answers from the prompt and records which request and model called it."""
+
+    def __init__(self, model_name: str, schema: type, calls: List[Tuple[str, str]], max_latency: float) -> None:
+        self.model_name = model_name
+        self.schema = schema
+        self.calls = calls
+        self.max_latency = max_latency
+
+    async def ainvoke(self, prompt: Any) -> Any:
+        text = _prompt_text(prompt)
+        self.calls.append((REQUEST_TAG.search(text).group(0), self.model_name))
+        # Random latency interleaves the requests' LLM calls differently on every run
+        await asyncio.sleep(random.uniform(0, self.max_latency))
+        return RESPONDERS[self.schema](text)
+
+def stub_workflow(workflow: ContentSuggestionWorkflow, calls: List[Tuple[str, str]], max_latency: float) -> None:
+    """Replaces the agents' default-model chains and the per-model chain factory with recording stubs."""
+    default_model = get_settings().model_name
+    workflow.writing_style_agent.attributes = WritingStyleAttributeList(attributes=[
+        WritingStyleAttribute(name="Pace", category="structure", description="Flow")
+    ])
+    for agent in (
+        workflow.writing_style_agent,
+        workflow.feedback_criteria_agent,
+        workflow.content_agent,
+        workflow.feedback_agent
+    ):
+        for name, schema in agent.CHAIN_SCHEMAS.items():
+            setattr(agent, name, RecordingChain(default_model, schema, calls, max_latency))
+
+    model_chains.get_model_chain = lambda model_name, _temperature, schema: RecordingChain(
+        model_name, schema, calls, max_latency
+    )
+
+def build_configs(requests: int) -> List[RequestConfig]:
+    return [
+        RequestConfig(
+            tag=f"REQ-{i}",
+            model_name=MODELS[i % len(MODELS)],
+            quality_threshold=THRESHOLDS[i % len(THRESHOLDS)],
+            max_iterations=MAX_ITERATIONS[i % len(MAX_ITERATIONS)],
+            evaluation_mode="batched" if i % 2 else "parallel"
+        )
+        for i in range(requests)
+    ]
+
+def check_request(
+    config: RequestConfig,
+    suggestions: List[ContentSuggestion],
+    models_used: set
+) -> List[str]:
+    """Returns every way the request's result or LLM calls differ from what its own options imply."""
+    errors = []
+    expected_model = config.model_name or get_settings().model_name
+    if models_used != {expected_model}:
+        errors.append(f"called models {sorted(models_used)}, expected {expected_model}")
+
+    if len(suggestions) != NUM_SUGGESTIONS:
+        errors.append(f"returned {len(suggestions)} suggestions")
+    for suggestion in suggestions:
+        match = VERSION_TAG.fullmatch(suggestion.improved_version)
+        if match.group(1) != config.tag:
+            errors.append(f"returned a suggestion from {match.group(1)}")
+        elif int(match.group(3)) != config.expected_version:
+            errors.append(
+                f"stopped at version {match.group(3)}, expected {config.expected_version} "
+                f"(threshold {config.quality_threshold:g}, max_iterations {config.max_iterations})"
+            )
+    return errors
+
+async def run_concurrency_test(requests: int, max_latency: float) -> bool:
+    """
+    Runs many workflows at once on one shared ContentSuggestionWorkflow, each
+    with its own model, quality threshold, max_iterations and evaluation mode,
+    and checks that every request ran exactly as its own options dictate.
+    """
+    calls: List[Tuple[str, str]] = []
+    workflow = ContentSuggestionWorkflow()
+    stub_workflow(workflow, calls, max_latency)
+    configs = build_configs(requests)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(
+        workflow.generate_content_suggestions(
+            essay_text=f"Essay for {config.tag}",
+            essay_prompt="Prompt",
+            rag_context={"relevant_examples": [
+                {"essay": f"Example essay for {config.tag}", "feedback": f"Example feedback for {config.tag}"}
+            ]},
+            max_iterations=config.max_iterations,
+            quality_threshold=config.quality_threshold,
+            evaluation_mode=config.evaluation_mode,
+            model_name=config.model_name
+        )
+        for config in configs
+    ))
+    elapsed = time.perf_counter() - start
+
+    models_by_request = defaultdict(set)
+    for tag, model_name in calls:
+        models_by_request[tag].add(model_name)
+
+    failures = 0
+    for config, suggestions in zip(configs, results):
+        errors = check_request(config, suggestions, models_by_request[config.tag])
+        if errors:
+            failures += 1
+            print(f"{config.tag}: " + "; ".join(errors))
+
+    print(f"{requests} concurrent workflows, {len(calls)} stub LLM calls in {elapsed:.2f}s")
+    print(f"Requests with cross-request interference: {failures}")
+    return failures == 0
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Check concurrent workflows with different options don't interfere")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--max-latency", type=float, default=0.05, help="Maximum stub latency per LLM call in seconds")
+    args = parser.parse_args()
+
+    if not asyncio.run(run_concurrency_test(args.requests, args.max_latency)):
+        raise SystemExit(1)
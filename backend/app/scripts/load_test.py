@@ -0,0 +1,98 @@
+import argparse
+import asyncio
+import json
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+import httpx
+
+async def timed_post(
+    client: httpx.AsyncClient,
+    path: str,
+    payload: Dict
+) -> Tuple[str, float, int]:
+    """Posts a request and returns the endpoint, latency in seconds and status code."""
+    start = time.perf_counter()
+    response = await client.post(path, json=payload)
+    return path, time.perf_counter() - start, response.status_code
+
+def load_essay() -> Dict:
+    """Loads the first essay from the bundled dataset."""
+    essays_path = Path(__file__).parent.parent.parent / 'data/mba_essays_data.json'
+    with open(essays_path, 'r', encoding='utf-8') as f:
+        return json.load(f)[0]
+
+def build_payloads(essay_data: Dict, word_limit_ratio: float, tag: str) -> Tuple[Dict, Dict]:
+    """
+    Builds an analyze and a cut-words payload from an essay. Every paragraph is
+    prefixed with `tag`, so requests with different tags are distinct: the
+    server can't coalesce them or answer them from its per-paragraph caches.
+    """
+    essay_text = "\n".join(
+        f"[{tag}] {paragraph.strip()}" if paragraph.strip() else paragraph
+        for paragraph in essay_data['essay'].split("\n")
+    )
+    analyze_payload = {
+        "essay_text": essay_text,
+        "essay_prompt": essay_data['prompt'],
+        "user_instructions": "",
+        "school": essay_data['school']
+    }
+    cut_words_payload = {
+        **analyze_payload,
+        "word_limit": int(len(essay_text.split()) * word_limit_ratio)
+    }
+    return analyze_payload, cut_words_payload
+
+async def run_load_test(base_url: str, concurrency: int, word_limit_ratio: float) -> None:
+    """
+    Measures whether concurrent /api/analyze and /api/cut-words requests overlap.
+
+    Runs each endpoint once on its own to get a baseline, then fires `concurrency`
+    requests of each kind at once. If the worker serializes requests, the burst
+    takes roughly the sum of the baselines; if it doesn't, it takes roughly the
+    slowest single request. Each request sends a distinct essay, since identical
+    concurrent requests would be coalesced into one computation.
+    """
+    essay_data = load_essay()
+    analyze_payload, cut_words_payload = build_payloads(essay_data, word_limit_ratio, "baseline")
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=None) as client:
+        print("Measuring sequential baseline...")
+        baseline: Dict[str, float] = {}
+        for path, payload in (("/api/analyze", analyze_payload), ("/api/cut-words", cut_words_payload)):
+            _, latency, status = await timed_post(client, path, payload)
+            baseline[path] = latency
+            print(f"  {path}: {latency:.2f}s (HTTP {status})")
+
+        print(f"Firing {concurrency} concurrent requests per endpoint...")
+        tasks = []
+        for i in range(concurrency):
+            analyze_payload, cut_words_payload = build_payloads(essay_data, word_limit_ratio, f"request {i}")
+            tasks.append(timed_post(client, "/api/analyze", analyze_payload))
+            tasks.append(timed_post(client, "/api/cut-words", cut_words_payload))
+
+        start = time.perf_counter()
+        results: List[Tuple[str, float, int]] = await asyncio.gather(*tasks)
+        wall_time = time.perf_counter() - start
+
+    serialized_time = concurrency * sum(baseline.values())
+    total_latency = sum(latency for _, latency, _ in results)
+    failures = sum(1 for _, _, status in results if status != 200)
+
+    print(f"\nRequests: {len(results)} ({failures} failed)")
+    for path in baseline:
+        latencies = sorted(latency for p, latency, _ in results if p == path)
+        print(f"  {path}: min {latencies[0]:.2f}s, max {latencies[-1]:.2f}s")
+    print(f"Wall time: {wall_time:.2f}s")
+    print(f"Expected wall time if serialized: {serialized_time:.2f}s")
+    print(f"Effective concurrency (sum of latencies / wall time): {total_latency / wall_time:.1f}x")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Concurrent load test for the essay API")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--word-limit-ratio", type=float, default=0.9)
+    args = parser.parse_args()
+
+    asyncio.run(run_load_test(args.base_url, args.concurrency, args.word_limit_ratio))
@@ -0,0 +1,341 @@
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import re
+import time
+from collections import defaultdict
+from functools import lru_cache
+from pathlib import Path
+from types import ModuleType, SimpleNamespace
+from typing import Any, Dict, List, NamedTuple
+
+# Fakes never reach the network, but Settings still requires keys. Caches stay
+# in memory and near-duplicate reuse is off, so every benchmarked request is cold
+# and runs are comparable regardless of what earlier runs left on disk.
+for key in ("OPENAI_API_KEY", "PINECONE_API_KEY", "COHERE_API_KEY"):
+    os.environ.setdefault(key, "offline")
+os.environ["CACHE_BACKEND"] = "memory"
+os.environ["VECTOR_BACKEND"] = "pinecone"
+os.environ["RAG_NEAR_DUPLICATE_THRESHOLD"] = "1.01"
+
+import httpx
+import numpy as np
+from ..services.prompt_budget import count_tokens
+
+EMBEDDING_DIMENSION = 1536
+ESSAYS_PATH = Path(__file__).parent.parent.parent / 'data/mba_essays_data.json'
+
+FILLER = (
+    "the team learned to lead with clarity and purpose while building trust across "
+    "every function and keeping the customer at the center of each hard decision"
+).split()
+
+# Array lengths for structured outputs, by field name
+ARRAY_LENGTHS = {
+    "suggestions": 4,
+    "criteria": 4,
+    "applications": 4,
+    "attributes": 6,
+    "improvement_areas": 2,
+}
+
+class DependencyProfile(NamedTuple):
+    """Simulated cost of one call: a fixed latency plus time per token processed."""
+    latency: float
+    tokens_per_second: float = 0.0
+
+    def seconds(self, tokens: int = 0) -> float:
+        return self.latency + (tokens / self.tokens_per_second if self.tokens_per_second else 0.0)
+
+class FakeProfile(NamedTuple):
+    """
+    Latency model for every external dependency. Chat calls are charged per
+    completion token generated, embeddings and reranks per input token.
+    Jitter spreads each call's time by up to +/- that fraction, derived from
+    a hash of the call's input so the same request always costs the same.
+    time_scale multiplies every simulated delay.
+    """
+    openai_chat: DependencyProfile = DependencyProfile(0.5, 50.0)
+    openai_embeddings: DependencyProfile = DependencyProfile(0.1, 20000.0)
+    pinecone: DependencyProfile = DependencyProfile(0.08)
+    cohere: DependencyProfile = DependencyProfile(0.15, 40000.0)
+    jitter: float = 0.2
+    time_scale: float = 1.0
+
+    def delay(self, dependency: str, tokens: int, digest: bytes) -> float:
+        spread = 1 + self.jitter * (digest[0] / 127.5 - 1)
+        return getattr(self, dependency).seconds(tokens) * spread * self.time_scale
+
+class FakeStats:
+    """Counts calls, tokens and simulated seconds per dependency."""
+
+    def __init__(self) -> None:
+        self.calls: Dict[str, Dict[str, float]] = defaultdict(lambda: {
+            "calls": 0,
+            "input_tokens": 0,
+            "output_tokens": 0,
+            "seconds": 0.0
+        })
+
+    def record(self, dependency: str, input_tokens: int, output_tokens: int, seconds: float) -> None:
+        stats = self.calls[dependency]
+        stats["calls"] += 1
+        stats["input_tokens"] += input_tokens
+        stats["output_tokens"] += output_tokens
+        stats["seconds"] += seconds
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        return {dependency: dict(stats) for dependency, stats in self.calls.items()}
+
+def _digest(text: str) -> bytes:
+    return hashlib.sha256(text.encode("utf-8")).digest()
+
+def _words(digest: bytes, count: int) -> str:
+    start = digest[1] % len(FILLER)
+    return " ".join(FILLER[(start + i) % len(FILLER)] for i in range(count))
+
+def _shorten(sentence: str, words_to_drop: int) -> str:
+    """Drops words after the first one, keeping at least three."""
+    words = sentence.split()
+    keep = max(3, len(words) - words_to_drop)
+    return " ".join(words[:1] + words[len(words) - keep + 1:])
+
+def _sentences(text: str) -> List[str]:
+    return [sentence for sentence in re.split(r"(?<=[.!?])\s+", text.strip()) if len(sentence.split()) >= 6]
+
+def _fake_value(schema: Dict[str, Any], name: str, digest: bytes, prompt: str) -> Any:
+    """Builds a deterministic value for a JSON schema, as a model filling a tool call would."""
+    if "anyOf" in schema:
+        schema = next(option for option in schema["anyOf"] if option.get("type") != "null")
+    if "enum" in schema:
+        return schema["enum"][0]
+
+    schema_type = schema.get("type")
+    if schema_type == "object":
+        return {
+            key: _fake_value(value, key, _digest(key + digest.hex()), prompt)
+            for key, value in schema.get("properties", {}).items()
+        }
+    if schema_type == "array":
+        count = ARRAY_LENGTHS.get(name, 3)
+        batch = re.search(r"Here are the (\d+) content suggestions", prompt)
+        if name == "suggestion_feedback" and batch:
+            count = int(batch.group(1))
+        return [
+            _fake_value(schema.get("items", {}), name, _digest(f"{i}{digest.hex()}"), prompt)
+            for i in range(count)
+        ]
+    if schema_type in ("number", "integer"):
+        # Scores spread over 6.5-10 so some suggestions pass and some get refined
+        score = 6.5 + (digest[2] % 8) * 0.5
+        return int(score) if schema_type == "integer" else score
+    if schema_type == "boolean":
+        return True
+    return _words(digest, 8 + digest[3] % 25)
+
+def _json_response(prompt: str, digest: bytes) -> Dict[str, Any]:
+    """Answers the JSON-mode prompts of OpenAIService callers, recognized by their output structure."""
+    if '"language_edits"' in prompt:
+        match = re.search(r"\*\*Paragraph from the User's Essay:\*\* (.*?)\n\s*2\. \*\*User Instructions", prompt, re.DOTALL)
+        sentences = _sentences(match.group(1)) if match else []
+        return {"language_edits": [
+            {"before": sentence, "after": _shorten(sentence, 2)} for sentence in sentences[:2]
+        ]}
+
+    if '"edits": [' in prompt:
+        match = re.search(r"\*\*User's Essay:\*\* (.*?)\n\s*### Editing Guidelines", prompt, re.DOTALL)
+        words_to_cut = int(re.search(r"Words to Cut: (-?\d+)", prompt).group(1))
+        edits = []
+        for sentence in _sentences(match.group(1)) if match else []:
+            if words_to_cut <= 0:
+                break
+            after = _shorten(sentence, min(4, words_to_cut))
+            cut = len(sentence.split()) - len(after.split())
+            words_to_cut -= cut
+            edits.append({
+                "before": sentence,
+                "after": after,
+                "before_word_count": len(sentence.split()),
+                "after_word_count": len(after.split()),
+                "word_count_diff": cut,
+                "explanation": "Removed words that repeat the point."
+            })
+        return {"edits": edits}
+
+    if '"general_feedback"' in prompt:
+        return {"general_feedback": [
+            {
+                "section": section,
+                "feedback": _words(_digest(section + digest.hex()), 30),
+                "suggestion": f"{section}: " + _words(_digest(digest.hex() + section), 15),
+                "example_application": _words(digest, 40)
+            }
+            for section in ("Introduction", "Body", "Conclusion")
+        ]}
+
+    return {}
+
+class FakeOpenAITransport(httpx.AsyncBaseTransport):
+    """
+    Serves the OpenAI chat completions and embeddings endpoints locally.
+    Structured-output (tool) calls get arguments generated from the tool's
+    JSON schema; JSON-mode calls get answers shaped for the prompt.
+    """
+
+    def __init__(self, profile: FakeProfile, stats: FakeStats) -> None:
+        self.profile = profile
+        self.stats = stats
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        body = json.loads(await request.aread())
+        if request.url.path.endswith("/embeddings"):
+            payload = await self._embeddings(body)
+        elif request.url.path.endswith("/chat/completions"):
+            payload = await self._chat_completion(body)
+        else:
+            return httpx.Response(404, json={"error": {"message": f"Not faked: {request.url.path}"}})
+        return httpx.Response(200, json=payload)
+
+    async def _embeddings(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        texts = body["input"] if isinstance(body["input"], list) else [body["input"]]
+        tokens = sum(count_tokens(text) for text in texts)
+        digest = _digest("".join(texts))
+        delay = self.profile.delay("openai_embeddings", tokens, digest)
+        await asyncio.sleep(delay)
+        self.stats.record("openai_embeddings", tokens, 0, delay)
+
+        data = []
+        for index, text in enumerate(texts):
+            seed = int.from_bytes(_digest(text)[:8], "little")
+            vector = np.random.default_rng(seed).standard_normal(EMBEDDING_DIMENSION).astype(np.float32)
+            vector /= np.linalg.norm(vector)
+            embedding = base64.b64encode(vector.tobytes()).decode("ascii") \
+                if body.get("encoding_format") == "base64" else vector.tolist()
+            data.append({"object": "embedding", "index": index, "embedding": embedding})
+
+        return {
+            "object": "list",
+            "data": data,
+            "model": body["model"],
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens}
+        }
+
+    async def _chat_completion(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        prompt = "\n".join(str(message.get("content") or "") for message in body["messages"])
+        digest = _digest(prompt)
+
+        message: Dict[str, Any] = {"role": "assistant", "content": None}
+        if body.get("tools"):
+            function = body["tools"][0]["function"]
+            arguments = json.dumps(_fake_value(function["parameters"], function["name"], digest, prompt))
+            message["tool_calls"] = [{
+                "id": f"call_{digest.hex()[:24]}",
+                "type": "function",
+                "function": {"name": function["name"], "arguments": arguments}
+            }]
+            completion = arguments
+        else:
+            completion = message["content"] = json.dumps(_json_response(prompt, digest))
+
+        prompt_tokens = count_tokens(prompt)
+        completion_tokens = count_tokens(completion)
+        delay = self.profile.delay("openai_chat", completion_tokens, digest)
+        await asyncio.sleep(delay)
+        self.stats.record("openai_chat", prompt_tokens, completion_tokens, delay)
+
+        return {
+            "id": f"chatcmpl-{digest.hex()[:24]}",
+            "object": "chat.completion",
+            "created": 0,
+            "model": body["model"],
+            "choices": [{
+                "index": 0,
+                "message": message,
+                "finish_reason": "tool_calls" if body.get("tools") else "stop"
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+        }
+
+class FakePineconeIndex:
+    """
+    Stands in for a pinecone Index. Queries block their executor thread for the
+    simulated latency, as the real synchronous client does. Matches reuse the
+    bundled essays with feedback unique to the query vector, so no two queries
+    return identical examples.
+    """
+
+    def __init__(self, profile: FakeProfile, stats: FakeStats) -> None:
+        self.profile = profile
+        self.stats = stats
+        with open(ESSAYS_PATH, 'r', encoding='utf-8') as f:
+            self.essays = json.load(f)
+
+    def query(self, vector: List[float], filter: Dict[str, str], top_k: int, include_metadata: bool) -> Any:
+        digest = hashlib.sha256(np.asarray(vector, dtype=np.float32).tobytes()).digest()
+        delay = self.profile.delay("pinecone", 0, digest)
+        time.sleep(delay)
+        self.stats.record("pinecone", 0, 0, delay)
+
+        start = digest[1] % len(self.essays)
+        matches = []
+        for rank in range(top_k):
+            essay = self.essays[(start + rank) % len(self.essays)]
+            matches.append(SimpleNamespace(score=0.9 - rank * 0.05, metadata={
+                "essay": essay["essay"],
+                "prompt": essay["prompt"],
+                "school": filter.get("school", essay["school"]),
+                "feedback": f"Feedback {digest.hex()[:8]}-{rank}: " + _words(_digest(f"{rank}{digest.hex()}"), 60)
+            }))
+        return SimpleNamespace(matches=matches)
+
+class FakeCohereClient:
+    """Stands in for cohere.AsyncClient, ranking documents in their original order."""
+
+    def __init__(self, profile: FakeProfile, stats: FakeStats) -> None:
+        self.profile = profile
+        self.stats = stats
+
+    async def rerank(self, model: str, query: str, documents: List[str], top_n: int) -> Any:
+        tokens = count_tokens(query) + sum(count_tokens(document) for document in documents)
+        delay = self.profile.delay("cohere", tokens, _digest(query))
+        await asyncio.sleep(delay)
+        self.stats.record("cohere", tokens, 0, delay)
+
+        return SimpleNamespace(results=[
+            SimpleNamespace(index=index, relevance_score=0.95 - index * 0.1)
+            for index in range(min(top_n, len(documents)))
+        ])
+
+def load_offline_app(profile: FakeProfile, stats: FakeStats) -> ModuleType:
+    """
+    Imports app.main with every external dependency replaced by a local fake.
+
+    The OpenAI fake is installed as the shared HTTP client, so it has to be in
+    place before app.main (and with it every agent module) is imported; this
+    must be the first import of app.main in the process. Pinecone and Cohere
+    are swapped on the RAG service's clients afterwards.
+    """
+    from ..services import openai as openai_module
+
+    @lru_cache()
+    def get_fake_http_client() -> httpx.AsyncClient:
+        return httpx.AsyncClient(transport=FakeOpenAITransport(profile, stats))
+
+    openai_module.get_http_client = get_fake_http_client
+    openai_module.get_openai_client.cache_clear()
+
+    from .. import main
+
+    main.rag_service.vector_store.index = FakePineconeIndex(profile, stats)
+    main.rag_service.cohere.client = FakeCohereClient(profile, stats)
+
+    # Keep the generated attribute list in memory instead of overwriting the real artifact
+    writing_style_agent = main.essay_analyzer.content_suggestion_workflow.writing_style_agent
+    writing_style_agent._save_attributes = lambda attributes: None
+    return main
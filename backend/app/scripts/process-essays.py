@@ -1,46 +1,206 @@
+import argparse
 import json
 import asyncio
 import hashlib
+import time
 from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+from openai import RateLimitError
 from ..services.openai import OpenAIService
-from ..services.pinecone import PineconeService, MBAEssayEmbedding
+from ..services.pinecone import MBAEssayEmbedding
+from ..services.vector_store import get_vector_service
 from ..config import get_settings
 
-async def process_essays():
+DATA_PATH = Path(__file__).parent.parent.parent / 'data'
+MANIFEST_VERSION = 1
+
+class RateLimitGate:
+    """
+    Shared backoff for all workers: when any request is rate limited, every
+    worker waits until the cooldown has passed before sending its next request.
+    """
+
+    def __init__(self) -> None:
+        self.resume_at = 0.0
+        self.rate_limited = 0
+
+    async def wait(self) -> None:
+        delay = self.resume_at - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def back_off(self, error: RateLimitError, attempt: int) -> float:
+        """Pauses all workers, honoring the Retry-After header when present."""
+        self.rate_limited += 1
+        retry_after = error.response.headers.get('retry-after') if error.response is not None else None
+        try:
+            delay = float(retry_after)
+        except (TypeError, ValueError):
+            delay = min(2 ** attempt, 60)
+        self.resume_at = max(self.resume_at, time.monotonic() + delay)
+        return delay
+
+class IngestionManifest:
     """
-    Processes MBA essays by generating embeddings and storing them in Pinecone.
-    Handles each essay individually and continues processing if one fails.
+    Records the ids of essays already stored in a vector backend, so a rerun (or a
+    resumed run after a crash) only embeds new or changed essays. Ids are content
+    hashes, so an edited essay gets a new id and is re-ingested.
     """
+
+    def __init__(self, path: Path, target: str) -> None:
+        self.path = path
+        self.target = target
+        self.ids: Set[str] = set()
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('version') != MANIFEST_VERSION or manifest.get('target') != self.target:
+            print(f'Ignoring manifest for a different target: {manifest.get("target")}')
+            return
+        self.ids = set(manifest['ids'])
+
+    def save(self) -> None:
+        """Writes the manifest atomically so a crash mid-write can't corrupt it."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'version': MANIFEST_VERSION,
+                'target': self.target,
+                'ids': sorted(self.ids)
+            }, f)
+        tmp_path.replace(self.path)
+
+def ingestion_target() -> str:
+    """Identifies the vector store being written to, so manifests aren't shared across stores."""
     settings = get_settings()
+    if settings.vector_backend == 'local':
+        return f'local:{Path(settings.local_index_path).resolve()}'
+    return f'pinecone:{settings.pinecone_index_name}'
+
+def build_embedding(essay_data: Dict[str, Any]) -> MBAEssayEmbedding:
+    """Builds the embedding record (without values) for one essay from the dataset."""
+    essay_text = essay_data['essay'].strip()
+    return MBAEssayEmbedding(
+        id=generate_unique_id(essay_data['school'], essay_data['prompt'], essay_text),
+        values=[],
+        metadata={
+            'essay': essay_text,
+            'prompt': essay_data['prompt'],
+            'school': essay_data['school'],
+            'feedback': essay_data['feedback'] if 'feedback' in essay_data else ''
+        }
+    )
+
+async def embed_batch(
+    openai: OpenAIService,
+    gate: RateLimitGate,
+    texts: List[str],
+    max_retries: int
+) -> List[List[float]]:
+    """Embeds a batch of texts, backing off on rate limits."""
+    for attempt in range(max_retries + 1):
+        await gate.wait()
+        try:
+            return await openai.generate_embeddings(texts)
+        except RateLimitError as error:
+            if attempt == max_retries:
+                raise
+            delay = gate.back_off(error, attempt)
+            print(f'Rate limited; pausing all workers for {delay:g}s')
+
+async def process_essays(
+    batch_size: int = 64,
+    concurrency: int = 4,
+    checkpoint_every: int = 10,
+    max_retries: int = 5,
+    essays_path: Optional[Path] = None,
+    manifest_path: Optional[Path] = None
+):
+    """
+    Processes MBA essays by generating embeddings and storing them in the configured vector store.
+
+    Essays are embedded and upserted in batches by a bounded number of concurrent
+    workers. Essays listed in the manifest are skipped, and the manifest is
+    checkpointed every few batches, so an interrupted run resumes where it left off.
+    A failed batch is reported and retried on the next run.
+    """
     openai = OpenAIService()
-    pinecone = PineconeService()
+    vector_store = get_vector_service()
+    await vector_store.initialize()
 
-    essays_path = Path(__file__).parent.parent.parent / 'data/mba_essays_data.json'
+    essays_path = essays_path or DATA_PATH / 'mba_essays_data.json'
     with open(essays_path, 'r', encoding='utf-8') as f:
         essays_data = json.load(f)
 
-    for i, essay_data in enumerate(essays_data):
-        try:
-            essay_text = essay_data['essay'].strip()
-            embedding = openai.generate_embedding(essay_text)
-            
-            essay_embedding = MBAEssayEmbedding(
-                id=generate_unique_id(essay_data['school'], essay_data['prompt'], essay_text),
-                values=embedding,
-                metadata={
-                    'essay': essay_text,
-                    'prompt': essay_data['prompt'],
-                    'school': essay_data['school'],
-                    'feedback': essay_data['feedback'] if 'feedback' in essay_data else ''
-                }
-            )
-            
-            pinecone.store_essay_embedding(essay_embedding)
-            await asyncio.sleep(0.2)
-            
-        except Exception as error:
-            print(f'Error processing essay {i+1}: {str(error)}')
-            continue
+    manifest = IngestionManifest(manifest_path or DATA_PATH / 'ingestion_manifest.json', ingestion_target())
+
+    # Deduplicate within the dataset as well as against the manifest
+    pending: Dict[str, MBAEssayEmbedding] = {}
+    for essay_data in essays_data:
+        embedding = build_embedding(essay_data)
+        if embedding.id not in manifest.ids:
+            pending[embedding.id] = embedding
+    skipped = len(essays_data) - len(pending)
+
+    records = list(pending.values())
+    batches = [records[i:i + batch_size] for i in range(0, len(records), batch_size)]
+    print(f'{len(essays_data)} essays: {skipped} already indexed or duplicated, {len(records)} to ingest in {len(batches)} batches')
+
+    gate = RateLimitGate()
+    semaphore = asyncio.Semaphore(concurrency)
+    checkpoint_lock = asyncio.Lock()
+    stored_ids: List[str] = []
+    stats = {'stored': 0, 'failed': 0, 'batches_done': 0}
+    start = time.perf_counter()
+
+    async def checkpoint() -> None:
+        # Persist vectors first so the manifest never lists an essay that isn't durable
+        await vector_store.flush()
+        manifest.ids.update(stored_ids)
+        stored_ids.clear()
+        manifest.save()
+
+    async def process_batch(batch: List[MBAEssayEmbedding]) -> None:
+        async with semaphore:
+            try:
+                embeddings = await embed_batch(
+                    openai, gate, [record.metadata['essay'] for record in batch], max_retries
+                )
+                await vector_store.store_essay_embeddings([
+                    record.model_copy(update={'values': values})
+                    for record, values in zip(batch, embeddings)
+                ])
+            except Exception as error:
+                stats['failed'] += len(batch)
+                print(f'Error processing batch of {len(batch)} essays: {str(error)}')
+                return
+
+        async with checkpoint_lock:
+            stored_ids.extend(record.id for record in batch)
+            stats['stored'] += len(batch)
+            stats['batches_done'] += 1
+            if stats['batches_done'] % checkpoint_every == 0:
+                await checkpoint()
+                elapsed = time.perf_counter() - start
+                print(f'Checkpoint: {stats["stored"]}/{len(records)} essays, {stats["stored"] / elapsed:.1f} essays/s')
+
+    try:
+        await asyncio.gather(*(process_batch(batch) for batch in batches))
+    finally:
+        async with checkpoint_lock:
+            await checkpoint()
+
+    elapsed = time.perf_counter() - start
+    print(
+        f'Ingested {stats["stored"]} essays in {elapsed:.1f}s '
+        f'({stats["stored"] / elapsed if elapsed else 0:.1f} essays/s), '
+        f'skipped {skipped}, failed {stats["failed"]}, rate limited {gate.rate_limited} times'
+    )
 
 def generate_unique_id(school, prompt, content):
     """
@@ -51,4 +211,20 @@ def generate_unique_id(school, prompt, content):
     return hashlib.sha256(combined.encode('utf-8')).hexdigest()
 
 if __name__ == '__main__':
-    asyncio.run(process_essays())
+    parser = argparse.ArgumentParser(description="Embed and index the MBA essay dataset")
+    parser.add_argument("--batch-size", type=int, default=64, help="Essays per embedding request")
+    parser.add_argument("--concurrency", type=int, default=4, help="Batches in flight at once")
+    parser.add_argument("--checkpoint-every", type=int, default=10, help="Batches between manifest checkpoints")
+    parser.add_argument("--max-retries", type=int, default=5, help="Retries per batch when rate limited")
+    parser.add_argument("--essays-path", type=Path, default=None)
+    parser.add_argument("--manifest-path", type=Path, default=None)
+    args = parser.parse_args()
+
+    asyncio.run(process_essays(
+        batch_size=args.batch_size,
+        concurrency=args.concurrency,
+        checkpoint_every=args.checkpoint_every,
+        max_retries=args.max_retries,
+        essays_path=args.essays_path,
+        manifest_path=args.manifest_path
+    ))
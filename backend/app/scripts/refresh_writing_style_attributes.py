@@ -0,0 +1,17 @@
+import asyncio
+from ..services.essay_analyzer_services.content_suggestion_service.agents.writing_style_agent import (
+    WritingStyleExtractionAgent,
+    ATTRIBUTES_ARTIFACT_PATH
+)
+
+async def refresh_writing_style_attributes():
+    """
+    Regenerates the essay-independent writing style attribute list and
+    overwrites the persisted artifact loaded by the API at startup.
+    """
+    agent = WritingStyleExtractionAgent()
+    attributes = await agent.refresh_attributes()
+    print(f'Saved {len(attributes.attributes)} attributes to {ATTRIBUTES_ARTIFACT_PATH}')
+
+if __name__ == '__main__':
+    asyncio.run(refresh_writing_style_attributes())
@@ -1,42 +1,163 @@
-from typing import Optional, Any, Dict
-from cachetools import LRUCache
+from typing import Optional, Any, Dict, NamedTuple
+from collections import OrderedDict
 from dataclasses import dataclass
+from pydantic import BaseModel
+from .persistent_cache import CacheBackend
+import hashlib
+import sys
+import time
 
 @dataclass
 class CacheOptions:
     max_size: int = 500
     ttl: int = 3600
+    max_bytes: int = 64 * 1024 * 1024
+
+class CacheEntry(NamedTuple):
+    value: Any
+    expires_at: float
+    size: int
+
+def estimate_size(value: Any) -> int:
+    """Approximates the memory footprint of a value in bytes, including nested items."""
+    if isinstance(value, BaseModel):
+        return sys.getsizeof(value) + estimate_size(value.__dict__)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            estimate_size(k) + estimate_size(v) for k, v in value.items()
+        )
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(estimate_size(item) for item in value)
+    return sys.getsizeof(value)
 
 class CacheService:
-    def __init__(self, options: Optional[CacheOptions] = None):
+    """
+    In-memory LRU cache with per-entry TTLs and an approximate byte budget.
+    Keys are stored as SHA-256 digests so long keys (e.g. full essays) aren't retained.
+
+    An optional persistent backend acts as a second tier: writes go to both tiers,
+    and in-memory misses fall through to it, promoting hits back into memory.
+    """
+
+    def __init__(
+        self,
+        options: Optional[CacheOptions] = None,
+        backend: Optional[CacheBackend] = None
+    ):
         if options is None:
             options = CacheOptions()
-        self.cache = LRUCache(maxsize=options.max_size)
+        self.options = options
+        self.backend = backend
+        self.cache: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.backend_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _hash_key(self, key: str) -> str:
+        """Hashes a key to a fixed-size digest."""
+        return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+    def _get_entry(self, hashed_key: str) -> Optional[CacheEntry]:
+        """Returns a live entry, dropping it if it has expired."""
+        entry = self.cache.get(hashed_key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            self._remove(hashed_key)
+            self.expirations += 1
+            return None
+        return entry
+
+    def _remove(self, hashed_key: str) -> None:
+        entry = self.cache.pop(hashed_key)
+        self.bytes -= entry.size
+
+    def _store(self, hashed_key: str, value: Any, expires_at: float) -> None:
+        """Puts an entry into the in-memory tier and enforces its limits."""
+        if hashed_key in self.cache:
+            self._remove(hashed_key)
+
+        size = estimate_size(value)
+        if size > self.options.max_bytes:
+            return
+
+        self.cache[hashed_key] = CacheEntry(value, expires_at, size)
+        self.bytes += size
+        self._evict()
+
+    def _evict(self) -> None:
+        """Evicts least recently used entries until both the count and byte limits hold."""
+        while self.cache and (
+            len(self.cache) > self.options.max_size or self.bytes > self.options.max_bytes
+        ):
+            self._remove(next(iter(self.cache)))
+            self.evictions += 1
 
     def get(self, key: str) -> Optional[Any]:
         """Retrieve a value from cache by key."""
-        return self.cache.get(key)
+        hashed_key = self._hash_key(key)
+        entry = self._get_entry(hashed_key)
+        if entry is not None:
+            self.cache.move_to_end(hashed_key)
+            self.hits += 1
+            return entry.value
+
+        if self.backend is not None:
+            stored = self.backend.get(hashed_key)
+            if stored is not None:
+                value, expires_at = stored
+                remaining_ttl = expires_at - time.time()
+                self._store(hashed_key, value, time.monotonic() + remaining_ttl)
+                self.backend_hits += 1
+                return value
+
+        self.misses += 1
+        return None
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        """Store a value in cache, expiring after ttl seconds (defaults to the cache's ttl)."""
+        hashed_key = self._hash_key(key)
+        ttl = self.options.ttl if ttl is None else ttl
+        self._store(hashed_key, value, time.monotonic() + ttl)
 
-    def set(self, key: str, value: Any) -> None:
-        """Store a value in cache."""
-        self.cache[key] = value
+        if self.backend is not None:
+            self.backend.set(hashed_key, value, time.time() + ttl)
 
     def has(self, key: str) -> bool:
         """Check if key exists in cache."""
-        return key in self.cache
+        hashed_key = self._hash_key(key)
+        if self._get_entry(hashed_key) is not None:
+            return True
+        return self.backend is not None and self.backend.get(hashed_key) is not None
 
     def delete(self, key: str) -> None:
         """Remove a key from cache."""
-        if key in self.cache:
-            del self.cache[key]
+        hashed_key = self._hash_key(key)
+        if hashed_key in self.cache:
+            self._remove(hashed_key)
+        if self.backend is not None:
+            self.backend.delete(hashed_key)
 
     def clear(self) -> None:
         """Clear all cached items."""
         self.cache.clear()
+        self.bytes = 0
+        if self.backend is not None:
+            self.backend.clear()
 
     def get_stats(self) -> Dict[str, int]:
-        """Return current cache size and max size."""
+        """Return in-memory size, byte usage, limits and hit/miss/eviction counts."""
         return {
             "size": len(self.cache),
-            "max_size": self.cache.maxsize
+            "max_size": self.options.max_size,
+            "bytes": self.bytes,
+            "max_bytes": self.options.max_bytes,
+            "hits": self.hits,
+            "backend_hits": self.backend_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations
         }
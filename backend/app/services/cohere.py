@@ -1,39 +1,63 @@
-from cohere import Client
+from cohere import AsyncClient
 from ..config import get_settings
 from typing import List
-from .pinecone import MBAEssaySearchResult
+from .pinecone import MBAEssaySearchResult, SearchResults
+from .prompt_budget import PromptBudget
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
 
 class CohereService:
     RELEVANCE_THRESHOLD = 0.3
+    TOP_N = 6
 
     def __init__(self):
         self.settings = get_settings()
-        self.client = Client(api_key=self.settings.cohere_api_key)
+        self.client = AsyncClient(api_key=self.settings.cohere_api_key)
+        # Caps the number of in-flight rerank calls across all requests
+        self.semaphore = asyncio.Semaphore(self.settings.cohere_max_concurrency)
 
     async def rerank_results(
         self,
         query: str,
         results: List[MBAEssaySearchResult]
-    ) -> List[MBAEssaySearchResult]:
-        """Reranks search results by relevance using Cohere and filters low-scoring matches."""
+    ) -> SearchResults:
+        """
+        Reranks search results by relevance using Cohere and filters low-scoring matches.
+        Falls back to the original vector search order, marked degraded, if the
+        rerank call fails or misses its deadline.
+        """
         if not results:
-            return results
+            return SearchResults()
 
-        documents = [
+        # Rerank latency grows with document length; cap each document so none is dropped
+        max_document_tokens = self.settings.cohere_max_document_tokens
+        budget = PromptBudget("cohere_rerank", max_document_tokens * len(results))
+        documents = budget.add_ranked("documents", [
             f"School: {result.school}\nPrompt: {result.prompt}\nEssay: {result.essay}\nFeedback: {result.feedback}"
             for result in results
-        ]
-        
-        reranked_results = self.client.rerank(
-            model="rerank-v3.5",
-            query=query,
-            documents=documents,
-            top_n=6
-        )
+        ], max_item_tokens=max_document_tokens)
+        budget.record()
+
+        try:
+            reranked_results = await asyncio.wait_for(
+                self._rerank(query, documents),
+                timeout=self.settings.cohere_rerank_timeout
+            )
+        except asyncio.TimeoutError:
+            logger.warning(
+                f"Cohere rerank exceeded {self.settings.cohere_rerank_timeout:g}s, "
+                "falling back to vector search order"
+            )
+            return SearchResults(results=results[:self.TOP_N], degraded=True)
+        except Exception as e:
+            logger.error(f"Cohere rerank failed, falling back to vector search order: {str(e)}")
+            return SearchResults(results=results[:self.TOP_N], degraded=True)
 
         filtered_results = []
         for reranked in reranked_results.results:
-            print(f"Reranked score: {reranked}")
+            logger.debug(f"Reranked score: {reranked.relevance_score} (index {reranked.index})")
             if reranked.relevance_score >= self.RELEVANCE_THRESHOLD:
                 original_result = results[reranked.index]
                 filtered_results.append(MBAEssaySearchResult(
@@ -43,5 +67,15 @@ class CohereService:
                     school=original_result.school,
                     feedback=original_result.feedback
                 ))
-                
-        return filtered_results
+
+        return SearchResults(results=filtered_results)
+
+    async def _rerank(self, query: str, documents: List[str]):
+        """Issues the rerank call once a concurrency slot is available."""
+        async with self.semaphore:
+            return await self.client.rerank(
+                model=self.settings.cohere_rerank_model,
+                query=query,
+                documents=documents,
+                top_n=self.TOP_N
+            )
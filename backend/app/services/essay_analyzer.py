@@ -1,7 +1,9 @@
 from fastapi import HTTPException
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
 from .models import (
     AnalysisResponse,
     AnalysisRequest,
+    ComponentStatus,
     ContentSuggestion,
     LanguageEdit,
     GeneralFeedbackItem
@@ -10,7 +12,9 @@ from .rag import RAGContext
 from .essay_analyzer_services.language_edit_service import LanguageEditService
 from .essay_analyzer_services.general_feedback_service import GeneralFeedbackService
 from .essay_analyzer_services.content_suggestion_service.content_suggestion_workflow import ContentSuggestionWorkflow
+from .tracing import span
 from ..config import get_settings
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
@@ -18,12 +22,12 @@ logger = logging.getLogger(__name__)
 class EssayAnalyzer:
     def __init__(self) -> None:
         self.settings = get_settings()
-        
+
         # Initialize services
         self.language_edit_service = LanguageEditService()
         self.general_feedback_service = GeneralFeedbackService()
         self.content_suggestion_workflow = ContentSuggestionWorkflow()
-        
+
         logger.info("EssayAnalyzer initialized")
 
     async def analyze(
@@ -32,46 +36,205 @@ class EssayAnalyzer:
         essay_prompt: str,
         user_instructions: str,
         context: RAGContext,
-        school: str
+        school: str,
+        evaluation_mode: Optional[str] = None,
+        model_name: Optional[str] = None,
+        quality_threshold: Optional[float] = None,
+        max_iterations: Optional[int] = None
     ) -> AnalysisResponse:
         """
         Analyzes an MBA admission essay and returns detailed feedback.
-        
-        Processes the essay in parallel to generate content suggestions,
-        language improvements, and general feedback using the provided context.
-        
-        Raises HTTPException if the analysis fails.
+
+        Runs content suggestions, language improvements, and general feedback
+        as concurrent tasks, each bounded by its own deadline. Components that
+        fail or time out are returned empty and flagged in component_status.
+
+        evaluation_mode, model_name, quality_threshold and max_iterations override
+        the content suggestion workflow's defaults for this request.
+
+        Raises HTTPException only if every component fails.
         """
-        try:
-            logger.info(f"Starting essay analysis for {school}")
-            
-            # Generate all feedback types in parallel for better performance
-            content_suggestions_task = self.content_suggestion_workflow.generate_content_suggestions(
-                essay_text, essay_prompt, context.model_dump(), user_instructions, school
-            )
-            
-            language_edits_task = self.language_edit_service.generate_edits(
-                essay_text, user_instructions
-            )
-            
-            general_feedback_task = self.general_feedback_service.generate_feedback(
-                essay_text, essay_prompt, user_instructions, context, school
+        logger.info(f"Starting essay analysis for {school}")
+
+        branches = self._start_branches(
+            essay_text, essay_prompt, user_instructions, context, school,
+            evaluation_mode=evaluation_mode,
+            model_name=model_name,
+            quality_threshold=quality_threshold,
+            max_iterations=max_iterations
+        )
+        outcomes = dict(zip(branches, await asyncio.gather(*(
+            self._run_branch(name, task, timeout)
+            for name, (task, timeout) in branches.items()
+        ))))
+        component_status = {name: status for name, (_, status) in outcomes.items()}
+
+        if all(status.status != "ok" for status in component_status.values()):
+            error_msg = "Error analyzing essay: " + "; ".join(
+                f"{name}: {status.error}" for name, status in component_status.items()
             )
+            logger.error(error_msg)
+            raise HTTPException(status_code=500, detail=error_msg)
 
-            # Await all responses
-            content_suggestions = await content_suggestions_task
-            language_edits = await language_edits_task
-            general_feedback = await general_feedback_task
+        logger.info("Finished generating feedback components", extra={
+            "component_status": {
+                name: status.status for name, status in component_status.items()
+            }
+        })
 
-            logger.info("Successfully generated all feedback components")
+        return AnalysisResponse(
+            content_suggestions=outcomes["content_suggestions"][0],
+            language_edits=outcomes["language_edits"][0],
+            general_feedback=outcomes["general_feedback"][0],
+            component_status=component_status
+        )
 
-            return AnalysisResponse(
-                content_suggestions=content_suggestions,
-                language_edits=language_edits,
-                general_feedback=general_feedback
-            )
+    async def analyze_stream(
+        self,
+        essay_text: str,
+        essay_prompt: str,
+        user_instructions: str,
+        context: RAGContext,
+        school: str,
+        evaluation_mode: Optional[str] = None,
+        model_name: Optional[str] = None,
+        quality_threshold: Optional[float] = None,
+        max_iterations: Optional[int] = None
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Streaming variant of analyze.
+
+        Yields (event, data) pairs: one event per component as soon as it
+        finishes, 'progress' events for each content-suggestion workflow step,
+        and a final 'done' event with the status of every component.
+        """
+        logger.info(f"Starting streamed essay analysis for {school}")
+        queue: asyncio.Queue = asyncio.Queue()
+
+        async def on_progress(progress: Dict[str, Any]) -> None:
+            await queue.put(("progress", progress))
+
+        async def run_and_report(name: str, task: asyncio.Task, timeout: float) -> None:
+            result, status = await self._run_branch(name, task, timeout)
+            await queue.put((name, {
+                name: [item.model_dump() for item in result],
+                "status": status.model_dump()
+            }))
+
+        branches = self._start_branches(
+            essay_text, essay_prompt, user_instructions, context, school,
+            evaluation_mode=evaluation_mode,
+            model_name=model_name,
+            quality_threshold=quality_threshold,
+            max_iterations=max_iterations,
+            progress_callback=on_progress
+        )
+        reporters = [
+            asyncio.create_task(run_and_report(name, task, timeout))
+            for name, (task, timeout) in branches.items()
+        ]
+
+        try:
+            component_status: Dict[str, Dict[str, Any]] = {}
+            while len(component_status) < len(branches):
+                event, data = await queue.get()
+                if event in branches:
+                    component_status[event] = data["status"]
+                yield event, data
+
+            yield "done", {"component_status": component_status}
+
+        finally:
+            # Stop any outstanding work if the client disconnects mid-stream
+            for task in reporters + [task for task, _ in branches.values()]:
+                task.cancel()
+
+    def _start_branches(
+        self,
+        essay_text: str,
+        essay_prompt: str,
+        user_instructions: str,
+        context: RAGContext,
+        school: str,
+        evaluation_mode: Optional[str] = None,
+        model_name: Optional[str] = None,
+        quality_threshold: Optional[float] = None,
+        max_iterations: Optional[int] = None,
+        progress_callback: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None
+    ) -> Dict[str, Tuple[asyncio.Task, float]]:
+        """Starts every analysis branch as a task, in its own span, and pairs it with its deadline."""
+        # Options the request left unset keep the workflow's defaults
+        workflow_options = {
+            name: value for name, value in {
+                "evaluation_mode": evaluation_mode,
+                "model_name": model_name,
+                "quality_threshold": quality_threshold,
+                "max_iterations": max_iterations
+            }.items()
+            if value is not None
+        }
+        return {
+            "content_suggestions": (
+                self._start_branch(
+                    "content_suggestions",
+                    self.content_suggestion_workflow.generate_content_suggestions(
+                        essay_text, essay_prompt, context.model_dump(), user_instructions, school,
+                        time_budget=self.settings.content_suggestions_timeout,
+                        progress_callback=progress_callback,
+                        **workflow_options
+                    )
+                ),
+                self.settings.content_suggestions_timeout
+            ),
+            "language_edits": (
+                self._start_branch(
+                    "language_edits",
+                    self.language_edit_service.generate_edits(
+                        essay_text, user_instructions
+                    )
+                ),
+                self.settings.language_edits_timeout
+            ),
+            "general_feedback": (
+                self._start_branch(
+                    "general_feedback",
+                    self.general_feedback_service.generate_feedback(
+                        essay_text, essay_prompt, user_instructions, context, school
+                    )
+                ),
+                self.settings.general_feedback_timeout
+            ),
+        }
+
+    def _start_branch(self, name: str, branch: Awaitable[List[Any]]) -> asyncio.Task:
+        """Runs a branch as a task under an analyzer.<name> span; a timed-out branch's span ends as cancelled."""
+        async def run() -> List[Any]:
+            with span(f"analyzer.{name}"):
+                return await branch
+
+        return asyncio.create_task(run())
+
+    async def _run_branch(
+        self,
+        name: str,
+        task: Awaitable[List[Any]],
+        timeout: float
+    ) -> Tuple[List[Any], ComponentStatus]:
+        """
+        Awaits a single analysis branch within its deadline.
+
+        Returns the branch result with an 'ok' status, or an empty list with
+        a 'timeout'/'failed' status instead of propagating the error.
+        """
+        try:
+            result = await asyncio.wait_for(task, timeout=timeout)
+            return result, ComponentStatus(status="ok")
+
+        except asyncio.TimeoutError:
+            error_msg = f"{name} did not complete within {timeout:g}s"
+            logger.warning(error_msg)
+            return [], ComponentStatus(status="timeout", error=error_msg)
 
         except Exception as e:
-            error_msg = f"Error analyzing essay: {str(e)}"
-            logger.error(error_msg)
-            raise HTTPException(status_code=500, detail=error_msg) 
\ No newline at end of file
+            logger.error(f"Error generating {name}: {str(e)}")
+            return [], ComponentStatus(status="failed", error=str(e))
@@ -1,11 +1,18 @@
-from typing import Dict
+from typing import Dict, Optional
+import asyncio
 import json
+import time
 import logging
 from langchain.prompts import ChatPromptTemplate
 from langchain_openai import ChatOpenAI
 from .....config import get_settings
+from ....openai import get_http_client
+from ....tracing import llm_tracing_handler
+from .model_chains import ModelChainsMixin
 from ..models import (
+    ContentSuggestion,
     ContentSuggestionList,
+    SuggestionFeedback,
     WritingStyleApplicationList,
     WorkflowState
 )
@@ -14,16 +21,24 @@ from ..models import (
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
-class ContentSuggestionAgent:
+class ContentSuggestionAgent(ModelChainsMixin):
     """Generates and refines content suggestions for MBA essays using LLMs."""
     
+    TEMPERATURE = 0.7
+    CHAIN_SCHEMAS = {
+        "initial_chain": ContentSuggestionList,
+        "refinement_chain": ContentSuggestion
+    }
+    
     def __init__(self):
         logger.info("Initializing ContentSuggestionAgent")
         
         self.llm = ChatOpenAI(
             model=settings.model_name,
-            temperature=0.7,
-            api_key=settings.openai_api_key
+            temperature=self.TEMPERATURE,
+            api_key=settings.openai_api_key,
+            http_async_client=get_http_client(),
+            callbacks=[llm_tracing_handler]
         )
 
         self.initial_chain = self.llm.with_structured_output(
@@ -31,7 +46,7 @@ class ContentSuggestionAgent:
             method="function_calling"
         )
         self.refinement_chain = self.llm.with_structured_output(
-            ContentSuggestionList,
+            ContentSuggestion,
             method="function_calling"
         )
 
@@ -69,20 +84,21 @@ class ContentSuggestionAgent:
         ])
 
         self.refinement_prompt = ChatPromptTemplate.from_messages([
-            ("system", """You are an expert MBA admissions essay coach. Refine suggestions
+            ("system", """You are an expert MBA admissions essay coach. Refine a suggestion
             based on feedback while maintaining alignment with writing style techniques."""),
             
-            ("human", """Previous Suggestions with Feedback:
-            {previous_suggestions}
+            ("human", """Previous Suggestion with Feedback:
+            {previous_suggestion}
             
             {writing_style_attributes}
             
-            Refine each suggestion to address its feedback while maintaining effective
-            writing style techniques and patterns.""")
+            Refine the suggestion to address its feedback while maintaining effective
+            writing style techniques and patterns. Keep the same original_text.""")
         ])
 
     async def generate_initial_suggestions(self, state: WorkflowState) -> WorkflowState:
         """Generates content suggestions based on the essay and writing style attributes."""
+        state.round_started_at = time.monotonic()
         logger.debug("Generating initial suggestions", extra={
             "essay_length": len(state.essay_text),
             "prompt_length": len(state.essay_prompt)
@@ -98,30 +114,64 @@ class ContentSuggestionAgent:
             )
         })
         
-        response = await self.initial_chain.ainvoke(formatted_prompt)
+        response = await self.chain_for("initial_chain", state.model_name).ainvoke(formatted_prompt)
         state.suggestions = response
         return state
 
     async def refine_suggestions(self, state: WorkflowState) -> WorkflowState:
-        """Updates existing suggestions based on feedback."""
+        """
+        Refines only the suggestions that scored below the quality threshold,
+        concurrently. Suggestions that passed are kept as-is, and only the refined
+        ones are marked for re-evaluation.
+        """
         if not state.feedback:
             logger.debug("No feedback provided for refinement, skipping")
             return state
             
-        formatted_prompt = await self.refinement_prompt.ainvoke({
-            "previous_suggestions": self._format_suggestions_with_feedback(
-                state.suggestions,
-                state.feedback
-            ),
-            "writing_style_attributes": self._format_writing_style_attributes(
-                state.writing_style_analysis.applications
+        state.round_started_at = time.monotonic()
+        failing = [
+            idx for idx, feedback_item in enumerate(state.feedback.suggestion_feedback)
+            if feedback_item.score < state.quality_threshold
+        ]
+        writing_style_attributes = self._format_writing_style_attributes(
+            state.writing_style_analysis.applications
+        )
+        logger.info(
+            "Refining suggestions below threshold",
+            extra={"refining": len(failing), "num_suggestions": len(state.suggestions.suggestions)}
+        )
+        
+        refined = await asyncio.gather(*(
+            self._refine_suggestion(
+                state.suggestions.suggestions[idx],
+                state.feedback.suggestion_feedback[idx],
+                writing_style_attributes,
+                state.model_name
             )
-        })
+            for idx in failing
+        ))
         
-        response = await self.refinement_chain.ainvoke(formatted_prompt)
-        state.suggestions = response
+        suggestions = list(state.suggestions.suggestions)
+        for idx, suggestion in zip(failing, refined):
+            suggestions[idx] = suggestion
+        state.suggestions = ContentSuggestionList(suggestions=suggestions)
+        state.suggestions_to_evaluate = failing
         return state
 
+    async def _refine_suggestion(
+        self,
+        suggestion: ContentSuggestion,
+        feedback_item: SuggestionFeedback,
+        writing_style_attributes: str,
+        model_name: Optional[str] = None
+    ) -> ContentSuggestion:
+        """Refines a single suggestion against its own feedback."""
+        formatted_prompt = await self.refinement_prompt.ainvoke({
+            "previous_suggestion": self._format_suggestion_with_feedback(suggestion, feedback_item),
+            "writing_style_attributes": writing_style_attributes
+        })
+        return await self.chain_for("refinement_chain", model_name).ainvoke(formatted_prompt)
+
     def _format_writing_style_attributes(self, applications: WritingStyleApplicationList) -> str:
         """Formats writing style attributes into a structured string."""
         return (
@@ -133,32 +183,24 @@ class ContentSuggestionAgent:
             ])
         )
 
-    def _format_suggestions_with_feedback(
+    def _format_suggestion_with_feedback(
         self,
-        suggestions: ContentSuggestionList,
-        feedback: Dict
+        suggestion: ContentSuggestion,
+        feedback_item: SuggestionFeedback
     ) -> str:
-        """Combines suggestions and feedback into a formatted string."""
-        formatted_items = []
+        """Combines a suggestion and its feedback into a formatted string."""
+        suggestion_dict = {
+            "suggestion": suggestion.suggestion,
+            "how_to_apply": suggestion.how_to_apply,
+            "original_text": suggestion.original_text,
+            "improved_version": suggestion.improved_version
+        }
         
-        for idx, (suggestion, feedback_item) in enumerate(
-            zip(suggestions.suggestions, feedback.suggestion_feedback), 1
-        ):
-            suggestion_dict = {
-                "suggestion": suggestion.suggestion,
-                "example_inspiration": suggestion.example_inspiration,
-                "how_to_apply": suggestion.how_to_apply,
-                "example_application": suggestion.example_application
-            }
-            
-            formatted_items.append(
-                f"Suggestion {idx}:\n"
-                f"{json.dumps(suggestion_dict, indent=2)}\n\n"
-                f"Feedback for this suggestion:\n"
-                f"Score: {feedback_item.score}\n"
-                f"Feedback: {feedback_item.feedback}\n"
-                f"Areas for Improvement:\n" + 
-                "\n".join(f"- {area}" for area in feedback_item.improvement_areas)
-            )
-        
-        return "\n\n" + "="*50 + "\n\n".join(formatted_items) 
\ No newline at end of file
+        return (
+            f"{json.dumps(suggestion_dict, indent=2)}\n\n"
+            f"Feedback for this suggestion:\n"
+            f"Score: {feedback_item.score}\n"
+            f"Feedback: {feedback_item.feedback}\n"
+            f"Areas for Improvement:\n" +
+            "\n".join(f"- {area}" for area in feedback_item.improvement_areas)
+        )
@@ -1,29 +1,43 @@
-from typing import Annotated
+from typing import Annotated, List, Optional
 from langchain.prompts import ChatPromptTemplate
 from langchain_openai import ChatOpenAI
 from .....config import get_settings
+from ....openai import get_http_client
+from ....tracing import llm_tracing_handler
+from .model_chains import ModelChainsMixin
 from ..models import (
-    SuggestionFeedback, FeedbackResponse,
+    SuggestionFeedback, FeedbackResponse, ContentSuggestionList,
     ContentSuggestion, WorkflowState, FeedbackFramework
 )
 import logging
 import asyncio
 import json
+import time
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
-class FeedbackAgent:
-    """Evaluates content suggestions using a standardized evaluation framework."""
+class FeedbackAgent(ModelChainsMixin):
+    """
+    Evaluates content suggestions using a standardized evaluation framework.
+    Per-request options (quality threshold, model, evaluation mode) are read
+    from the workflow state, so one instance can serve concurrent requests.
+    """
+    
+    TEMPERATURE = 0.5
+    CHAIN_SCHEMAS = {
+        "feedback_chain": SuggestionFeedback,
+        "batch_feedback_chain": FeedbackResponse
+    }
     
     def __init__(self):
         self.llm = ChatOpenAI(
             model=settings.model_name, 
-            temperature=0.5,
-            api_key=settings.openai_api_key
+            temperature=self.TEMPERATURE,
+            api_key=settings.openai_api_key,
+            http_async_client=get_http_client(),
+            callbacks=[llm_tracing_handler]
         )
-        # Minimum score threshold for considering suggestions as high quality
-        self.quality_threshold = 8.0
         
         self.feedback_prompt = ChatPromptTemplate.from_messages([
             ("system", """You are an expert MBA admissions officer evaluating a content suggestion.
@@ -44,21 +58,61 @@ class FeedbackAgent:
             SuggestionFeedback,
             method="function_calling",
         )
+        
+        # Batched mode: every suggestion scored in one call, sending the framework once
+        self.batch_feedback_prompt = ChatPromptTemplate.from_messages([
+            ("system", """You are an expert MBA admissions officer evaluating content suggestions.
+            Analyze each suggestion independently using the provided evaluation framework criteria.
+            Each criterion must be evaluated thoroughly for every suggestion."""),
+            ("human", """Here are the {count} content suggestions to evaluate:
+            
+            {suggestions}
+
+            Here is the evaluation framework to use:
+            {framework}
+            
+            Return exactly {count} feedback entries in suggestion_feedback, one per suggestion,
+            in the same order as the suggestions above.
+            """)
+        ])
+        
+        self.batch_feedback_chain = self.llm.with_structured_output(
+            FeedbackResponse,
+            method="function_calling",
+        )
 
     async def evaluate_suggestions(self, state: WorkflowState) -> WorkflowState:
-        """Evaluates all content suggestions in parallel and updates workflow state."""
+        """
+        Evaluates content suggestions and updates workflow state, either with one
+        call per suggestion in parallel or, in "batched" mode, with a single call
+        for all of them. After a refinement, only the refined suggestions are re-evaluated; the
+        others keep their previous feedback.
+        """
         try:
             if not state.feedback_framework:
                 raise ValueError("Evaluation framework not found in workflow state")
                 
             framework = self._format_evaluation_framework(state.feedback_framework)
+            suggestions = state.suggestions.suggestions
+            
+            if state.feedback is None or state.suggestions_to_evaluate is None:
+                to_evaluate = list(range(len(suggestions)))
+                feedback_results = [None] * len(suggestions)
+            else:
+                to_evaluate = state.suggestions_to_evaluate
+                feedback_results = list(state.feedback.suggestion_feedback)
             
-            # Evaluate all suggestions in parallel
-            tasks = [
-                self.evaluate_single_suggestion(suggestion, framework)
-                for suggestion in state.suggestions.suggestions
-            ]
-            feedback_results = await asyncio.gather(*tasks)
+            selected = [suggestions[idx] for idx in to_evaluate]
+            if state.evaluation_mode == "batched":
+                evaluated = await self.evaluate_suggestions_batched(selected, framework, state.model_name)
+            else:
+                # Evaluate the selected suggestions in parallel
+                evaluated = await asyncio.gather(*(
+                    self.evaluate_single_suggestion(suggestion, framework, state.model_name)
+                    for suggestion in selected
+                ))
+            for idx, feedback in zip(to_evaluate, evaluated):
+                feedback_results[idx] = feedback
             
             overall_score = sum(f.score for f in feedback_results) / len(feedback_results)
             
@@ -66,14 +120,19 @@ class FeedbackAgent:
                 suggestion_feedback=feedback_results,
                 overall_score=overall_score
             )
+            state.suggestions_to_evaluate = None
             state.iteration += 1
+            self._track_best(state)
+            if state.round_started_at is not None:
+                state.last_round_seconds = time.monotonic() - state.round_started_at
             
             logger.info(
                 "Completed suggestion evaluation",
                 extra={
                     "iteration": state.iteration,
                     "overall_score": overall_score,
-                    "num_suggestions": len(feedback_results)
+                    "num_suggestions": len(feedback_results),
+                    "num_evaluated": len(to_evaluate)
                 }
             )
             return state
@@ -89,7 +148,8 @@ class FeedbackAgent:
     async def evaluate_single_suggestion(
         self, 
         suggestion: ContentSuggestion, 
-        framework: str
+        framework: str,
+        model_name: Optional[str] = None
     ) -> SuggestionFeedback:
         """Evaluates a single content suggestion against the given framework."""
         try:
@@ -98,7 +158,7 @@ class FeedbackAgent:
                 "suggestion": self._format_suggestion(suggestion)
             })
             
-            return await self.feedback_chain.ainvoke(formatted_prompt)
+            return await self.chain_for("feedback_chain", model_name).ainvoke(formatted_prompt)
             
         except Exception as e:
             logger.error(
@@ -109,15 +169,81 @@ class FeedbackAgent:
             raise
 
 
+    async def evaluate_suggestions_batched(
+        self,
+        suggestions: List[ContentSuggestion],
+        framework: str,
+        model_name: Optional[str] = None
+    ) -> List[SuggestionFeedback]:
+        """
+        Evaluates all suggestions in a single structured call. Falls back to
+        per-suggestion calls if the response doesn't have one entry per suggestion.
+        """
+        if not suggestions:
+            return []
+
+        formatted_prompt = await self.batch_feedback_prompt.ainvoke({
+            "count": len(suggestions),
+            "framework": framework,
+            "suggestions": "\n\n".join(
+                f"{idx}. {self._format_suggestion(suggestion)}"
+                for idx, suggestion in enumerate(suggestions, 1)
+            )
+        })
+        response = await self.chain_for("batch_feedback_chain", model_name).ainvoke(formatted_prompt)
+
+        if len(response.suggestion_feedback) != len(suggestions):
+            logger.warning(
+                "Batched evaluation returned the wrong number of entries, evaluating individually",
+                extra={"expected": len(suggestions), "received": len(response.suggestion_feedback)}
+            )
+            return await asyncio.gather(*(
+                self.evaluate_single_suggestion(suggestion, framework, model_name)
+                for suggestion in suggestions
+            ))
+        return response.suggestion_feedback
+
+    def _track_best(self, state: WorkflowState) -> None:
+        """Keeps the highest-scoring version of each suggestion seen so far."""
+        suggestions = state.suggestions.suggestions
+        feedback = state.feedback.suggestion_feedback
+        if state.best_suggestions is None or len(state.best_suggestions.suggestions) != len(suggestions):
+            best_suggestions, best_feedback = list(suggestions), list(feedback)
+        else:
+            best_suggestions = list(state.best_suggestions.suggestions)
+            best_feedback = list(state.best_feedback.suggestion_feedback)
+            for idx, item in enumerate(feedback):
+                if item.score > best_feedback[idx].score:
+                    best_suggestions[idx], best_feedback[idx] = suggestions[idx], item
+
+        state.best_suggestions = ContentSuggestionList(suggestions=best_suggestions)
+        state.best_feedback = FeedbackResponse(
+            suggestion_feedback=best_feedback,
+            overall_score=sum(f.score for f in best_feedback) / len(best_feedback)
+        )
+
     def _route_based_on_feedback(self, state: WorkflowState) -> Annotated[str, "Route"]:
-        """Determines whether to continue feedback loop based on quality and iterations."""
-        if (state.feedback and state.feedback.overall_score >= self.quality_threshold) or \
-           state.iteration >= state.max_iterations:
+        """
+        Determines whether to continue feedback loop based on quality, iterations
+        and the deadline. Another round is skipped if, judging by the last round's
+        duration, it would not finish before the deadline.
+        """
+        reason = None
+        if state.feedback and state.feedback.overall_score >= state.quality_threshold:
+            reason = "quality_threshold_met"
+        elif state.iteration >= state.max_iterations:
+            reason = "max_iterations_reached"
+        elif state.deadline is not None and \
+                time.monotonic() + (state.last_round_seconds or 0.0) > state.deadline:
+            reason = "deadline"
+
+        if reason:
             logger.info(
                 "Workflow complete",
                 extra={
-                    "reason": "quality_threshold_met" if state.feedback and state.feedback.overall_score >= self.quality_threshold else "max_iterations_reached",
+                    "reason": reason,
                     "final_score": state.feedback.overall_score if state.feedback else None,
+                    "best_score": state.best_feedback.overall_score if state.best_feedback else None,
                     "iterations": state.iteration
                 }
             )
@@ -2,20 +2,29 @@ from typing import Dict, List
 from langchain.prompts import ChatPromptTemplate
 from langchain_openai import ChatOpenAI
 from .....config import get_settings
+from ....openai import get_http_client
+from ....tracing import llm_tracing_handler
+from .model_chains import ModelChainsMixin
+from ....prompt_budget import PromptBudget
 from ..models import FeedbackFramework, WorkflowState
 import logging
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
-class FeedbackCriteriaExtractionAgent:
+class FeedbackCriteriaExtractionAgent(ModelChainsMixin):
     """Analyzes expert MBA essay feedback to extract structured evaluation criteria."""
     
+    TEMPERATURE = 0.2
+    CHAIN_SCHEMAS = {"criteria_chain": FeedbackFramework}
+    
     def __init__(self):
         self.llm: ChatOpenAI = ChatOpenAI(
             model=settings.model_name, 
-            temperature=0.2,
-            api_key=settings.openai_api_key
+            temperature=self.TEMPERATURE,
+            api_key=settings.openai_api_key,
+            http_async_client=get_http_client(),
+            callbacks=[llm_tracing_handler]
         )
         
         self.criteria_prompt = ChatPromptTemplate.from_messages([
@@ -43,15 +52,18 @@ class FeedbackCriteriaExtractionAgent:
                 method="function_calling")
         )
 
-    async def extract_feedback_framework(self, state: WorkflowState) -> WorkflowState:
-        """Extracts feedback criteria from RAG context and returns updated workflow state."""
+    async def extract_feedback_framework(self, state: WorkflowState) -> Dict[str, FeedbackFramework]:
+        """
+        Extracts feedback criteria from RAG context.
+        Returns only the feedback_framework update so it can run alongside other extractors.
+        """
         try:
             prompt = await self.criteria_prompt.ainvoke({
                 "feedback": self._format_rag_context_feedback(state.rag_context)
             })
             
             try:
-                criteria_response = await self.criteria_chain.ainvoke(prompt)
+                criteria_response = await self.chain_for("criteria_chain", state.model_name).ainvoke(prompt)
                 
                 if not criteria_response or not criteria_response.criteria:
                     raise ValueError("Invalid feedback framework generated: empty criteria")
@@ -61,8 +73,7 @@ class FeedbackCriteriaExtractionAgent:
                     "criteria_names": [c.name for c in criteria_response.criteria]
                 })
                 
-                state.feedback_framework = criteria_response
-                return state
+                return {"feedback_framework": criteria_response}
                 
             except Exception as parsing_error:
                 logger.error("Failed to parse LLM output", extra={
@@ -79,13 +90,20 @@ class FeedbackCriteriaExtractionAgent:
             raise RuntimeError(f"Failed to extract feedback framework: {str(e)}") from e
 
     def _format_rag_context_feedback(self, context: Dict[str, List[Dict[str, str]]]) -> str:
-        """Formats RAG context examples into a string for the prompt."""
+        """Formats RAG context examples into a string for the prompt, keeping the best-ranked ones that fit the token budget."""
         if not context or not context.get('relevant_examples'):
             logger.warning("Empty RAG context provided")
             return ""
             
-        return "\n\n".join([
-            f"Example Feedback: {example['feedback']}"
-            for example in context['relevant_examples']
-            if example.get('feedback')
-        ]) 
\ No newline at end of file
+        budget = PromptBudget("feedback_criteria")
+        feedback = budget.add_ranked(
+            "examples",
+            [
+                f"Example Feedback: {example['feedback']}"
+                for example in context['relevant_examples']
+                if example.get('feedback')
+            ],
+            max_item_tokens=settings.prompt_example_max_tokens
+        )
+        budget.record()
+        return "\n\n".join(feedback) 
\ No newline at end of file
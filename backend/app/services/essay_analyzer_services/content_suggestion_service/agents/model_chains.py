@@ -0,0 +1,38 @@
+from typing import Dict, Optional, Type
+from functools import lru_cache
+from pydantic import BaseModel
+from langchain_core.runnables import Runnable
+from langchain_openai import ChatOpenAI
+from .....config import get_settings
+from ....openai import get_http_client
+from ....tracing import llm_tracing_handler
+
+settings = get_settings()
+
+@lru_cache(maxsize=64)
+def get_model_chain(model_name: str, temperature: float, schema: Type[BaseModel]) -> Runnable:
+    """Builds (once per process) a structured-output chain on the given model."""
+    llm = ChatOpenAI(
+        model=model_name,
+        temperature=temperature,
+        api_key=settings.openai_api_key,
+        http_async_client=get_http_client(),
+        callbacks=[llm_tracing_handler]
+    )
+    return llm.with_structured_output(schema, method="function_calling")
+
+class ModelChainsMixin:
+    """
+    Lets an agent serve requests that ask for a model other than the configured one.
+    The agent's chain attributes are built for settings.model_name; chain_for returns
+    them for the default model and a shared, cached equivalent for any other model.
+    Nothing on the agent is mutated per request.
+    """
+
+    TEMPERATURE: float
+    CHAIN_SCHEMAS: Dict[str, Type[BaseModel]]
+
+    def chain_for(self, name: str, model_name: Optional[str]) -> Runnable:
+        if model_name is None or model_name == settings.model_name:
+            return getattr(self, name)
+        return get_model_chain(model_name, self.TEMPERATURE, self.CHAIN_SCHEMAS[name])
@@ -1,31 +1,68 @@
-from typing import Dict, List
+from typing import Dict, List, Optional
+from pathlib import Path
 from langchain.prompts import ChatPromptTemplate
 from langchain_openai import ChatOpenAI
 from .....config import get_settings
+from ....openai import get_http_client
+from ....tracing import llm_tracing_handler
+from .model_chains import ModelChainsMixin
+from ....prompt_budget import PromptBudget
 from ..models import (
     WorkflowState,
+    WritingStyleAttribute,
     WritingStyleAttributeList,
     WritingStyleApplicationList
 )
+import hashlib
+import json
 import logging
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
-class WritingStyleExtractionAgent:
+# The attribute list doesn't depend on the essay or RAG context, so it is generated
+# once and persisted. Bump the version to invalidate artifacts after schema changes.
+ATTRIBUTES_ARTIFACT_VERSION = 1
+ATTRIBUTES_ARTIFACT_PATH = Path(__file__).parents[5] / 'data/writing_style_attributes.json'
+
+# Used until app/scripts/refresh_writing_style_attributes.py has generated an
+# artifact for the configured model, so no request ever waits on generating one
+DEFAULT_ATTRIBUTES = WritingStyleAttributeList(attributes=[
+    WritingStyleAttribute(name="Pace and flow", category="structure", description="How quickly the narrative moves and how smoothly one idea leads to the next"),
+    WritingStyleAttribute(name="Emotional tone", category="tone", description="The feeling the writing conveys, such as earnest, reflective or determined"),
+    WritingStyleAttribute(name="Structural organization", category="structure", description="How the essay is ordered, from its opening hook through its conclusion"),
+    WritingStyleAttribute(name="Literary devices", category="technique", description="Use of imagery, metaphor, symbolism and contrast to make ideas memorable"),
+    WritingStyleAttribute(name="Authorial voice", category="voice", description="The distinct personality and perspective of the writer that comes through the text"),
+    WritingStyleAttribute(name="Sentence variety", category="technique", description="Mixing sentence length and construction to keep the reader engaged"),
+    WritingStyleAttribute(name="Persuasive techniques", category="technique", description="Concrete evidence, outcomes and reasoning that make the writer's case convincing"),
+    WritingStyleAttribute(name="Word choice", category="diction", description="Precise, vivid and active wording in place of vague or generic language"),
+    WritingStyleAttribute(name="Show, don't tell", category="technique", description="Illustrating qualities through specific anecdotes instead of asserting them"),
+    WritingStyleAttribute(name="Reflection", category="tone", description="Explaining what experiences taught the writer and how they changed their thinking"),
+])
+
+class WritingStyleExtractionAgent(ModelChainsMixin):
     """Analyzes writing style in essays by:
     1. Extracting style attributes (tone, structure, techniques)
     2. Derives a step-by-step explanation of how these attributes are applied in sample essays so that a writer can apply them to their own essay.
     """
     
+    TEMPERATURE = 0.2
+    CHAIN_SCHEMAS = {
+        "attributes_chain": WritingStyleAttributeList,
+        "analysis_chain": WritingStyleApplicationList
+    }
+    
     def __init__(self):
         self.llm = ChatOpenAI(
             model=settings.model_name, 
-            temperature=0.2,
-            api_key=settings.openai_api_key
+            temperature=self.TEMPERATURE,
+            api_key=settings.openai_api_key,
+            http_async_client=get_http_client(),
+            callbacks=[llm_tracing_handler]
         )
         
         self._initialize_prompts()
+        self.attributes: WritingStyleAttributeList = self._load_attributes() or DEFAULT_ATTRIBUTES
         
         self.attributes_chain = self.llm.with_structured_output(
             WritingStyleAttributeList,
@@ -72,22 +109,79 @@ class WritingStyleExtractionAgent:
             """)
         ])
 
-    async def extract_writing_style(self, state: WorkflowState) -> WorkflowState:
-        """Extracts writing style attributes and analyzes how they're used in sample essays"""
+    def _attributes_fingerprint(self) -> str:
+        """Identifies the prompt and model an attribute artifact was generated with."""
+        prompt_text = "\n".join(
+            message.prompt.template for message in self.attributes_prompt.messages
+        )
+        return hashlib.sha256(f"{settings.model_name}|{prompt_text}".encode('utf-8')).hexdigest()
+
+    def _load_attributes(self) -> Optional[WritingStyleAttributeList]:
+        """Loads the persisted attribute list, ignoring missing or outdated artifacts."""
+        if not ATTRIBUTES_ARTIFACT_PATH.exists():
+            logger.warning(
+                f"No writing style attributes artifact at {ATTRIBUTES_ARTIFACT_PATH}, using the defaults; "
+                "run app/scripts/refresh_writing_style_attributes.py to generate one"
+            )
+            return None
+
         try:
-            logger.debug("Generating writing style attributes")
-            attributes_prompt = await self.attributes_prompt.ainvoke({})
-            attributes = await self.attributes_chain.ainvoke(attributes_prompt)
-            
-            logger.debug("Analyzing essays with generated attributes")
+            with open(ATTRIBUTES_ARTIFACT_PATH, 'r', encoding='utf-8') as f:
+                artifact = json.load(f)
+
+            if artifact.get("version") != ATTRIBUTES_ARTIFACT_VERSION or \
+               artifact.get("fingerprint") != self._attributes_fingerprint():
+                logger.warning(
+                    "Writing style attributes artifact is outdated, using the defaults; "
+                    "run app/scripts/refresh_writing_style_attributes.py to regenerate it"
+                )
+                return None
+
+            attributes = WritingStyleAttributeList(**artifact["attributes"])
+            logger.info(f"Loaded {len(attributes.attributes)} writing style attributes from disk")
+            return attributes
+
+        except Exception as e:
+            logger.error(f"Failed to load writing style attributes artifact: {str(e)}")
+            return None
+
+    def _save_attributes(self, attributes: WritingStyleAttributeList) -> None:
+        """Persists the attribute list as a versioned artifact."""
+        artifact = {
+            "version": ATTRIBUTES_ARTIFACT_VERSION,
+            "fingerprint": self._attributes_fingerprint(),
+            "model": settings.model_name,
+            "attributes": attributes.model_dump()
+        }
+        ATTRIBUTES_ARTIFACT_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = ATTRIBUTES_ARTIFACT_PATH.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(artifact, f, indent=2)
+        tmp_path.replace(ATTRIBUTES_ARTIFACT_PATH)
+
+    async def refresh_attributes(self) -> WritingStyleAttributeList:
+        """Regenerates the attribute list with the LLM and persists it."""
+        logger.info("Generating writing style attributes")
+        attributes_prompt = await self.attributes_prompt.ainvoke({})
+        attributes = await self.attributes_chain.ainvoke(attributes_prompt)
+        self._save_attributes(attributes)
+        self.attributes = attributes
+        return attributes
+
+    async def extract_writing_style(self, state: WorkflowState) -> Dict[str, WritingStyleApplicationList]:
+        """
+        Analyzes how the precomputed writing style attributes are used in sample essays.
+        Returns only the writing_style_analysis update so it can run alongside other extractors.
+        """
+        try:
+            logger.debug("Analyzing essays with precomputed attributes")
             analysis_prompt = await self.analysis_prompt.ainvoke({
-                "attributes": self._format_attributes(attributes),
+                "attributes": self._format_attributes(self.attributes),
                 "essays": self._format_rag_context_essays(state.rag_context)
             })
-            analysis = await self.analysis_chain.ainvoke(analysis_prompt) 
+            analysis = await self.chain_for("analysis_chain", state.model_name).ainvoke(analysis_prompt) 
             
-            state.writing_style_analysis = analysis
-            return state
+            return {"writing_style_analysis": analysis}
             
         except Exception as e:
             logger.error(f"Error in writing style extraction: {str(e)}")
@@ -103,12 +197,16 @@ class WritingStyleExtractionAgent:
         ])
 
     def _format_rag_context_essays(self, context: Dict[str, List[Dict[str, str]]]) -> str:
-        """Formats RAG context essays for prompt input"""
+        """Formats RAG context essays for prompt input, keeping the best-ranked ones that fit the token budget"""
         if not context.get('relevant_examples'):
             logger.warning("No relevant examples found in RAG context")
             return ""
             
-        return "\n\n".join([
-            f"Example Essay: {example['essay']}"
-            for example in context['relevant_examples']
-        ]) 
\ No newline at end of file
+        budget = PromptBudget("writing_style_analysis")
+        examples = budget.add_ranked(
+            "examples",
+            [f"Example Essay: {example['essay']}" for example in context['relevant_examples']],
+            max_item_tokens=settings.prompt_example_max_tokens
+        )
+        budget.record()
+        return "\n\n".join(examples) 
\ No newline at end of file
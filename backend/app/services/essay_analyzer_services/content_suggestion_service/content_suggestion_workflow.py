@@ -1,39 +1,59 @@
-from typing import Dict, List
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from functools import wraps
 from langgraph.graph import StateGraph, END
+import hashlib
+import json
 import logging
+import time
 from .agents.writing_style_agent import WritingStyleExtractionAgent
 from .agents.feedback_criteria_agent import FeedbackCriteriaExtractionAgent
 from .agents.content_suggestion_agent import ContentSuggestionAgent
 from .agents.feedback_agent import FeedbackAgent
 from .models import WorkflowState
 from ...models import ContentSuggestion
+from ...cache import CacheService, CacheOptions
+from ...persistent_cache import get_cache_backend
+from ...tracing import span
+from ....config import get_settings
 
 logger = logging.getLogger(__name__)
 
 class ContentSuggestionWorkflow:
     def __init__(self):
         try:
+            self.settings = get_settings()
             self.writing_style_agent = WritingStyleExtractionAgent()
             self.feedback_criteria_agent = FeedbackCriteriaExtractionAgent()
             self.content_agent = ContentSuggestionAgent()
             self.feedback_agent = FeedbackAgent()
             
+            # Extraction results depend only on the retrieved examples, not the user's essay
+            self.extraction_cache = CacheService(
+                CacheOptions(
+                    max_size=self.settings.extraction_cache_max_size,
+                    ttl=self.settings.extraction_cache_ttl
+                ),
+                backend=get_cache_backend("extraction")
+            )
+            
             self.workflow = StateGraph(WorkflowState)
             
-            self.workflow.add_node("extract_writing_style", self.writing_style_agent.extract_writing_style)
-            self.workflow.add_node("extract_feedback_criteria", self.feedback_criteria_agent.extract_feedback_framework)
-            self.workflow.add_node("generate_suggestions", self.content_agent.generate_initial_suggestions)
-            self.workflow.add_node("refine_suggestions", self.content_agent.refine_suggestions)
-            self.workflow.add_node("evaluate_suggestions", self.feedback_agent.evaluate_suggestions)
+            self._add_node("extract_writing_style", self.writing_style_agent.extract_writing_style)
+            self._add_node("extract_feedback_criteria", self.feedback_criteria_agent.extract_feedback_framework)
+            self._add_node("generate_suggestions", self.content_agent.generate_initial_suggestions)
+            self._add_node("refine_suggestions", self.content_agent.refine_suggestions)
+            self._add_node("evaluate_suggestions", self.feedback_agent.evaluate_suggestions)
             
             # Configure workflow edges
-            # Start with writing style extraction
-            self.workflow.set_entry_point("extract_writing_style")
-
-            # Connect extractors
-            self.workflow.add_edge("extract_writing_style", "extract_feedback_criteria")
+            # The extractors are independent, so every uncached one starts in the same step.
+            # Each returns a disjoint state key, so their updates merge without conflict.
+            self.workflow.set_conditional_entry_point(
+                self._route_extractions,
+                ["extract_writing_style", "extract_feedback_criteria", "generate_suggestions"]
+            )
 
-            # After sync, proceed with main workflow
+            # Join: generate_suggestions runs once, in the step after all extractors finish
+            self.workflow.add_edge("extract_writing_style", "generate_suggestions")
             self.workflow.add_edge("extract_feedback_criteria", "generate_suggestions")
             self.workflow.add_edge("generate_suggestions", "evaluate_suggestions")
             
@@ -54,6 +74,15 @@ class ContentSuggestionWorkflow:
             logger.error("Error initializing workflow", extra={"error": str(e)})
             raise
 
+    def _add_node(self, name: str, node: Callable[[WorkflowState], Awaitable[Any]]) -> None:
+        """Adds a graph node that runs in its own span, tagged with the loop iteration it starts in."""
+        @wraps(node)
+        async def traced_node(state: WorkflowState) -> Any:
+            with span(f"workflow.{name}", iteration=state.iteration):
+                return await node(state)
+
+        self.workflow.add_node(name, traced_node)
+
     async def generate_content_suggestions(
         self,
         essay_text: str,
@@ -62,16 +91,30 @@ class ContentSuggestionWorkflow:
         user_instructions: str = "",
         school_guidelines: str = "",
         max_iterations: int = 5,
-        quality_threshold: float = 8.0
+        quality_threshold: float = 8.0,
+        evaluation_mode: Optional[str] = None,
+        time_budget: Optional[float] = None,
+        model_name: Optional[str] = None,
+        progress_callback: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None
     ) -> List[ContentSuggestion]:
         """
         Generates and refines content suggestions for improving an essay.
         
         Uses an iterative process to analyze the essay style, generate suggestions,
         and refine them based on feedback until quality threshold is met or max iterations reached.
+        evaluation_mode ("parallel" or "batched") overrides Settings.feedback_evaluation_mode.
+        If time_budget (seconds) is given, no refinement round is started that is
+        projected to overrun it. The best-scoring version of each suggestion seen
+        across iterations is returned.
+        model_name overrides Settings.model_name for this request's LLM calls.
+        All options are carried in the workflow state, so concurrent requests with
+        different options share this workflow safely.
+        If progress_callback is given, it is awaited after every workflow node completes.
         """
         try:
-            self.feedback_agent.quality_threshold = quality_threshold
+            model_name = model_name or self.settings.model_name
+            writing_style_key = self._get_cache_key("writing_style", rag_context, "essay", model_name)
+            feedback_framework_key = self._get_cache_key("feedback_framework", rag_context, "feedback", model_name)
             
             initial_state = WorkflowState(
                 essay_text=essay_text,
@@ -79,16 +122,79 @@ class ContentSuggestionWorkflow:
                 rag_context=rag_context,
                 user_instructions=user_instructions,
                 school_guidelines=school_guidelines,
-                max_iterations=max_iterations
+                max_iterations=max_iterations,
+                quality_threshold=quality_threshold,
+                evaluation_mode=evaluation_mode or self.settings.feedback_evaluation_mode,
+                model_name=model_name,
+                deadline=time.monotonic() + time_budget if time_budget is not None else None,
+                writing_style_analysis=self.extraction_cache.get(writing_style_key),
+                feedback_framework=self.extraction_cache.get(feedback_framework_key)
             )
+            
+            logger.info("Extraction cache lookup", extra={
+                "writing_style_hit": initial_state.writing_style_analysis is not None,
+                "feedback_framework_hit": initial_state.feedback_framework is not None
+            })
 
-            final_state = await self.chain.ainvoke(initial_state)
+            if progress_callback:
+                final_state = await self._stream_chain(initial_state, progress_callback)
+            else:
+                final_state = await self.chain.ainvoke(initial_state)
+            
+            self.extraction_cache.set(writing_style_key, final_state["writing_style_analysis"])
+            self.extraction_cache.set(feedback_framework_key, final_state["feedback_framework"])
 
-            return final_state["suggestions"].suggestions
+            best_suggestions = final_state.get("best_suggestions") or final_state["suggestions"]
+            return best_suggestions.suggestions
             
         except Exception as e:
             logger.error("Workflow failed", extra={
                 "error": str(e),
                 "error_type": type(e).__name__
             })
-            raise RuntimeError(f"Failed to analyze essay: {str(e)}") from e
\ No newline at end of file
+            raise RuntimeError(f"Failed to analyze essay: {str(e)}") from e
+
+    async def _stream_chain(
+        self,
+        initial_state: WorkflowState,
+        progress_callback: Callable[[Dict[str, Any]], Awaitable[None]]
+    ) -> Dict[str, Any]:
+        """Runs the workflow node by node, reporting progress and returning the final state values."""
+        values = dict(initial_state)
+        
+        async for chunk in self.chain.astream(initial_state, stream_mode="updates"):
+            for node, update in chunk.items():
+                values.update(update if isinstance(update, dict) else dict(update))
+                feedback = values.get("feedback")
+                await progress_callback({
+                    "stage": node,
+                    "iteration": values.get("iteration", 0),
+                    "overall_score": feedback.overall_score if feedback else None
+                })
+        
+        return values
+
+    def _route_extractions(self, state: WorkflowState) -> List[str]:
+        """Fans out to every extraction node whose result isn't already in the state."""
+        pending = []
+        if state.writing_style_analysis is None:
+            pending.append("extract_writing_style")
+        if state.feedback_framework is None:
+            pending.append("extract_feedback_criteria")
+        return pending or ["generate_suggestions"]
+
+    def _get_cache_key(
+        self,
+        prefix: str,
+        rag_context: Dict[str, List[Dict[str, str]]],
+        field: str,
+        model_name: str
+    ) -> str:
+        """Fingerprints the model and the retrieved examples' field contents (order-independent) for caching."""
+        contents = sorted(
+            example.get(field, "") for example in rag_context.get("relevant_examples", [])
+        )
+        digest = hashlib.sha256(
+            json.dumps([model_name, contents]).encode("utf-8")
+        ).hexdigest()
+        return f"{prefix}:{digest}"
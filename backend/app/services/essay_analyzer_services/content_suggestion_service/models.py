@@ -55,6 +55,21 @@ class WorkflowState(BaseModel):
     user_instructions: str = ""
     school_guidelines: str = ""
     
-    # Control
+    # Indices of suggestions changed by the last refinement; None means evaluate all
+    suggestions_to_evaluate: Optional[List[int]] = None
+    
+    # Highest-scoring version of each suggestion across iterations, returned as the result
+    best_suggestions: Optional[ContentSuggestionList] = None
+    best_feedback: Optional[FeedbackResponse] = None
+    
+    # Timing (time.monotonic() values): a round is generate/refine followed by evaluate
+    deadline: Optional[float] = None
+    round_started_at: Optional[float] = None
+    last_round_seconds: Optional[float] = None
+    
+    # Control: per-request options live here, never on the shared agents
     iteration: int = 0
-    max_iterations: int = 5
\ No newline at end of file
+    max_iterations: int = 5
+    quality_threshold: float = 8.0
+    evaluation_mode: str = "parallel"
+    model_name: Optional[str] = None
\ No newline at end of file
@@ -1,8 +1,12 @@
-from typing import List
+from typing import List, Optional, Tuple
+import asyncio
 import logging
 from ..openai import OpenAIService
 from ..rag import RAGContext
+from ..prompt_budget import PromptBudget
+from ..single_flight import normalize_text
 from ...config import get_settings
+from ...utils.text_cleaner import chunk_paragraphs
 from ..models import GeneralFeedbackItem
 
 logger = logging.getLogger(__name__)
@@ -20,29 +24,107 @@ class GeneralFeedbackService:
         context: RAGContext,
         school: str
     ) -> List[GeneralFeedbackItem]:
-        """Generate general feedback for the essay."""
+        """
+        Generate general feedback for the essay.
+
+        Essays longer than sectioned_generation_min_words are reviewed in sections:
+        one request per chunk of paragraphs plus one for essay-wide feedback, run
+        concurrently so latency is bounded by the slowest request, not the essay length.
+        """
         try:
-            logger.info("Generating general feedback")
-            prompt = self._create_prompt(
-                essay_text, essay_prompt, user_instructions, context, school
-            )
-            response = await self.openai_service.generate_chat_completion(prompt)
-            
-            return [GeneralFeedbackItem(**item) for item in response["general_feedback"]]
-        
+            if len(essay_text.split()) < self.settings.sectioned_generation_min_words:
+                logger.info("Generating general feedback")
+                prompt = self._create_prompt(
+                    essay_text, essay_prompt, user_instructions, context, school
+                )
+                return await self._request_feedback(prompt)
+
+            chunks = chunk_paragraphs(essay_text, self.settings.sectioned_chunk_words)
+            logger.info(f"Generating general feedback in {len(chunks)} sections")
+            prompts = [
+                self._create_prompt(
+                    chunk, essay_prompt, user_instructions, context, school,
+                    section=(i + 1, len(chunks))
+                )
+                for i, chunk in enumerate(chunks)
+            ]
+            prompts.append(self._create_prompt(
+                essay_text, essay_prompt, user_instructions, context, school,
+                essay_wide=True
+            ))
+            sections = await asyncio.gather(*(self._request_feedback(prompt) for prompt in prompts))
+
+            return self._merge_feedback(sections)
+
         except Exception as e:
             logger.error(f"Error generating general feedback: {str(e)}")
             raise
 
+    async def _request_feedback(self, prompt: str) -> List[GeneralFeedbackItem]:
+        response = await self.openai_service.generate_chat_completion(prompt)
+        return [GeneralFeedbackItem(**item) for item in response["general_feedback"]]
+
+    def _merge_feedback(self, sections: List[List[GeneralFeedbackItem]]) -> List[GeneralFeedbackItem]:
+        """Concatenates per-section feedback in essay order, dropping repeated suggestions."""
+        seen = set()
+        merged = []
+        for item in (item for section in sections for item in section):
+            key = normalize_text(item.suggestion).lower()
+            if key not in seen:
+                seen.add(key)
+                merged.append(item)
+        return merged
+
     def _create_prompt(
         self,
         essay_text: str,
         essay_prompt: str,
         user_instructions: str,
         context: RAGContext,
-        school: str
+        school: str,
+        section: Optional[Tuple[int, int]] = None,
+        essay_wide: bool = False
     ) -> str:
-        """Create the general feedback prompt using feedback and RAG context."""
+        """
+        Create the general feedback prompt using feedback and RAG context.
+        `section` (index, total) scopes the prompt to one chunk of a long essay;
+        `essay_wide` asks only for feedback on the essay as a whole.
+        """
+        # The essay goes in first, so it's only cut if it alone exceeds the whole
+        # budget; guidelines and best-ranked examples share what's left
+        budget = PromptBudget("general_feedback")
+        essay_text = budget.add("essay", essay_text)
+        if "essay" in budget.truncated:
+            logger.warning(
+                f"Essay exceeds the general feedback prompt budget; "
+                f"truncated to {budget.usage['essay']} tokens"
+            )
+        guidelines_text = "\n\n".join(budget.add_ranked(
+            "guidelines", context.guidelines,
+            max_tokens=self.settings.prompt_guidelines_max_tokens
+        ))
+        examples_text = "\n\n".join(budget.add_ranked(
+            "examples",
+            [
+                f"Example Essay: {example.get('essay', '')}\nFeedback: {example.get('feedback', '')}"
+                for example in context.relevant_examples
+            ],
+            max_item_tokens=self.settings.prompt_example_max_tokens
+        ))
+        budget.record()
+
+        scope = ""
+        if section is not None:
+            scope = f"""
+        ### Scope:
+        The essay is long, so it is being reviewed in sections. The "User's Essay" above is section {section[0]} of {section[1]}. Give feedback only on this section, and name the part of the essay it covers in the "section" field.
+        """
+        elif essay_wide:
+            scope = """
+        ### Scope:
+        Other reviewers are covering individual sections. Give at most 2 items of feedback on the essay as a whole: its overall structure, narrative arc, and alignment with the prompt. Use "Overall" as the "section" field.
+        """
+
         return f"""
         You are a professional MBA admissions coach. Your task is to provide detailed, actionable feedback on the user's essay, highlighting strengths and areas for improvement. Use the provided context, including school guidelines, user instructions, and expert feedback, to guide your analysis.
 
@@ -51,10 +133,10 @@ class GeneralFeedbackService:
         2. **Essay Prompt:** {essay_prompt}
         3. **User's Essay:** {essay_text}
         4. **User Instructions:** {user_instructions} (This describes the user's goal for improvement, such as exploring emotional depth or enhancing storytelling.)
-        5. **School Guidelines:** {context.guidelines}
+        5. **School Guidelines:** {guidelines_text}
         6. **RAG Context (Examples and Feedback):**
-        {context.relevant_examples}
-
+        {examples_text}
+        {scope}
         ### Guidelines:
         1. Highlight the essay's strengths in storytelling, structure, and alignment with the prompt.
         2. Identify weaknesses and provide specific, actionable feedback for improvement.
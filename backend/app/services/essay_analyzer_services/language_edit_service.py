@@ -1,50 +1,120 @@
-from typing import List
+from typing import Any, Dict, List
+import asyncio
 import logging
 from ..models import LanguageEdit
 from ..openai import OpenAIService
+from ..cache import CacheService, CacheOptions
+from ..persistent_cache import get_cache_backend
+from ..single_flight import normalize_text
 from ...config import get_settings
+from ...utils.text_cleaner import split_paragraphs
 
 logger = logging.getLogger(__name__)
 
 class LanguageEditService:
+    """
+    Generates language edits paragraph by paragraph. Edits are cached per
+    paragraph, so rerunning a revised essay only sends the paragraphs that
+    changed to the LLM.
+    """
+
     def __init__(self) -> None:
         self.settings = get_settings()
         self.openai_service = OpenAIService()
+        self.cache = CacheService(
+            CacheOptions(
+                max_size=self.settings.language_edit_cache_max_size,
+                ttl=self.settings.language_edit_cache_ttl
+            ),
+            backend=get_cache_backend("language_edits")
+        )
+        self.paragraphs_reused = 0
+        self.paragraphs_generated = 0
 
     async def generate_edits(
         self,
         essay_text: str,
         user_instructions: str
     ) -> List[LanguageEdit]:
-        """Generate language improvement suggestions for the essay."""
+        """
+        Generate language improvement suggestions for the essay.
+        Uncached paragraphs are edited concurrently; edits are returned in essay order.
+        """
         try:
-            logger.info("Generating language edits")
-            prompt = self._create_prompt(essay_text, user_instructions)
-            response = await self.openai_service.generate_chat_completion(prompt)
-            
-            return [LanguageEdit(**item) for item in response["language_edits"]]
-        
+            paragraphs = list(dict.fromkeys(split_paragraphs(essay_text)))
+            edits_by_paragraph: Dict[str, List[LanguageEdit]] = {}
+            for paragraph in paragraphs:
+                cached = self.cache.get(self._get_cache_key(paragraph, user_instructions))
+                if cached is not None:
+                    edits_by_paragraph[paragraph] = cached
+
+            changed = [paragraph for paragraph in paragraphs if paragraph not in edits_by_paragraph]
+            self.paragraphs_reused += len(paragraphs) - len(changed)
+            self.paragraphs_generated += len(changed)
+            logger.info(
+                f"Generating language edits for {len(changed)} of {len(paragraphs)} paragraphs"
+            )
+
+            generated = await asyncio.gather(*(
+                self._generate_paragraph_edits(paragraph, user_instructions)
+                for paragraph in changed
+            ))
+            edits_by_paragraph.update(zip(changed, generated))
+
+            return [edit for paragraph in paragraphs for edit in edits_by_paragraph[paragraph]]
+
         except Exception as e:
             logger.error(f"Error generating language edits: {str(e)}")
             raise
 
+    async def _generate_paragraph_edits(
+        self,
+        paragraph: str,
+        user_instructions: str
+    ) -> List[LanguageEdit]:
+        """Generates and caches the edits for a single paragraph."""
+        prompt = self._create_prompt(paragraph, user_instructions)
+        response = await self.openai_service.generate_chat_completion(prompt)
+
+        edits = [LanguageEdit(**item) for item in response["language_edits"]]
+        self.cache.set(self._get_cache_key(paragraph, user_instructions), edits)
+        return edits
+
+    def _get_cache_key(self, paragraph: str, user_instructions: str) -> str:
+        """Keys edits on the paragraph, the instructions and the model settings that shape them."""
+        return "|".join([
+            self.settings.model_name,
+            str(self.settings.temperature),
+            normalize_text(user_instructions),
+            normalize_text(paragraph)
+        ])
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return paragraph reuse counts and cache stats."""
+        return {
+            "paragraphs_reused": self.paragraphs_reused,
+            "paragraphs_generated": self.paragraphs_generated,
+            "cache": self.cache.get_stats()
+        }
+
     def _create_prompt(
         self,
-        essay_text: str,
+        paragraph: str,
         user_instructions: str
     ) -> str:
-        """Create the language edits prompt using feedback and RAG context."""
+        """Create the language edits prompt for one paragraph of the essay."""
         return f"""
-        You are an expert editor specializing in MBA essays. Your task is to improve the clarity, conciseness, and word choices of the user's essay. For each suggested edit, provide a rewritten version of the sentence or section, ready for direct use. Each word/sentence in the essay should deserve its place in the essay and convey meaning that will give admission officers a clear understanding of the user's story, character, values, and emotions.
+        You are an expert editor specializing in MBA essays. Your task is to improve the clarity, conciseness, and word choices of one paragraph of the user's essay. For each suggested edit, provide a rewritten version of the sentence or section, ready for direct use. Each word/sentence in the essay should deserve its place in the essay and convey meaning that will give admission officers a clear understanding of the user's story, character, values, and emotions.
 
         ### Context:
-        1. **User's Essay:** {essay_text}
+        1. **Paragraph from the User's Essay:** {paragraph}
         2. **User Instructions:** {user_instructions} (This describes the user's goal for editing, such as improving flow or reducing word count.)
 
         ### Guidelines:
         1. Identify sentences or sections that can be simplified or clarified while preserving the tone and intent.
         2. Make suggestions for reducing wordiness or improving flow.
         3. Write the "after" version as a complete, ready-to-use improvement.
+        4. The "before" text must be copied exactly from the paragraph. If the paragraph needs no edits, return an empty list.
 
         Return your response in the following JSON structure:
         {{
@@ -54,4 +124,4 @@ class LanguageEditService:
                     "after": "Leading diverse teams taught me invaluable lessons."
                 }}
             ]
-        }}""" 
\ No newline at end of file
+        }}"""
@@ -0,0 +1,230 @@
+from ..config import get_settings
+from .pinecone import MBAEssayEmbedding, MBAEssaySearchResult, SearchResults
+from .tracing import latency_percentiles
+from collections import deque
+from pathlib import Path
+from typing import Deque, Dict, List, Optional, Set, Tuple
+import numpy as np
+import hashlib
+import json
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+class SchoolPartition:
+    """
+    Contiguous float32 matrix of unit-normalized embeddings for one school,
+    with row-aligned ids and metadata. Rows beyond `count` are spare capacity.
+    """
+
+    def __init__(
+        self,
+        vectors: Optional[np.ndarray] = None,
+        ids: Optional[List[str]] = None,
+        metadata: Optional[List[dict]] = None
+    ) -> None:
+        self.vectors = vectors
+        self.ids = ids or []
+        self.metadata = metadata or []
+        self.positions = {id_: i for i, id_ in enumerate(self.ids)}
+        self.count = len(self.ids)
+
+    def upsert(self, id_: str, values: List[float], metadata: dict) -> None:
+        vector = np.asarray(values, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector = vector / norm
+
+        if self.vectors is None:
+            self.vectors = np.empty((16, vector.shape[0]), dtype=np.float32)
+        elif not self.vectors.flags.writeable:
+            # Memory-mapped partitions are read-only; copy before the first write
+            self.vectors = np.array(self.vectors)
+
+        if id_ in self.positions:
+            row = self.positions[id_]
+            self.metadata[row] = metadata
+        else:
+            if self.count == self.vectors.shape[0]:
+                grown = np.empty((self.count * 2, self.vectors.shape[1]), dtype=np.float32)
+                grown[:self.count] = self.vectors[:self.count]
+                self.vectors = grown
+            row = self.count
+            self.positions[id_] = row
+            self.ids.append(id_)
+            self.metadata.append(metadata)
+            self.count += 1
+
+        self.vectors[row] = vector
+
+    def search(self, query: np.ndarray, top_k: int) -> List[Tuple[int, float]]:
+        """Returns (row, cosine score) pairs for the top_k most similar rows."""
+        if self.count == 0:
+            return []
+
+        scores = self.vectors[:self.count] @ query
+        k = min(top_k, self.count)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(row), float(scores[row])) for row in top]
+
+class LocalVectorService:
+    """
+    In-process alternative to PineconeService with the same interface.
+
+    Embeddings are partitioned by school so the school filter is a dictionary
+    lookup, and cosine similarity over a partition is one matrix-vector product.
+    Partitions persist as .npy files (memory-mapped on load) plus JSON metadata.
+    """
+
+    LATENCY_WINDOW = 1000
+
+    def __init__(self, index_path: Optional[str] = None) -> None:
+        self.settings = get_settings()
+        self.index_path = Path(index_path or self.settings.local_index_path)
+        self.partitions: Dict[str, SchoolPartition] = {}
+        self._dirty: Set[str] = set()
+        self._query_latencies: Deque[float] = deque(maxlen=self.LATENCY_WINDOW)
+        self._query_count = 0
+        self._load()
+
+    def _partition_path(self, school: str) -> Path:
+        slug = hashlib.sha256(school.encode('utf-8')).hexdigest()[:16]
+        return self.index_path / slug
+
+    def _load(self) -> None:
+        """
+        Loads every persisted partition, memory-mapping the embedding matrices.
+        Temporary files from an interrupted flush are ignored, as is any
+        partition whose matrix doesn't match its metadata.
+        """
+        if not self.index_path.exists():
+            logger.warning(f"No local vector index at {self.index_path}")
+            return
+
+        for metadata_path in self.index_path.glob("*.json"):
+            if ".tmp." in metadata_path.name:
+                continue
+            try:
+                with open(metadata_path, 'r', encoding='utf-8') as f:
+                    partition_data = json.load(f)
+                # Indexes flushed before vector files were versioned use <slug>.npy
+                vectors_path = self.index_path / partition_data.get("vectors", metadata_path.with_suffix('.npy').name)
+                vectors = np.load(vectors_path, mmap_mode='r')
+            except (OSError, ValueError) as e:
+                logger.error(f"Skipping unreadable local index partition {metadata_path.name}: {str(e)}")
+                continue
+
+            if vectors.shape[0] != len(partition_data["ids"]):
+                logger.error(
+                    f"Skipping local index partition {metadata_path.name}: {vectors.shape[0]} vectors "
+                    f"for {len(partition_data['ids'])} ids"
+                )
+                continue
+
+            self.partitions[partition_data["school"]] = SchoolPartition(
+                vectors=vectors,
+                ids=partition_data["ids"],
+                metadata=partition_data["metadata"]
+            )
+
+        logger.info(
+            f"Loaded local vector index with {sum(p.count for p in self.partitions.values())} "
+            f"embeddings across {len(self.partitions)} schools"
+        )
+
+    async def initialize(self) -> None:
+        """Nothing to connect to; kept for interface parity with PineconeService."""
+        return
+
+    async def store_essay_embedding(self, embedding: MBAEssayEmbedding) -> None:
+        """Stores an essay embedding in memory. Call flush() to persist it."""
+        school = embedding.metadata["school"]
+        partition = self.partitions.setdefault(school, SchoolPartition())
+        partition.upsert(embedding.id, embedding.values, embedding.metadata)
+        self._dirty.add(school)
+        logger.debug(f"Stored embedding with ID: {embedding.id}")
+
+    async def store_essay_embeddings(self, embeddings: List[MBAEssayEmbedding]) -> None:
+        """Stores a batch of essay embeddings in memory. Call flush() to persist them."""
+        for embedding in embeddings:
+            await self.store_essay_embedding(embedding)
+
+    async def flush(self) -> None:
+        """
+        Persists every partition modified since the last flush. Each flush writes
+        the matrix to a new versioned file, then atomically replaces the metadata
+        that names it, so a crash at any point leaves the previous pair intact.
+        """
+        self.index_path.mkdir(parents=True, exist_ok=True)
+        for leftover in self.index_path.glob("*.tmp.*"):
+            leftover.unlink()
+
+        for school in self._dirty:
+            partition = self.partitions[school]
+            base_path = self._partition_path(school)
+
+            vectors_path = base_path.with_name(f"{base_path.name}.{time.time_ns()}.npy")
+            np.save(vectors_path, np.ascontiguousarray(partition.vectors[:partition.count]))
+            tmp_metadata = base_path.with_suffix('.tmp.json')
+            with open(tmp_metadata, 'w', encoding='utf-8') as f:
+                json.dump({
+                    "school": school,
+                    "vectors": vectors_path.name,
+                    "ids": partition.ids,
+                    "metadata": partition.metadata
+                }, f)
+            tmp_metadata.replace(base_path.with_suffix('.json'))
+
+            # Older matrices are no longer referenced (already-mapped ones stay readable)
+            for stale in self.index_path.glob(f"{base_path.name}*.npy"):
+                if stale != vectors_path:
+                    stale.unlink()
+
+        self._dirty.clear()
+
+    async def search_similar_essays(
+        self,
+        query_embedding: List[float],
+        school: str,
+        top_k: int = 5
+    ) -> SearchResults:
+        """Finds similar essays for the given school using cosine similarity."""
+        start = time.perf_counter()
+        try:
+            partition = self.partitions.get(school)
+            if partition is None:
+                return SearchResults()
+
+            query = np.asarray(query_embedding, dtype=np.float32)
+            norm = np.linalg.norm(query)
+            if norm > 0:
+                query = query / norm
+
+            return SearchResults(results=[
+                MBAEssaySearchResult(
+                    score=score,
+                    essay=partition.metadata[row]["essay"],
+                    prompt=partition.metadata[row]["prompt"],
+                    school=partition.metadata[row]["school"],
+                    feedback=partition.metadata[row]["feedback"]
+                )
+                for row, score in partition.search(query, top_k)
+            ])
+
+        except Exception as e:
+            logger.error(f"Error searching local vector index: {str(e)}")
+            return SearchResults(degraded=True)
+
+        finally:
+            self._query_count += 1
+            self._query_latencies.append(time.perf_counter() - start)
+
+    def get_stats(self) -> Dict[str, float]:
+        """Return query counts and latency percentiles (ms) over recent queries."""
+        return {
+            "queries": self._query_count,
+            "embeddings": sum(p.count for p in self.partitions.values()),
+            **latency_percentiles(self._query_latencies)
+        }
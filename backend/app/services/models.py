@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List
+from typing import Dict, List, Literal, Optional
 
 """
 IMPORTANT: All type field mappings between frontend and backend must be kept in sync.
@@ -31,16 +31,46 @@ class ContentSuggestion(BaseModel):
         description="A rewritten version of the original text that implements the suggestion"
     )
 
+class ComponentStatus(BaseModel):
+    status: str = Field(
+        description="Outcome of the analysis branch: 'ok', 'failed' or 'timeout'"
+    )
+    error: Optional[str] = Field(
+        default=None,
+        description="Error message when the branch did not complete"
+    )
+
 class AnalysisResponse(BaseModel):
     content_suggestions: List[ContentSuggestion]
     language_edits: List[LanguageEdit]
     general_feedback: List[GeneralFeedbackItem]
+    component_status: Dict[str, ComponentStatus] = Field(default_factory=dict)
 
 class AnalysisRequest(BaseModel):
     essay_text: str
     essay_prompt: str
     user_instructions: str
     school: str 
+    evaluation_mode: Optional[Literal["parallel", "batched"]] = Field(
+        default=None,
+        description="How content suggestions are scored; defaults to Settings.feedback_evaluation_mode"
+    )
+    model_name: Optional[str] = Field(
+        default=None,
+        description="Model for content suggestions, one of Settings.request_model_names; defaults to Settings.model_name"
+    )
+    quality_threshold: Optional[float] = Field(
+        default=None,
+        ge=0,
+        le=10,
+        description="Score at which content suggestions stop being refined"
+    )
+    max_iterations: Optional[int] = Field(
+        default=None,
+        ge=1,
+        le=5,
+        description="Most refinement rounds for content suggestions"
+    )
 
 # Word Cutter Service Models
 class WordCutEdit(BaseModel):
@@ -1,63 +1,138 @@
-from openai import OpenAI
+from openai import AsyncOpenAI, RateLimitError
 from ..config import get_settings
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+from functools import lru_cache
+import httpx
 import json
 import logging
 from openai.types.chat import ChatCompletion
+from .prompt_budget import count_tokens
+from .tracing import span
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+EMBEDDING_MODEL = "text-embedding-ada-002"
+
+@lru_cache()
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Returns the process-wide HTTP client used for all OpenAI traffic.
+    Every service and LangChain model shares this connection pool.
+    """
+    settings = get_settings()
+    return httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=settings.openai_max_connections,
+            max_keepalive_connections=settings.openai_max_keepalive_connections,
+            keepalive_expiry=settings.openai_keepalive_expiry
+        ),
+        timeout=httpx.Timeout(settings.openai_request_timeout)
+    )
+
+@lru_cache()
+def get_openai_client() -> AsyncOpenAI:
+    """Returns the shared async OpenAI client built on the pooled HTTP client."""
+    settings = get_settings()
+    return AsyncOpenAI(
+        api_key=settings.openai_api_key,
+        http_client=get_http_client()
+    )
+
+async def close_http_client() -> None:
+    """Closes the shared connection pool. Called on application shutdown."""
+    if get_http_client.cache_info().currsize:
+        await get_http_client().aclose()
+        get_http_client.cache_clear()
+        get_openai_client.cache_clear()
+
 class OpenAIService:
     """
     Service class for interacting with OpenAI's API.
     Handles embeddings generation and chat completions with proper error handling.
+    All instances share a single async client and connection pool.
     """
-    
-    def __init__(self) -> None:
+
+    def __init__(self, client: Optional[AsyncOpenAI] = None) -> None:
         self.settings = get_settings()
-        self.client = OpenAI(api_key=self.settings.openai_api_key)
+        self.client = client or get_openai_client()
         logger.info("OpenAIService initialized")
 
-    def generate_embedding(self, text: str) -> List[float]:
+    async def generate_embedding(self, text: str) -> List[float]:
         """
         Creates an embedding vector for the given text.
         Returns a list of floats representing the embedding.
         """
         try:
-            response = self.client.embeddings.create(
-                model="text-embedding-ada-002",
-                input=text
-            )
+            with span("openai.embedding") as embedding_span:
+                response = await self.client.embeddings.create(
+                    model=EMBEDDING_MODEL,
+                    input=text
+                )
+                embedding_span.set(prompt_tokens=response.usage.prompt_tokens)
             return response.data[0].embedding
         except Exception as e:
             logger.error(f"Failed to generate embedding: {str(e)}")
             raise Exception(f"Embedding generation failed: {str(e)}")
 
+    async def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """
+        Creates embedding vectors for a batch of texts in a single request.
+        Returns the embeddings in input order. Rate limit errors are re-raised
+        unchanged so callers can back off.
+        """
+        try:
+            with span("openai.embeddings", batch_size=len(texts)) as embedding_span:
+                response = await self.client.embeddings.create(
+                    model=EMBEDDING_MODEL,
+                    input=texts
+                )
+                embedding_span.set(prompt_tokens=response.usage.prompt_tokens)
+            return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+        except RateLimitError:
+            raise
+        except Exception as e:
+            logger.error(f"Failed to generate {len(texts)} embeddings: {str(e)}")
+            raise Exception(f"Embedding generation failed: {str(e)}")
+
     async def generate_chat_completion(self, prompt: str) -> Dict[str, Any]:
         """
         Gets a chat completion from OpenAI for the given prompt.
         Returns the response as a parsed JSON dictionary.
         """
         try:
+            # Leave the completion whatever room the prompt doesn't use, up to max_tokens
+            prompt_tokens = count_tokens(prompt)
+            max_tokens = max(1, min(
+                self.settings.max_tokens,
+                self.settings.model_context_tokens - prompt_tokens
+            ))
+            logger.debug(f"Chat completion prompt: {prompt_tokens} tokens, max_tokens: {max_tokens}")
+
             # Request JSON-formatted response from the API
-            response: ChatCompletion = self.client.chat.completions.create(
-                model=self.settings.model_name,
-                response_format={"type": "json_object"},
-                messages=[{"role": "user", "content": prompt}],
-                temperature=self.settings.temperature,
-                max_tokens=self.settings.max_tokens
-            )
-            
+            with span("openai.chat_completion", model=self.settings.model_name) as completion_span:
+                response: ChatCompletion = await self.client.chat.completions.create(
+                    model=self.settings.model_name,
+                    response_format={"type": "json_object"},
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=self.settings.temperature,
+                    max_tokens=max_tokens
+                )
+                if response.usage:
+                    completion_span.set(
+                        prompt_tokens=response.usage.prompt_tokens,
+                        completion_tokens=response.usage.completion_tokens
+                    )
+
             # Extract and parse the response content
             result: str = response.choices[0].message.content or "{}"
             return json.loads(result)
-            
+
         except json.JSONDecodeError as e:
             error_msg = f"Failed to parse LLM response as JSON: {str(e)}"
             logger.error(error_msg)
             raise ValueError(error_msg)
-            
+
         except Exception as e:
             error_msg = f"OpenAI API call failed: {str(e)}"
             logger.error(error_msg)
@@ -0,0 +1,152 @@
+from typing import Any, Optional, Tuple
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from ..config import get_settings
+import logging
+import pickle
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Seconds a read on the event loop may wait for a lock (only held during WAL checkpoints and recovery)
+READ_TIMEOUT = 0.05
+
+class CacheBackend(ABC):
+    """
+    Interface for a persistent second-tier cache below CacheService's in-memory LRU.
+    Keys are already hashed; expires_at is a wall-clock UNIX timestamp so entries
+    stay valid across restarts and processes.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        """Return (value, expires_at) for a live entry, or None."""
+
+    @abstractmethod
+    def set(self, key: str, value: Any, expires_at: float) -> None:
+        pass
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        pass
+
+    @abstractmethod
+    def clear(self) -> None:
+        pass
+
+class SQLiteCacheBackend(CacheBackend):
+    """
+    SQLite-backed cache tier. WAL mode lets every uvicorn worker on the host read
+    and write the same file concurrently, so a restarted or new worker starts warm.
+    Each namespace (e.g. 'rag', 'extraction') gets its own rows in a shared table.
+
+    CacheService calls this synchronously from the event loop, so only reads run
+    inline: under WAL they never wait for writers, and a read that still finds
+    the database busy is treated as a miss. Writes go through a single background
+    thread with its own connection, where waiting out another worker's write
+    lock doesn't stall request handling.
+    """
+
+    def __init__(self, path: str, namespace: str) -> None:
+        self.path = Path(path)
+        self.namespace = namespace
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"cache-{namespace}")
+        self._write_connection = self._connect(5.0)
+        self._write_connection.execute("PRAGMA journal_mode=WAL")
+        self._write_connection.execute("PRAGMA synchronous=NORMAL")
+        self._write_connection.execute("""
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value BLOB NOT NULL,
+                expires_at REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            )
+        """)
+        self._lock = threading.Lock()
+        self._read_connection = self._connect(READ_TIMEOUT)
+        self.purge_expired()
+        logger.info(f"SQLite cache backend ready at {self.path} (namespace: {namespace})")
+
+    def _connect(self, timeout: float) -> sqlite3.Connection:
+        return sqlite3.connect(
+            self.path,
+            timeout=timeout,
+            check_same_thread=False,
+            isolation_level=None  # autocommit; each statement is its own transaction
+        )
+
+    def _write(self, statement: str, parameters: Tuple[Any, ...]) -> Future:
+        """Runs a write statement on the writer thread, logging rather than raising failures."""
+        def execute() -> None:
+            try:
+                self._write_connection.execute(statement, parameters)
+            except sqlite3.Error as e:
+                logger.warning(f"SQLite cache write failed (namespace: {self.namespace}): {e}")
+        return self._writer.submit(execute)
+
+    def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        try:
+            with self._lock:
+                row = self._read_connection.execute(
+                    "SELECT value, expires_at FROM cache_entries WHERE namespace = ? AND key = ?",
+                    (self.namespace, key)
+                ).fetchone()
+        except sqlite3.OperationalError as e:
+            logger.warning(f"SQLite cache read failed (namespace: {self.namespace}): {e}")
+            return None
+        if row is None:
+            return None
+
+        value, expires_at = row
+        if expires_at <= time.time():
+            self.delete(key)
+            return None
+        try:
+            return pickle.loads(value), expires_at
+        except Exception as e:
+            # Written by an incompatible version of a cached class, or truncated
+            logger.warning(f"Dropping unreadable cache entry (namespace: {self.namespace}): {e}")
+            self.delete(key)
+            return None
+
+    def set(self, key: str, value: Any, expires_at: float) -> None:
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        self._write(
+            "INSERT OR REPLACE INTO cache_entries (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+            (self.namespace, key, payload, expires_at)
+        )
+
+    def delete(self, key: str) -> None:
+        self._write(
+            "DELETE FROM cache_entries WHERE namespace = ? AND key = ?",
+            (self.namespace, key)
+        )
+
+    def clear(self) -> None:
+        """Removes every entry in this namespace, waiting for it so later reads can't see old entries."""
+        self._write(
+            "DELETE FROM cache_entries WHERE namespace = ?",
+            (self.namespace,)
+        ).result()
+
+    def purge_expired(self) -> None:
+        """Removes expired entries in this namespace."""
+        self._write(
+            "DELETE FROM cache_entries WHERE namespace = ? AND expires_at <= ?",
+            (self.namespace, time.time())
+        )
+
+def get_cache_backend(namespace: str) -> Optional[CacheBackend]:
+    """Builds the persistent cache tier configured in Settings, if any."""
+    settings = get_settings()
+    if settings.cache_backend == "sqlite":
+        return SQLiteCacheBackend(settings.cache_sqlite_path, namespace)
+    if settings.cache_backend != "memory":
+        raise ValueError(f"Unknown cache backend: {settings.cache_backend}")
+    return None
@@ -1,8 +1,13 @@
 from pinecone import Pinecone, ServerlessSpec
 from ..config import get_settings
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from .tracing import latency_percentiles
+import asyncio
+import threading
 import time
 from pydantic import BaseModel
-from typing import List
+from typing import Any, Callable, Deque, Dict, List
 import logging
 
 # Configure logging
@@ -27,26 +32,66 @@ class MBAEssaySearchResult(BaseModel):
     school: str
     feedback: str
 
+class SearchResults(BaseModel):
+    """
+    Results of a retrieval step. degraded marks results produced by a fallback
+    after a timeout or error, which callers shouldn't cache as the real answer.
+    """
+    results: List[MBAEssaySearchResult] = []
+    degraded: bool = False
+
 class PineconeService:
-    """Service for managing vector embeddings storage and similarity search using Pinecone."""
-    
+    """
+    Service for managing vector embeddings storage and similarity search using Pinecone.
+
+    The Pinecone client is synchronous, so every network call runs on a bounded
+    thread pool instead of the event loop. The index connection is set up lazily
+    on first use (or via initialize() at startup) rather than at import time.
+    """
+
+    LATENCY_WINDOW = 1000
+    # Keeps each upsert request under Pinecone's 2MB limit with full essay metadata
+    UPSERT_BATCH_SIZE = 50
+
     def __init__(self) -> None:
-        """Initialize Pinecone client and ensure index exists."""
+        """Create the Pinecone client and query executor without any network calls."""
         self.settings = get_settings()
         self.pinecone = Pinecone(api_key=self.settings.pinecone_api_key)
-        self._initialize_index()
-        
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.settings.pinecone_max_workers,
+            thread_name_prefix="pinecone"
+        )
+        self._init_lock = asyncio.Lock()
+        self._busy_lock = threading.Lock()
+        self._busy_workers = 0
+        self._query_latencies: Deque[float] = deque(maxlen=self.LATENCY_WINDOW)
+        self._query_count = 0
+        self._timeout_count = 0
+        self._error_count = 0
+
+    async def initialize(self) -> None:
+        """Connects to the Pinecone index, creating it if needed. Safe to call repeatedly."""
+        if hasattr(self, 'index'):
+            return
+        async with self._init_lock:
+            if not hasattr(self, 'index'):
+                await self._run_in_executor(self._initialize_index)
+
     def _initialize_index(self) -> None:
         """Sets up and connects to the Pinecone index."""
         index_name = self.settings.pinecone_index_name
-        
+
         # Create index if it doesn't exist
         if index_name not in self.pinecone.list_indexes().names():
             logger.info(f"Creating new Pinecone index: {index_name}")
             self._create_and_wait_for_index(index_name)
-            
+
         try:
-            self.index = self.pinecone.Index(index_name)
+            # Reuse one HTTP connection per executor thread
+            self.index = self.pinecone.Index(
+                index_name,
+                pool_threads=self.settings.pinecone_max_workers
+            )
             logger.info("PineconeService initialized successfully")
         except Exception as e:
             error_details = {
@@ -66,39 +111,86 @@ class PineconeService:
                 region="us-east-1"
             )
         )
-        
-        # Poll until index is ready
+
+        # Poll until index is ready (runs on the executor, not the event loop)
         while not self.pinecone.describe_index(index_name).status['ready']:
             time.sleep(1)
 
-    def store_essay_embedding(self, embedding: MBAEssayEmbedding) -> None:
+    async def _run_in_executor(self, func: Callable, *args: Any, **kwargs: Any) -> Any:
+        """
+        Runs a blocking Pinecone call on the bounded thread pool.
+
+        A call still queued when its caller times out is dropped, but one already
+        running can't be interrupted and holds its thread until Pinecone answers.
+        At most pinecone_max_workers such calls run at once; while all are busy,
+        new queries queue and time out rather than spawning more threads.
+        busy_workers in get_stats() shows how close the pool is to that.
+        """
+        def run() -> Any:
+            with self._busy_lock:
+                self._busy_workers += 1
+            try:
+                return func(*args, **kwargs)
+            finally:
+                with self._busy_lock:
+                    self._busy_workers -= 1
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, run)
+
+    async def store_essay_embedding(self, embedding: MBAEssayEmbedding) -> None:
         """Stores an essay embedding in Pinecone."""
-        if not hasattr(self, 'index'):
-            raise Exception("Pinecone index not initialized")
-            
-        self.index.upsert([{
+        await self.initialize()
+
+        await self._run_in_executor(self.index.upsert, [{
             "id": embedding.id,
             "values": embedding.values,
             "metadata": embedding.metadata
         }])
         logger.debug(f"Stored embedding with ID: {embedding.id}")
-    
-    def search_similar_essays(
-        self, 
-        query_embedding: List[float], 
+
+    async def store_essay_embeddings(self, embeddings: List[MBAEssayEmbedding]) -> None:
+        """Stores a batch of essay embeddings, upserting up to UPSERT_BATCH_SIZE per request."""
+        await self.initialize()
+
+        for start in range(0, len(embeddings), self.UPSERT_BATCH_SIZE):
+            batch = embeddings[start:start + self.UPSERT_BATCH_SIZE]
+            await self._run_in_executor(self.index.upsert, [
+                {"id": embedding.id, "values": embedding.values, "metadata": embedding.metadata}
+                for embedding in batch
+            ])
+        logger.debug(f"Stored {len(embeddings)} embeddings")
+
+    async def flush(self) -> None:
+        """Upserts are written through immediately; kept for interface parity with LocalVectorService."""
+        return
+
+    async def search_similar_essays(
+        self,
+        query_embedding: List[float],
         school: str,
         top_k: int = 5
-    ) -> List[MBAEssaySearchResult]:
-        """Finds similar essays for the given school using vector similarity."""
+    ) -> SearchResults:
+        """
+        Finds similar essays for the given school using vector similarity.
+        Returns empty, degraded results if the query fails or exceeds the configured timeout.
+        """
+        start = time.perf_counter()
         try:
-            results = self.index.query(
-                vector=query_embedding,
-                filter={"school": school},
-                top_k=top_k,
-                include_metadata=True
+            await self.initialize()
+
+            results = await asyncio.wait_for(
+                self._run_in_executor(
+                    self.index.query,
+                    vector=query_embedding,
+                    filter={"school": school},
+                    top_k=top_k,
+                    include_metadata=True
+                ),
+                timeout=self.settings.pinecone_query_timeout
             )
 
-            return [
+            return SearchResults(results=[
                 MBAEssaySearchResult(
                     score=match.score,
                     essay=match.metadata["essay"],
@@ -107,8 +199,33 @@ class PineconeService:
                     feedback=match.metadata["feedback"]
                 )
                 for match in results.matches
-            ]
+            ])
+
+        except asyncio.TimeoutError:
+            self._timeout_count += 1
+            logger.warning(
+                f"Pinecone query exceeded {self.settings.pinecone_query_timeout:g}s"
+            )
+            return SearchResults(degraded=True)
 
         except Exception as e:
+            self._error_count += 1
             logger.error(f"Error searching Pinecone: {str(e)}")
-            return []
+            return SearchResults(degraded=True)
+
+        finally:
+            latency = time.perf_counter() - start
+            self._query_count += 1
+            self._query_latencies.append(latency)
+            logger.debug(f"Pinecone query took {latency * 1000:.1f}ms")
+
+    def get_stats(self) -> Dict[str, float]:
+        """Return query counts, busy executor threads and latency percentiles (ms) over recent queries."""
+        return {
+            "queries": self._query_count,
+            "timeouts": self._timeout_count,
+            "errors": self._error_count,
+            "busy_workers": self._busy_workers,
+            "max_workers": self.settings.pinecone_max_workers,
+            **latency_percentiles(self._query_latencies)
+        }
@@ -0,0 +1,152 @@
+from typing import Any, Dict, List, Optional
+from collections import defaultdict
+from ..config import get_settings
+import asyncio
+import logging
+import tiktoken
+
+logger = logging.getLogger(__name__)
+
+# Rough characters per token for English text, used when no tokenizer is available
+CHARS_PER_TOKEN = 4
+
+# Seconds between attempts to load the tokenizer after a failure
+ENCODING_RETRY_INTERVAL = 300
+
+_encoding: Optional[tiktoken.Encoding] = None
+_encoding_attempted = False
+
+def load_encoding() -> Optional[tiktoken.Encoding]:
+    """
+    Loads the tokenizer for the configured model. tiktoken downloads its
+    vocabulary on first use, so this can block; a failure is not cached, and
+    the next call tries again.
+    """
+    global _encoding, _encoding_attempted
+    _encoding_attempted = True
+    model_name = get_settings().model_name
+    try:
+        try:
+            _encoding = tiktoken.encoding_for_model(model_name)
+        except KeyError:
+            _encoding = tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        logger.warning(f"Tokenizer unavailable, estimating token counts: {str(e)}")
+    return _encoding
+
+def get_encoding() -> Optional[tiktoken.Encoding]:
+    """
+    Returns the loaded tokenizer, or None while counts are estimated. Loads it
+    on first use if nothing has tried yet (scripts); the app loads it at startup
+    in a worker thread and retries in the background, so no request blocks on it.
+    """
+    if _encoding is None and not _encoding_attempted:
+        load_encoding()
+    return _encoding
+
+async def retry_encoding_load(interval: float = ENCODING_RETRY_INTERVAL) -> None:
+    """Retries loading the tokenizer off the event loop until it succeeds."""
+    while get_encoding() is None:
+        await asyncio.sleep(interval)
+        if await asyncio.to_thread(load_encoding) is not None:
+            logger.info("Tokenizer loaded; prompt budgets now use exact token counts")
+
+def count_tokens(text: str) -> int:
+    """Counts the tokens in text for the configured model."""
+    encoding = get_encoding()
+    if encoding is None:
+        return -(-len(text) // CHARS_PER_TOKEN)
+    return len(encoding.encode(text, disallowed_special=()))
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Returns the longest prefix of text that fits in max_tokens."""
+    if max_tokens <= 0:
+        return ""
+    encoding = get_encoding()
+    if encoding is None:
+        return text[:max_tokens * CHARS_PER_TOKEN]
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    return encoding.decode(tokens[:max_tokens])
+
+class PromptBudget:
+    """
+    Allocates one prompt's token budget across its variable sections (the user's
+    essay, retrieved examples, guidelines). Sections are added in priority order;
+    each is truncated to its own cap and to whatever budget remains.
+    Token counts per section are recorded and aggregated in prompt_budget_stats.
+    """
+
+    def __init__(self, name: str, total_tokens: Optional[int] = None) -> None:
+        self.name = name
+        self.remaining = get_settings().prompt_token_budget if total_tokens is None else total_tokens
+        self.usage: Dict[str, int] = {}
+        self.truncated: List[str] = []
+        self.dropped = 0
+
+    def add(self, section: str, text: str, max_tokens: Optional[int] = None) -> str:
+        """Fits a single text into the budget, truncating it if needed."""
+        limit = self.remaining if max_tokens is None else min(max_tokens, self.remaining)
+        tokens = count_tokens(text)
+        if tokens > limit:
+            text = truncate_to_tokens(text, limit)
+            tokens = count_tokens(text)
+            self.truncated.append(section)
+
+        self.remaining -= tokens
+        self.usage[section] = self.usage.get(section, 0) + tokens
+        return text
+
+    def add_ranked(
+        self,
+        section: str,
+        items: List[str],
+        max_tokens: Optional[int] = None,
+        max_item_tokens: Optional[int] = None
+    ) -> List[str]:
+        """
+        Fits items ordered best-first into the budget. Each item is truncated to
+        max_item_tokens; once the section's budget runs out, the lowest-ranked
+        items are dropped rather than cut to a meaningless stub.
+        """
+        section_budget = self.remaining if max_tokens is None else min(max_tokens, self.remaining)
+        min_useful_tokens = min(100, max_item_tokens or 100)
+
+        fitted = []
+        for i, item in enumerate(items):
+            limit = section_budget if max_item_tokens is None else min(max_item_tokens, section_budget)
+            if limit < min_useful_tokens:
+                self.dropped += len(items) - i
+                break
+            item = self.add(section, item, limit)
+            section_budget -= count_tokens(item)
+            fitted.append(item)
+        return fitted
+
+    def record(self) -> Dict[str, Any]:
+        """Logs and aggregates the token counts used by this prompt."""
+        total = sum(self.usage.values())
+        stats = prompt_budget_stats[self.name]
+        stats["prompts"] += 1
+        stats["tokens"] += total
+        stats["truncated_sections"] += len(self.truncated)
+        stats["dropped_items"] += self.dropped
+
+        logger.debug(f"{self.name} prompt used {total} tokens", extra={
+            "prompt_tokens": self.usage,
+            "truncated": self.truncated,
+            "dropped": self.dropped
+        })
+        return {"tokens": total, "sections": dict(self.usage)}
+
+prompt_budget_stats: Dict[str, Dict[str, int]] = defaultdict(lambda: {
+    "prompts": 0,
+    "tokens": 0,
+    "truncated_sections": 0,
+    "dropped_items": 0
+})
+
+def get_prompt_budget_stats() -> Dict[str, Dict[str, int]]:
+    """Return per-prompt totals of tokens used, truncations and dropped items."""
+    return {name: dict(stats) for name, stats in prompt_budget_stats.items()}
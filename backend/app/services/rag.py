@@ -1,9 +1,17 @@
-from typing import List
+from typing import Any, Dict, List
 from pydantic import BaseModel
+import hashlib
+import logging
 from .openai import OpenAIService
-from .pinecone import PineconeService
+from .vector_store import get_vector_service
 from .cohere import CohereService
 from .cache import CacheService, CacheOptions
+from .persistent_cache import get_cache_backend
+from .simhash import SimHashIndex, simhash
+from .tracing import annotate, span, traced
+from ..config import get_settings
+
+logger = logging.getLogger(__name__)
 
 class RAGContext(BaseModel):
     """
@@ -128,52 +136,98 @@ class RAGService:
     """Retrieves relevant context for essay analysis using RAG architecture"""
     
     def __init__(self):
+        self.settings = get_settings()
         self.openai = OpenAIService()
-        self.pinecone = PineconeService()
+        self.vector_store = get_vector_service()
         self.cohere = CohereService()
         self.cache = CacheService(
             CacheOptions(
                 max_size=1000,
-                ttl=31536000  # Cache for 1 year in seconds
-            )
+                ttl=31536000,  # Cache for 1 year in seconds
+                max_bytes=self.settings.rag_cache_max_bytes
+            ),
+            backend=get_cache_backend("rag")
         )
-
-    def _get_cache_key(self, prefix: str, value: str) -> str:
-        """Generates a cache key from prefix and value"""
-        return f"{prefix}:{value}"
-
+        # Maps SimHash fingerprints of past queries to their digests, so
+        # lightly edited drafts can reuse the cached context and embedding
+        self.near_duplicates: SimHashIndex[str] = SimHashIndex(
+            threshold=self.settings.rag_near_duplicate_threshold,
+            max_size=self.settings.rag_near_duplicate_max_entries
+        )
+        self.stats: Dict[str, int] = {
+            "exact_hits": 0,
+            "near_duplicate_hits": 0,
+            "embedding_reuses": 0,
+            "misses": 0,
+            "degraded": 0
+        }
+
+    def _get_cache_key(self, prefix: str, query_digest: str) -> str:
+        """Generates a cache key from prefix and query digest"""
+        return f"{prefix}:{query_digest}"
+
+    @traced("rag.get_relevant_context")
     async def get_relevant_context(self, essay_text: str, essay_prompt: str, school: str) -> RAGContext:
         """
         Gets relevant examples and guidelines for essay analysis.
         
         Returns context containing similar essays and school-specific guidelines.
+        Drafts that are near-duplicates of a previous query reuse its context and embedding.
         """
         query = f"Essay Content: {essay_text}"
+        query_digest = hashlib.sha256(query.encode('utf-8')).hexdigest()
         
-        context_cache_key = self._get_cache_key(f'context:{school}', query)
+        context_cache_key = self._get_cache_key(f'context:{school}', query_digest)
         cached_context = self.cache.get(context_cache_key)
         if cached_context:
+            self.stats["exact_hits"] += 1
+            annotate(cache="exact_hit")
             return RAGContext(**cached_context)
 
-        embedding_cache_key = self._get_cache_key('embedding', query)
+        fingerprint = simhash(essay_text)
+        similar_digest = None
+        match = self.near_duplicates.find(fingerprint)
+        if match:
+            similar_digest, similarity = match
+            cached_context = self.cache.get(self._get_cache_key(f'context:{school}', similar_digest))
+            if cached_context:
+                self.stats["near_duplicate_hits"] += 1
+                annotate(cache="near_duplicate_hit", similarity=round(similarity, 3))
+                logger.info(f"Reusing RAG context from near-duplicate draft (similarity {similarity:.2f})")
+                return RAGContext(**cached_context)
+
+        self.stats["misses"] += 1
+        annotate(cache="miss")
+
+        embedding_cache_key = self._get_cache_key('embedding', query_digest)
         query_embedding = self.cache.get(embedding_cache_key)
         
+        if not query_embedding and similar_digest:
+            query_embedding = self.cache.get(self._get_cache_key('embedding', similar_digest))
+            if query_embedding:
+                self.stats["embedding_reuses"] += 1
+        
         if not query_embedding:
-            query_embedding = self.openai.generate_embedding(query)
-            self.cache.set(embedding_cache_key, query_embedding)
+            with span("rag.embedding"):
+                query_embedding = await self.openai.generate_embedding(query)
+        self.cache.set(embedding_cache_key, query_embedding)
 
         # Search for similar essays filtered by school
-        search_results = self.pinecone.search_similar_essays(
-            query_embedding=query_embedding,
-            school=school
-        )
+        with span("rag.vector_search", school=school) as search_span:
+            search = await self.vector_store.search_similar_essays(
+                query_embedding=query_embedding,
+                school=school
+            )
+            search_span.set(results=len(search.results), degraded=search.degraded)
 
         # Rerank results for better relevance
-        reranked_results = await self.cohere.rerank_results(query, search_results)
+        with span("rag.rerank", documents=len(search.results)) as rerank_span:
+            reranked = await self.cohere.rerank_results(query, search.results)
+            rerank_span.set(results=len(reranked.results), degraded=reranked.degraded)
 
         relevant_examples = [
             {"essay": result.essay, "feedback": result.feedback} 
-            for result in reranked_results
+            for result in reranked.results
         ]
 
         context = RAGContext(
@@ -181,6 +235,21 @@ class RAGService:
             guidelines=SCHOOL_GUIDELINES.get(school, DEFAULT_GUIDELINES)
         )
         
+        if search.degraded or reranked.degraded:
+            # A failed search or rerank isn't this essay's real context; retry it on the next request
+            self.stats["degraded"] += 1
+            logger.warning("Not caching RAG context built from degraded search or rerank results")
+            return context
+
         self.cache.set(context_cache_key, context.dict())
+        self.near_duplicates.add(fingerprint, query_digest)
+
+        return context
 
-        return context
\ No newline at end of file
+    def get_stats(self) -> Dict[str, Any]:
+        """Return context hit/miss counts, including near-duplicate reuse, and cache usage."""
+        return {
+            **self.stats,
+            "near_duplicate_index_size": len(self.near_duplicates),
+            "cache": self.cache.get_stats()
+        }
\ No newline at end of file
@@ -0,0 +1,76 @@
+from collections import OrderedDict
+from typing import Generic, Optional, Tuple, TypeVar
+import hashlib
+import re
+
+T = TypeVar("T")
+
+FINGERPRINT_BITS = 64
+WORD_PATTERN = re.compile(r"\w+")
+
+def simhash(text: str, shingle_size: int = 3) -> int:
+    """
+    Computes a 64-bit SimHash fingerprint over word shingles.
+
+    Texts that differ by a few words produce fingerprints that differ in only
+    a few bits, so Hamming distance approximates how much of the text changed.
+    """
+    words = WORD_PATTERN.findall(text.lower())
+    if len(words) < shingle_size:
+        shingles = [" ".join(words)]
+    else:
+        shingles = [
+            " ".join(words[i:i + shingle_size])
+            for i in range(len(words) - shingle_size + 1)
+        ]
+
+    hashes = [
+        int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+        for shingle in shingles
+    ]
+
+    fingerprint = 0
+    threshold = len(hashes) / 2
+    for bit in range(FINGERPRINT_BITS):
+        if sum((h >> bit) & 1 for h in hashes) > threshold:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+def similarity(a: int, b: int) -> float:
+    """Returns the fraction of matching bits between two fingerprints (1.0 = identical)."""
+    return 1 - (a ^ b).bit_count() / FINGERPRINT_BITS
+
+class SimHashIndex(Generic[T]):
+    """
+    Bounded LRU index of SimHash fingerprints used to find near-duplicate texts.
+    Lookups scan all fingerprints, which is cheap for the few thousand entries kept.
+    """
+
+    def __init__(self, threshold: float, max_size: int = 1000) -> None:
+        self.threshold = threshold
+        self.max_size = max_size
+        self.entries: "OrderedDict[int, T]" = OrderedDict()
+
+    def add(self, fingerprint: int, value: T) -> None:
+        """Adds or refreshes a fingerprint, evicting the least recently used entry when full."""
+        self.entries[fingerprint] = value
+        self.entries.move_to_end(fingerprint)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def find(self, fingerprint: int) -> Optional[Tuple[T, float]]:
+        """Returns the most similar stored value and its similarity, if above the threshold."""
+        best: Optional[Tuple[int, float]] = None
+        for candidate in self.entries:
+            score = similarity(fingerprint, candidate)
+            if score >= self.threshold and (best is None or score > best[1]):
+                best = (candidate, score)
+
+        if best is None:
+            return None
+
+        self.entries.move_to_end(best[0])
+        return self.entries[best[0]], best[1]
+
+    def __len__(self) -> int:
+        return len(self.entries)
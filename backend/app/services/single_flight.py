@@ -0,0 +1,149 @@
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Generic, List, TypeVar
+from pydantic import BaseModel
+from ..config import Settings
+import asyncio
+import hashlib
+import json
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+BLANK_LINES = re.compile(r"\n{3,}")
+
+def normalize_text(text: str) -> str:
+    """
+    Collapses spaces and tabs within each line and runs of blank lines, so copies
+    of the same essay produce the same key while paragraph breaks still count.
+    """
+    lines = "\n".join(" ".join(line.split()) for line in text.splitlines())
+    return BLANK_LINES.sub("\n\n", lines).strip()
+
+def request_key(endpoint: str, request: BaseModel, settings: Settings) -> str:
+    """
+    Builds a coalescing key from the endpoint, the request fields (with
+    whitespace-normalized text) and the model settings that shape the output.
+    """
+    fields = {
+        name: normalize_text(value) if isinstance(value, str) else value
+        for name, value in request.model_dump().items()
+    }
+    payload = {
+        "endpoint": endpoint,
+        "request": fields,
+        "model": [settings.model_name, settings.temperature, settings.max_tokens]
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+class Broadcast(Generic[T]):
+    """
+    Runs an async generator in its own task and records what it yields, so any
+    number of subscribers can replay the items so far and then follow along.
+    """
+
+    def __init__(self, items: AsyncIterator[T]) -> None:
+        self.items: List[T] = []
+        self.finished = False
+        self.subscribers = 0
+        self._updated = asyncio.Event()
+        self.task = asyncio.create_task(self._run(items))
+
+    async def _run(self, items: AsyncIterator[T]) -> None:
+        try:
+            async for item in items:
+                self.items.append(item)
+                self._notify()
+        finally:
+            self.finished = True
+            self._notify()
+
+    def _notify(self) -> None:
+        self._updated.set()
+        self._updated = asyncio.Event()
+
+    async def subscribe(self) -> AsyncIterator[T]:
+        """Yields every item from the start; re-raises the generator's exception, if any."""
+        position = 0
+        while True:
+            while position < len(self.items):
+                yield self.items[position]
+                position += 1
+            if self.finished:
+                break
+            await self._updated.wait()
+
+        if self.task.done() and not self.task.cancelled() and self.task.exception() is not None:
+            raise self.task.exception()
+
+class SingleFlight:
+    """
+    Deduplicates identical concurrent calls: the first caller for a key runs the
+    computation and every caller that arrives while it is in flight awaits the
+    same result (or exception). Nothing is cached once the call completes.
+    Streamed computations are shared the same way through stream().
+    """
+
+    def __init__(self) -> None:
+        self.in_flight: Dict[str, asyncio.Task] = {}
+        self.streams: Dict[str, Broadcast] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, func: Callable[[], Awaitable[T]]) -> T:
+        self.calls += 1
+        task = self.in_flight.get(key)
+        if task is None:
+            task = asyncio.create_task(func())
+            self.in_flight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self.coalesced += 1
+            logger.info(f"Coalescing duplicate in-flight request {key[:12]}")
+
+        # Shield so one caller disconnecting doesn't cancel the others' result
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        if self.in_flight.get(key) is task:
+            del self.in_flight[key]
+
+    async def stream(self, key: str, func: Callable[[], AsyncIterator[T]]) -> AsyncIterator[T]:
+        """
+        Streaming counterpart of do(): the first caller for a key starts the
+        generator, and every caller that arrives while it runs receives all of
+        its items, replaying those already produced. The shared generator is
+        cancelled once its last subscriber disconnects.
+        """
+        self.calls += 1
+        broadcast = self.streams.get(key)
+        if broadcast is None:
+            broadcast = Broadcast(func())
+            self.streams[key] = broadcast
+            broadcast.task.add_done_callback(lambda _: self._forget_stream(key, broadcast))
+        else:
+            self.coalesced += 1
+            logger.info(f"Coalescing duplicate in-flight stream {key[:12]}")
+
+        broadcast.subscribers += 1
+        try:
+            async for item in broadcast.subscribe():
+                yield item
+        finally:
+            broadcast.subscribers -= 1
+            if broadcast.subscribers == 0 and not broadcast.task.done():
+                broadcast.task.cancel()
+                self._forget_stream(key, broadcast)
+
+    def _forget_stream(self, key: str, broadcast: Broadcast) -> None:
+        if self.streams.get(key) is broadcast:
+            del self.streams[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return total calls, coalesced duplicates and current in-flight count."""
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "in_flight": len(self.in_flight) + len(self.streams)
+        }
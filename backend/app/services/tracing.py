@@ -0,0 +1,219 @@
+from typing import Any, Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, TypeVar
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from uuid import UUID
+import asyncio
+import json
+import logging
+import time
+from langchain_core.callbacks import AsyncCallbackHandler
+from langchain_core.outputs import LLMResult
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+class Span:
+    """
+    One timed step of a request. Spans nest through a context variable: a span
+    started while another is current becomes its child, including inside tasks
+    created under it. A span with no parent is the root of a trace; when it
+    finishes the whole tree is logged.
+    """
+
+    def __init__(self, name: str, parent: Optional["Span"] = None, attributes: Optional[Dict[str, Any]] = None) -> None:
+        self.name = name
+        self.parent = parent
+        self.attributes: Dict[str, Any] = attributes or {}
+        self.children: List[Span] = []
+        self.status = "ok"
+        self.start = time.perf_counter()
+        self.duration: Optional[float] = None
+        if parent is not None:
+            parent.children.append(self)
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        self.duration = time.perf_counter() - self.start
+        if isinstance(error, asyncio.CancelledError):
+            self.status = "cancelled"
+        elif error is not None:
+            self.status = "error"
+            self.attributes["error"] = str(error) or type(error).__name__
+
+        trace_metrics.observe(self)
+        if self.parent is None:
+            # The tree goes in the message itself; the plain log format drops `extra` fields
+            trace = self.to_dict()
+            logger.info(
+                f"Trace {self.name} took {self.duration:.3f}s: {json.dumps(trace, default=str)}",
+                extra={"trace": trace}
+            )
+
+    def to_dict(self, trace_start: Optional[float] = None) -> Dict[str, Any]:
+        """Serializes the span tree with start offsets relative to the root, in milliseconds."""
+        trace_start = self.start if trace_start is None else trace_start
+        return {
+            "name": self.name,
+            "start_ms": round((self.start - trace_start) * 1000, 1),
+            "duration_ms": round(self.duration * 1000, 1) if self.duration is not None else None,
+            "status": self.status,
+            "attributes": self.attributes,
+            "children": [child.to_dict(trace_start) for child in self.children]
+        }
+
+current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Span]:
+    """Times the enclosed block as a child of the current span (or as a new trace)."""
+    new_span = Span(name, current_span.get(), attributes)
+    token = current_span.set(new_span)
+    try:
+        yield new_span
+    except BaseException as e:
+        new_span.finish(e)
+        raise
+    else:
+        new_span.finish()
+    finally:
+        try:
+            current_span.reset(token)
+        except ValueError:
+            # An async generator closed from another task (client disconnect) can't reset
+            pass
+
+def traced(name: str) -> Callable[[Callable[..., Awaitable[T]]], Callable[..., Awaitable[T]]]:
+    """Decorates an async function so every call runs in its own span."""
+    def decorator(func: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        @wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> T:
+            with span(name):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def annotate(**attributes: Any) -> None:
+    """Adds attributes to the current span, if any."""
+    active = current_span.get()
+    if active is not None:
+        active.set(**attributes)
+
+class LatencyHistogram:
+    """Cumulative-bucket latency histogram in the Prometheus style."""
+
+    def __init__(self) -> None:
+        self.bucket_counts = [0] * len(LATENCY_BUCKETS)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                self.bucket_counts[i] += 1
+
+def latency_percentiles(latencies: Iterable[float]) -> Dict[str, float]:
+    """Summarizes latencies in seconds as p50, p95 and max in milliseconds (zeros if empty)."""
+    ordered = sorted(latencies)
+
+    def percentile(p: float) -> float:
+        if not ordered:
+            return 0.0
+        return ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000
+
+    return {
+        "p50_ms": percentile(0.5),
+        "p95_ms": percentile(0.95),
+        "max_ms": ordered[-1] * 1000 if ordered else 0.0
+    }
+
+class TraceMetrics:
+    """Aggregates finished spans into per-span-name latency histograms, error counts and LLM token totals."""
+
+    def __init__(self) -> None:
+        self.latencies: Dict[str, LatencyHistogram] = defaultdict(LatencyHistogram)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.tokens: Dict[str, Dict[str, int]] = defaultdict(lambda: {"prompt": 0, "completion": 0})
+
+    def observe(self, finished: Span) -> None:
+        self.latencies[finished.name].observe(finished.duration)
+        if finished.status != "ok":
+            self.errors[finished.name] += 1
+        for kind in ("prompt", "completion"):
+            tokens = finished.attributes.get(f"{kind}_tokens")
+            if tokens:
+                self.tokens[finished.name][kind] += tokens
+
+    def render(self) -> str:
+        """Renders the metrics in the Prometheus text exposition format."""
+        lines = [
+            "# HELP span_duration_seconds Duration of traced request steps",
+            "# TYPE span_duration_seconds histogram"
+        ]
+        for name, histogram in sorted(self.latencies.items()):
+            for bound, count in zip(LATENCY_BUCKETS, histogram.bucket_counts):
+                lines.append(f'span_duration_seconds_bucket{{span="{name}",le="{bound:g}"}} {count}')
+            lines.append(f'span_duration_seconds_bucket{{span="{name}",le="+Inf"}} {histogram.count}')
+            lines.append(f'span_duration_seconds_sum{{span="{name}"}} {histogram.total:.6f}')
+            lines.append(f'span_duration_seconds_count{{span="{name}"}} {histogram.count}')
+
+        lines += [
+            "# HELP span_errors_total Traced steps that raised or were cancelled",
+            "# TYPE span_errors_total counter"
+        ]
+        for name, count in sorted(self.errors.items()):
+            lines.append(f'span_errors_total{{span="{name}"}} {count}')
+
+        lines += [
+            "# HELP llm_tokens_total Tokens reported by LLM calls",
+            "# TYPE llm_tokens_total counter"
+        ]
+        for name, tokens in sorted(self.tokens.items()):
+            for kind, count in tokens.items():
+                lines.append(f'llm_tokens_total{{span="{name}",type="{kind}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+trace_metrics = TraceMetrics()
+
+class LLMTracingHandler(AsyncCallbackHandler):
+    """
+    LangChain callback that records every chat model call as a span under the
+    current one, with its model and token usage. Attach it to ChatOpenAI
+    instances through `callbacks`.
+    """
+
+    def __init__(self) -> None:
+        self.spans: Dict[UUID, Span] = {}
+
+    async def on_chat_model_start(self, serialized: Dict[str, Any], messages: List[List[Any]], *, run_id: UUID, **kwargs: Any) -> None:
+        invocation_params = kwargs.get("invocation_params") or {}
+        self.spans[run_id] = Span("llm.chat_model", current_span.get(), {
+            "model": invocation_params.get("model") or invocation_params.get("model_name")
+        })
+
+    async def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        llm_span = self.spans.pop(run_id, None)
+        if llm_span is None:
+            return
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        llm_span.set(
+            prompt_tokens=usage.get("prompt_tokens"),
+            completion_tokens=usage.get("completion_tokens")
+        )
+        llm_span.finish()
+
+    async def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        llm_span = self.spans.pop(run_id, None)
+        if llm_span is not None:
+            llm_span.finish(error)
+
+llm_tracing_handler = LLMTracingHandler()
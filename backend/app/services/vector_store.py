@@ -0,0 +1,15 @@
+from typing import Union
+from ..config import get_settings
+from .pinecone import PineconeService
+from .local_vector_index import LocalVectorService
+
+VectorService = Union[PineconeService, LocalVectorService]
+
+def get_vector_service() -> VectorService:
+    """Builds the vector search backend selected by Settings.vector_backend."""
+    settings = get_settings()
+    if settings.vector_backend == "local":
+        return LocalVectorService()
+    if settings.vector_backend != "pinecone":
+        raise ValueError(f"Unknown vector backend: {settings.vector_backend}")
+    return PineconeService()
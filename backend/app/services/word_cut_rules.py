@@ -0,0 +1,161 @@
+from typing import List, Match, NamedTuple, Pattern, Tuple
+import re
+
+class WordCutRule(NamedTuple):
+    pattern: Pattern
+    replacement: str
+    explanation: str
+
+def _phrase_rules(table: List[Tuple[str, str]], explanation: str) -> List[WordCutRule]:
+    """Compiles whole-word, case-insensitive phrase replacements."""
+    return [
+        WordCutRule(re.compile(rf"\b{phrase}\b", re.IGNORECASE), replacement, explanation)
+        for phrase, replacement in table
+    ]
+
+# Words after which "the majority of" needs "most of" ("most of my colleagues", not "most my colleagues")
+DETERMINERS = r"(?:the|a|an|my|our|your|his|her|its|their|this|that|these|those|them|us|you)"
+
+WORDY_PHRASES = [
+    ("in order to", "to"),
+    ("so as to", "to"),
+    ("due to the fact that", "because"),
+    ("owing to the fact that", "because"),
+    ("in spite of the fact that", "although"),
+    ("despite the fact that", "although"),
+    ("in light of the fact that", "because"),
+    ("at this point in time", "now"),
+    ("at the present time", "now"),
+    ("in the event that", "if"),
+    ("until such time as", "until"),
+    ("in close proximity to", "near"),
+    ("a large number of", "many"),
+    ("a great deal of", "much"),
+    (rf"the majority of(?=\s+{DETERMINERS}\b)", "most of"),
+    (rf"the majority of(?!\s+{DETERMINERS}\b)(?=\s+\w)", "most"),
+    ("each and every", "every"),
+    ("first and foremost", "first"),
+    ("whether or not", "whether"),
+    ("has the ability to", "can"),
+    ("have the ability to", "can"),
+    ("is able to", "can"),
+    ("are able to", "can"),
+    ("prior to", "before"),
+    ("in the near future", "soon"),
+    ("on a daily basis", "daily"),
+    ("on a regular basis", "regularly"),
+]
+
+REDUNDANT_PAIRS = [
+    ("absolutely essential", "essential"),
+    ("completely unique", "unique"),
+    ("past experiences", "experiences"),
+    ("past experience", "experience"),
+    ("end result", "result"),
+    ("final outcome", "outcome"),
+    ("future plans", "plans"),
+    ("basic fundamentals", "fundamentals"),
+    ("advance planning", "planning"),
+    ("true facts", "facts"),
+    ("close collaboration", "collaboration"),
+    ("joint collaboration", "collaboration"),
+    ("unexpected surprise", "surprise"),
+    ("personal opinion", "opinion"),
+]
+
+# Only contract when another word follows ("I know what it is." must stay as is)
+CONTRACTIONS = [
+    (rf"{phrase}(?=\s+\w)", contraction)
+    for phrase, contraction in [
+        ("do not", "don't"),
+        ("does not", "doesn't"),
+        ("did not", "didn't"),
+        ("is not", "isn't"),
+        ("are not", "aren't"),
+        ("was not", "wasn't"),
+        ("were not", "weren't"),
+        ("have not", "haven't"),
+        ("has not", "hasn't"),
+        ("had not", "hadn't"),
+        ("can not", "can't"),
+        ("will not", "won't"),
+        ("would not", "wouldn't"),
+        ("could not", "couldn't"),
+        ("should not", "shouldn't"),
+        ("it is", "it's"),
+        ("that is", "that's"),
+        ("I am", "I'm"),
+        ("I will", "I'll"),
+        ("I would", "I'd"),
+        ("we are", "we're"),
+        ("they are", "they're"),
+        ("you are", "you're"),
+    ]
+]
+
+# Intensifiers that rarely carry meaning; removed only when directly modifying a word
+FILLER_WORDS = ["very", "really", "actually", "basically", "truly", "literally", "definitely", "extremely"]
+
+RULES: List[WordCutRule] = (
+    _phrase_rules(WORDY_PHRASES, "replaced a wordy phrase")
+    + _phrase_rules(REDUNDANT_PAIRS, "removed a redundant qualifier")
+    + _phrase_rules(CONTRACTIONS, "used a contraction")
+    + [
+        WordCutRule(
+            re.compile(rf"\b(?:{'|'.join(FILLER_WORDS)})\s+(?=\w)", re.IGNORECASE),
+            "",
+            "removed a filler word"
+        )
+    ]
+)
+
+# The word following a match, for when removing the match leaves it starting a sentence
+NEXT_WORD = re.compile(r"\w+")
+
+class RuleEdit(NamedTuple):
+    start: int
+    end: int
+    after: str
+    explanation: str
+
+def _match_case(matched: str, replacement: str) -> str:
+    """Keeps a capitalized match capitalized ("In order to" -> "To")."""
+    if replacement and matched[:1].isupper():
+        return replacement[0].upper() + replacement[1:]
+    return replacement
+
+def _rule_edit(essay_text: str, match: Match, rule: WordCutRule) -> RuleEdit:
+    """Builds the edit for one match, capitalizing the next word when a capitalized match is removed outright."""
+    start, end = match.span()
+    after = _match_case(match.group(0), rule.replacement)
+    if not after and match.group(0)[:1].isupper():
+        next_word = NEXT_WORD.match(essay_text, end)
+        if next_word:
+            end = next_word.end()
+            after = next_word.group(0)[0].upper() + next_word.group(0)[1:]
+    return RuleEdit(start, end, after, f"Rule-based edit: {rule.explanation}.")
+
+def apply_word_cut_rules(essay_text: str, words_to_cut: int) -> List[RuleEdit]:
+    """
+    Finds phrase-level cuts with the mechanical rules above, in essay order,
+    stopping once words_to_cut words would be removed. Each edit covers only the
+    span its rule matched, given as offsets into essay_text; where two matches
+    overlap, the rule listed first wins. The edits never overlap.
+    """
+    claimed: List[RuleEdit] = []
+    for rule in RULES:
+        for match in rule.pattern.finditer(essay_text):
+            edit = _rule_edit(essay_text, match, rule)
+            if not any(edit.start < other.end and other.start < edit.end for other in claimed):
+                claimed.append(edit)
+
+    edits: List[RuleEdit] = []
+    cut = 0
+    for edit in sorted(claimed, key=lambda edit: edit.start):
+        if cut >= words_to_cut:
+            break
+        word_count_diff = len(essay_text[edit.start:edit.end].split()) - len(edit.after.split())
+        if word_count_diff > 0:
+            edits.append(edit)
+            cut += word_count_diff
+    return edits
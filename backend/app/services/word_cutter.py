@@ -1,27 +1,146 @@
-from typing import List
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
 from pydantic import BaseModel
 from fastapi import HTTPException
 from .openai import OpenAIService
-from ..utils.text_cleaner import clean_essay_text
+from .word_cut_rules import apply_word_cut_rules
+from ..config import get_settings
+from ..utils.text_cleaner import chunk_paragraphs, clean_essay_text
+import asyncio
 import logging
-from .models import WordCutResponse, WordCutRequest
+from .models import WordCutEdit, WordCutResponse, WordCutRequest
 
 logger = logging.getLogger(__name__)
 
+class Replacement(NamedTuple):
+    start: int
+    end: int
+    after: str
+    explanation: str
+
+class EssayEdits:
+    """
+    An essay and the edits made to it, kept as non-overlapping replacements of
+    spans of the original text. Edits are applied by their position in the
+    current (edited) text; one that overlaps earlier replacements is merged
+    with them into a single replacement of the original span they cover, so
+    every resulting "before" is text from the user's essay and no two overlap.
+    """
+
+    def __init__(self, original_text: str) -> None:
+        self.original_text = original_text
+        self.replacements: List[Replacement] = []
+
+    @property
+    def text(self) -> str:
+        parts = []
+        position = 0
+        for replacement in self.replacements:
+            parts.append(self.original_text[position:replacement.start])
+            parts.append(replacement.after)
+            position = replacement.end
+        parts.append(self.original_text[position:])
+        return "".join(parts)
+
+    def _current_spans(self) -> List[Tuple[Replacement, int, int]]:
+        """Pairs each replacement with the span its output occupies in the current text."""
+        spans = []
+        shift = 0
+        for replacement in self.replacements:
+            start = replacement.start + shift
+            spans.append((replacement, start, start + len(replacement.after)))
+            shift += len(replacement.after) - (replacement.end - replacement.start)
+        return spans
+
+    @staticmethod
+    def _to_original(
+        spans: List[Tuple[Replacement, int, int]],
+        position: int,
+        precedes: Callable[[int, int], bool]
+    ) -> int:
+        """Maps a position in the current text to the original, measured from the last replacement before it."""
+        original = position
+        for replacement, span_start, span_end in spans:
+            if precedes(span_start, span_end):
+                original = replacement.end + position - span_end
+        return original
+
+    def replace(self, start: int, end: int, after: str, explanation: str) -> None:
+        """Replaces text[start:end] of the current text with after."""
+        spans = self._current_spans()
+        overlapping = [
+            (replacement, span_start, span_end) for replacement, span_start, span_end in spans
+            if (span_start < end and span_end > start) or (span_start == span_end and start < span_start < end)
+        ]
+        current = self.text
+        merged_start = min([start] + [span_start for _, span_start, _ in overlapping])
+        merged_end = max([end] + [span_end for _, _, span_end in overlapping])
+
+        # Map the merged bounds back to the original text. Neither falls inside a
+        # replacement that isn't being merged, and deletions sitting exactly on a
+        # bound stay outside it.
+        original_start = self._to_original(spans, merged_start, lambda span_start, span_end: span_end <= merged_start)
+        original_end = self._to_original(spans, merged_end, lambda span_start, span_end: span_start < merged_end)
+
+        merged = [replacement for replacement, _, _ in overlapping]
+        self.replacements = sorted(
+            [replacement for replacement in self.replacements if replacement not in merged] + [Replacement(
+                start=original_start,
+                end=original_end,
+                after=current[merged_start:start] + after + current[end:merged_end],
+                explanation=" ".join([r.explanation for r in merged] + [explanation]).strip()
+            )],
+            key=lambda replacement: replacement.start
+        )
+
+    def word_cut_edits(self) -> List[WordCutEdit]:
+        """
+        Returns the replacements as edits of the original essay, in essay order.
+        Replacements that no longer cut words (a later edit restored them) are
+        dropped, as is any whose span overlaps the previous edit's.
+        """
+        edits = []
+        previous_end = 0
+        for replacement in self.replacements:
+            before = self.original_text[replacement.start:replacement.end]
+            before_word_count = len(before.split())
+            after_word_count = len(replacement.after.split())
+            if after_word_count >= before_word_count or replacement.start < previous_end:
+                continue
+            previous_end = replacement.end
+            edits.append(WordCutEdit(
+                before=before,
+                after=replacement.after,
+                before_word_count=before_word_count,
+                after_word_count=after_word_count,
+                word_count_diff=before_word_count - after_word_count,
+                explanation=replacement.explanation
+            ))
+        return edits
+
 class WordCutter:
     def __init__(self):
+        self.settings = get_settings()
         self.openai_service = OpenAIService()
 
     def _create_word_cut_prompt(
         self,
         essay_text: str,
         word_limit: int,
+        section: Optional[Tuple[int, int]] = None,
     ) -> str:
         """
         Creates a prompt for the OpenAI API to cut words from an essay.
+        `section` (index, total) marks essay_text as one chunk of a long essay,
+        with word_limit being that chunk's share of the target.
         """
         current_word_count = len(essay_text.split())
         words_to_cut = current_word_count - word_limit
+        scope = ""
+        if section is not None:
+            scope = f"""
+        ### Scope:
+        The essay is long, so it is being edited in sections. The text below is section {section[0]} of {section[1]}; the word counts above apply to this section only. Only edit text from this section.
+        """
 
         return f"""
         You are an expert MBA essay editor specializing in concise, impactful writing. Your task is to help reduce the word count of the user's essay while preserving its meaning, emotional impact, and overall structure. Follow a systematic approach to editing, beginning with small, non-disruptive edits and progressing to larger cuts only if necessary.
@@ -30,7 +149,7 @@ class WordCutter:
         - Current Word Count: {current_word_count}
         - Target Word Count: {word_limit}
         - Words to Cut: {words_to_cut}
-
+        {scope}
         ### Essay Context:
         - **User's Essay:** {essay_text}
 
@@ -85,6 +204,71 @@ class WordCutter:
         - **Iterative Review:** Edit in stages. Perform a first pass for easy wins, then follow up with moderate edits. Return the edits in order from smallest to largest.
         """
 
+    async def _generate_edits(self, essay_text: str, word_limit: int) -> List[Dict[str, Any]]:
+        """
+        Requests word-cut edits for the essay. Essays longer than
+        sectioned_generation_min_words are split into paragraph chunks that are
+        edited concurrently, each asked to cut its proportional share of the words.
+        """
+        current_word_count = len(essay_text.split())
+        if current_word_count < self.settings.sectioned_generation_min_words:
+            prompt = self._create_word_cut_prompt(
+                essay_text=essay_text,
+                word_limit=word_limit,
+            )
+            response = await self.openai_service.generate_chat_completion(prompt)
+            return response["edits"]
+
+        chunks = chunk_paragraphs(essay_text, self.settings.sectioned_chunk_words)
+        words_to_cut = max(current_word_count - word_limit, 0)
+        logger.info(f"Cutting {words_to_cut} words across {len(chunks)} sections")
+
+        prompts = []
+        for i, chunk in enumerate(chunks):
+            chunk_word_count = len(chunk.split())
+            chunk_cut = round(words_to_cut * chunk_word_count / current_word_count)
+            prompts.append(self._create_word_cut_prompt(
+                essay_text=chunk,
+                word_limit=chunk_word_count - chunk_cut,
+                section=(i + 1, len(chunks)),
+            ))
+        responses = await asyncio.gather(*(
+            self.openai_service.generate_chat_completion(prompt) for prompt in prompts
+        ))
+
+        # Merge in essay order, dropping edits of the same sentence from neighbouring sections
+        seen = set()
+        edits = []
+        for edit in (edit for response in responses for edit in response["edits"]):
+            if edit["before"] not in seen:
+                seen.add(edit["before"])
+                edits.append(edit)
+        return edits
+
+    def _apply_edits(
+        self,
+        essay: EssayEdits,
+        edits: List[Dict[str, Any]]
+    ) -> int:
+        """
+        Applies the LLM's edits to the essay in order. Edits whose "before" text
+        isn't found verbatim in the (partially edited) essay, or that don't
+        reduce the word count, are discarded.
+        Returns the number of edits applied.
+        """
+        applied = 0
+        for edit in edits:
+            before = edit["before"].strip()
+            after = edit["after"].strip()
+            start = essay.text.find(before) if before else -1
+            if start < 0 or len(after.split()) >= len(before.split()):
+                logger.debug(f"Discarding word cut edit: {before[:60]!r}")
+                continue
+
+            essay.replace(start, start + len(before), after, edit.get("explanation", ""))
+            applied += 1
+        return applied
+
     async def cut_words(
         self,
         essay_text: str,
@@ -93,27 +277,47 @@ class WordCutter:
     ) -> WordCutResponse:
         """
         Reduces essay word count while preserving meaning.
+
+        A deterministic rule-based pre-pass makes mechanical cuts (wordy phrases,
+        contractions, filler words) first. LLM edits are verified locally against
+        the essay, with word counts recomputed. If the verified edits still leave
+        the essay over word_limit, follow-up passes (up to word_cut_max_passes in
+        total) ask for just the remaining words.
         Throws HTTPException if word cutting fails.
         """
         try:
             cleaned_essay_text = clean_essay_text(essay_text, essay_prompt)
+            total_before_word_count = len(cleaned_essay_text.split())
             
-            prompt = self._create_word_cut_prompt(
-                essay_text=cleaned_essay_text,
-                word_limit=word_limit,
-            )
-            
-            openai_response = await self.openai_service.generate_chat_completion(prompt)
+            essay = EssayEdits(cleaned_essay_text)
+            if self.settings.word_cut_rules_enabled:
+                # Mechanical cuts first; the LLM is only asked for what they can't cover
+                rule_edits = apply_word_cut_rules(cleaned_essay_text, total_before_word_count - word_limit)
+                # Offsets are into the original text, so apply from the end to keep earlier ones valid
+                for edit in sorted(rule_edits, key=lambda edit: edit.start, reverse=True):
+                    essay.replace(edit.start, edit.end, edit.after, edit.explanation)
+                logger.info(f"Rule-based pre-pass cut {total_before_word_count - len(essay.text.split())} words")
+
+            for attempt in range(self.settings.word_cut_max_passes):
+                remaining = len(essay.text.split()) - word_limit
+                if remaining <= 0:
+                    break
+                logger.info(f"Word cut pass {attempt + 1}: {remaining} words over the limit")
+
+                applied = self._apply_edits(
+                    essay, await self._generate_edits(essay.text, word_limit)
+                )
+                if not applied:
+                    break
             
-            total_word_count_diff = sum(edit["word_count_diff"] for edit in openai_response["edits"])
-            total_before_word_count = len(cleaned_essay_text.split())
-            total_after_word_count = total_before_word_count - total_word_count_diff
+            edits = essay.word_cut_edits()
+            total_after_word_count = len(essay.text.split())
             
             response_data = {
-                "total_word_count_diff": total_word_count_diff,
+                "total_word_count_diff": total_before_word_count - total_after_word_count,
                 "total_after_word_count": total_after_word_count,
                 "total_before_word_count": total_before_word_count,
-                "edits": openai_response["edits"]
+                "edits": edits
             }
             
             return WordCutResponse(**response_data)
@@ -1,3 +1,5 @@
+from typing import List
+
 def clean_essay_text(essay_text: str, essay_prompt: str) -> str:
     """
     Remove the essay prompt from the essay text if it appears at the beginning.
@@ -15,4 +17,27 @@ def clean_essay_text(essay_text: str, essay_prompt: str) -> str:
         cleaned_text = essay_text[len(essay_prompt):].strip()
         return cleaned_text
 
-    return essay_text 
\ No newline at end of file
+    return essay_text
+
+def split_paragraphs(essay_text: str) -> List[str]:
+    """
+    Split an essay into paragraphs on line breaks, dropping blank lines.
+    Essays pasted from Google Docs separate paragraphs with single or double newlines.
+    """
+    return [paragraph.strip() for paragraph in essay_text.splitlines() if paragraph.strip()]
+
+def chunk_paragraphs(essay_text: str, max_words: int) -> List[str]:
+    """
+    Group consecutive paragraphs into chunks of roughly max_words words.
+    Paragraphs are never split, so a single long paragraph becomes its own chunk.
+    """
+    chunks: List[List[str]] = []
+    chunk_words = 0
+    for paragraph in split_paragraphs(essay_text):
+        paragraph_words = len(paragraph.split())
+        if not chunks or chunk_words + paragraph_words > max_words:
+            chunks.append([])
+            chunk_words = 0
+        chunks[-1].append(paragraph)
+        chunk_words += paragraph_words
+    return ["\n\n".join(chunk) for chunk in chunks]
@@ -1,12 +1,16 @@
 import { Card, CardContent } from "@/components/ui/card"
 import { Loader2 } from "lucide-react"
 
-export function LoadingState() {
+interface LoadingStateProps {
+  message?: string
+}
+
+export function LoadingState({ message = "Analyzing your essay..." }: LoadingStateProps) {
   return (
     <Card className="w-full">
       <CardContent className="flex flex-col items-center justify-center py-6 space-y-4">
         <Loader2 className="h-8 w-8 animate-spin text-primary" />
-        <p className="text-sm text-muted-foreground">Analyzing your essay...</p>
+        <p className="text-sm text-muted-foreground">{message}</p>
       </CardContent>
     </Card>
   )
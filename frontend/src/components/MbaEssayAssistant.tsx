@@ -10,7 +10,7 @@ import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from "@
 import { ContentSuggestionsPanel } from '@/components/ContentSuggestionsPanel'
 import { LanguageEditsPanel } from '@/components/LanguageEditsPanel'
 import { GeneralFeedbackPanel } from '@/components/GeneralFeedbackPanel'
-import { AnalysisResponse, WordCutResponse } from '@/services/models'
+import { AnalysisProgress, AnalysisResponse, WordCutResponse } from '@/services/models'
 import { essayService } from '@/services/essay-analyzer'
 import { wordCutterService } from '@/services/word-cutter'
 import { Switch } from "@/components/ui/switch"
@@ -29,6 +29,17 @@ const SCHOOLS = [
     { value: "Columbia Business School", label: "Columbia Business School" },
 ] as const;
 
+/**
+ * Describes the current stage of a streamed analysis for the loading indicator
+ */
+const formatAnalysisProgress = (progress: AnalysisProgress | null): string => {
+    if (!progress || progress.stage === 'retrieve_context') return 'Analyzing your essay...';
+    if (progress.iteration && progress.overallScore != null) {
+        return `Refining content suggestions (round ${progress.iteration}, score ${progress.overallScore.toFixed(1)})...`;
+    }
+    return 'Generating content suggestions...';
+};
+
 export function MbaEssayAssistant() {
     // State management for form inputs
     const [essayPrompt, setEssayPrompt] = useState('')
@@ -45,6 +56,7 @@ export function MbaEssayAssistant() {
 
     // Analysis results state
     const [analysisResult, setAnalysisResult] = useState<AnalysisResponse | null>(null)
+    const [analysisProgress, setAnalysisProgress] = useState<AnalysisProgress | null>(null)
 
     // Word cutter specific state
     const [cutMode, setCutMode] = useState<'limit' | 'reduce'>('limit')
@@ -119,6 +131,8 @@ export function MbaEssayAssistant() {
         try {
             setIsLoading(true);
             setError(null);
+            setAnalysisResult(null);
+            setAnalysisProgress(null);
 
             // Input validation
             if (!isSignedIn) throw new Error('Please sign in to analyze essays');
@@ -128,14 +142,23 @@ export function MbaEssayAssistant() {
 
             const textToAnalyze = useManualInput ? manualEssayText : await getCurrentEssayText();
 
-            const result = await essayService.analyzeEssay({
+            // Show each component as soon as the backend streams it
+            await essayService.analyzeEssayStream({
                 essayText: textToAnalyze,
                 essayPrompt,
                 userInstructions: userInstructions || '',
                 school: selectedSchool
+            }, {
+                onResult: (update) => setAnalysisResult((previous) => ({
+                    contentSuggestions: [],
+                    languageEdits: [],
+                    generalFeedback: [],
+                    componentStatus: {},
+                    ...previous,
+                    ...update
+                })),
+                onProgress: setAnalysisProgress
             });
-
-            setAnalysisResult(result);
         } catch (error) {
             const errorMessage = error instanceof Error ? error.message : 'An unexpected error occurred';
             setError(errorMessage);
@@ -364,9 +387,10 @@ export function MbaEssayAssistant() {
                                 Analyze Essay
                             </Button>
 
-                            {isLoading ? (
-                                <LoadingState />
-                            ) : analysisResult && (
+                            {isLoading && (
+                                <LoadingState message={formatAnalysisProgress(analysisProgress)} />
+                            )}
+                            {analysisResult && (
                                 <Tabs defaultValue="content" className="mt-4">
                                     <TabsList className="grid w-full grid-cols-3">
                                         <TabsTrigger value="feedback">Feedback</TabsTrigger>
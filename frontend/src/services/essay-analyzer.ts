@@ -1,26 +1,63 @@
 import { API_BASE_URL } from '@/config'
-import { 
-    AnalysisRequest, 
-    AnalysisResponse 
+import {
+    AnalysisProgress,
+    AnalysisRequest,
+    AnalysisResponse,
+    ComponentStatus,
+    ContentSuggestion,
+    GeneralFeedbackItem,
+    LanguageEdit
 } from './models'
 
+// Transform snake_case response items from Python backend to camelCase for frontend
+const mapContentSuggestions = (items: any[]): ContentSuggestion[] =>
+    items.map((suggestion: any) => ({
+        suggestion: suggestion.suggestion,
+        howToApply: suggestion.how_to_apply,
+        originalText: suggestion.original_text,
+        improvedVersion: suggestion.improved_version
+    }));
+
+const mapLanguageEdits = (items: any[]): LanguageEdit[] =>
+    items.map((edit: any) => ({
+        before: edit.before,
+        after: edit.after
+    }));
+
+const mapGeneralFeedback = (items: any[]): GeneralFeedbackItem[] =>
+    items.map((feedback: any) => ({
+        section: feedback.section,
+        feedback: feedback.feedback,
+        suggestion: feedback.suggestion,
+        exampleApplication: feedback.example_application
+    }));
+
+// Convert frontend camelCase to backend snake_case
+const toSnakeCaseRequest = (requestData: AnalysisRequest) => ({
+    essay_text: requestData.essayText,
+    essay_prompt: requestData.essayPrompt,
+    user_instructions: requestData.userInstructions,
+    school: requestData.school,
+    evaluation_mode: requestData.evaluationMode,
+    model_name: requestData.modelName,
+    quality_threshold: requestData.qualityThreshold,
+    max_iterations: requestData.maxIterations,
+});
+
+export interface AnalysisStreamHandlers {
+    onResult: (update: Partial<AnalysisResponse>) => void;
+    onProgress?: (progress: AnalysisProgress) => void;
+}
+
 export const essayService = {
     analyzeEssay: async (requestData: AnalysisRequest): Promise<AnalysisResponse> => {
         try {
-            // Convert frontend camelCase to backend snake_case
-            const snakeCaseData = {
-                essay_text: requestData.essayText,
-                essay_prompt: requestData.essayPrompt,
-                user_instructions: requestData.userInstructions,
-                school: requestData.school,
-            };
-
             const response = await fetch(`${API_BASE_URL}/api/analyze`, {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json',
                 },
-                body: JSON.stringify(snakeCaseData),
+                body: JSON.stringify(toSnakeCaseRequest(requestData)),
             });
 
             if (!response.ok) {
@@ -29,24 +66,11 @@ export const essayService = {
             }
 
             const data = await response.json();
-            // Transform snake_case response from Python backend to camelCase for frontend\
             return {
-                contentSuggestions: data.content_suggestions.map((suggestion: any) => ({
-                    suggestion: suggestion.suggestion,
-                    howToApply: suggestion.how_to_apply,
-                    originalText: suggestion.original_text,
-                    improvedVersion: suggestion.improved_version
-                })),
-                languageEdits: data.language_edits.map((edit: any) => ({
-                    before: edit.before,
-                    after: edit.after
-                })),
-                generalFeedback: data.general_feedback.map((feedback: any) => ({
-                    section: feedback.section,
-                    feedback: feedback.feedback,
-                    suggestion: feedback.suggestion,
-                    exampleApplication: feedback.example_application
-                }))
+                contentSuggestions: mapContentSuggestions(data.content_suggestions),
+                languageEdits: mapLanguageEdits(data.language_edits),
+                generalFeedback: mapGeneralFeedback(data.general_feedback),
+                componentStatus: data.component_status ?? {}
             };
         } catch (error) {
             console.error('[Essay Service] Analysis failed:', error);
@@ -54,6 +78,93 @@ export const essayService = {
         }
     },
 
+    /**
+     * Streams analysis results from the Server-Sent Events endpoint, calling
+     * onResult as each component arrives. Resolves once the stream is done.
+     */
+    analyzeEssayStream: async (
+        requestData: AnalysisRequest,
+        handlers: AnalysisStreamHandlers
+    ): Promise<void> => {
+        try {
+            const response = await fetch(`${API_BASE_URL}/api/analyze/stream`, {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                    'Accept': 'text/event-stream',
+                },
+                body: JSON.stringify(toSnakeCaseRequest(requestData)),
+            });
+
+            if (!response.ok || !response.body) {
+                const errorData = await response.json();
+                throw new Error(errorData.detail || 'Analysis failed');
+            }
+
+            const componentStatus: Record<string, ComponentStatus> = {};
+            const handleEvent = (event: string, data: any) => {
+                switch (event) {
+                    case 'progress':
+                        handlers.onProgress?.({
+                            stage: data.stage,
+                            iteration: data.iteration,
+                            overallScore: data.overall_score
+                        });
+                        break;
+                    case 'content_suggestions':
+                        componentStatus[event] = data.status;
+                        handlers.onResult({
+                            contentSuggestions: mapContentSuggestions(data.content_suggestions),
+                            componentStatus: { ...componentStatus }
+                        });
+                        break;
+                    case 'language_edits':
+                        componentStatus[event] = data.status;
+                        handlers.onResult({
+                            languageEdits: mapLanguageEdits(data.language_edits),
+                            componentStatus: { ...componentStatus }
+                        });
+                        break;
+                    case 'general_feedback':
+                        componentStatus[event] = data.status;
+                        handlers.onResult({
+                            generalFeedback: mapGeneralFeedback(data.general_feedback),
+                            componentStatus: { ...componentStatus }
+                        });
+                        break;
+                    case 'error':
+                        throw new Error(data.detail || 'Analysis failed');
+                }
+            };
+
+            const reader = response.body.getReader();
+            const decoder = new TextDecoder();
+            let buffer = '';
+
+            while (true) {
+                const { done, value } = await reader.read();
+                if (done) break;
+
+                buffer += decoder.decode(value, { stream: true });
+                const messages = buffer.split('\n\n');
+                buffer = messages.pop() ?? '';
+
+                for (const message of messages) {
+                    let event = 'message';
+                    let data = '';
+                    for (const line of message.split('\n')) {
+                        if (line.startsWith('event: ')) event = line.slice(7);
+                        else if (line.startsWith('data: ')) data += line.slice(6);
+                    }
+                    if (data) handleEvent(event, JSON.parse(data));
+                }
+            }
+        } catch (error) {
+            console.error('[Essay Service] Streamed analysis failed:', error);
+            throw error;
+        }
+    },
+
     checkHealth: async (): Promise<boolean> => {
         try {
             const response = await fetch(`${API_BASE_URL}/health`);
@@ -33,13 +33,30 @@ export interface GeneralFeedbackItem {
     exampleApplication: string;
 }
 
+export interface ComponentStatus {
+    status: 'ok' | 'failed' | 'timeout';
+    error?: string | null;
+}
+
 export interface AnalysisResponse {
     contentSuggestions: ContentSuggestion[];
     languageEdits: LanguageEdit[];
     generalFeedback: GeneralFeedbackItem[];
+    componentStatus: Record<string, ComponentStatus>;
 }
 
-export interface AnalysisRequest extends BaseEssayRequest {}
+export interface AnalysisRequest extends BaseEssayRequest {
+    evaluationMode?: 'parallel' | 'batched';
+    modelName?: string;
+    qualityThreshold?: number;
+    maxIterations?: number;
+}
+
+export interface AnalysisProgress {
+    stage: string;
+    iteration?: number;
+    overallScore?: number | null;
+}
 
 // Word Cutter types
 export interface WordCutEdit {